@@ -0,0 +1,122 @@
+import math
+from typing import Any, Optional
+
+import numpy as np
+
+# Reasons for accepting or rejecting a bid, see AcceptanceContext#reason
+ACCEPT_NEXT = "accept: at least our next bid"
+ACCEPT_TIME = "accept: past highTime and above the window"
+REJECT_NEXT = "reject: below our next bid"
+REJECT_NO_WINDOW = "reject: no received bids in the window"
+REJECT_WINDOW_MAX = "reject: below the window max (power leader)"
+REJECT_WINDOW_AVG = "reject: below the window average"
+
+
+class AcceptanceContext:
+    '''
+    Snapshot of everything the acceptance strategy needs in one round: the
+    utility of our next bid and, for the combi criterion, the maximum and
+    average utility of the bids received in the time window. Computed once,
+    then every offer (in a turn or in a vote) is checked against it with a
+    few comparisons.
+    '''
+
+    def __init__(self, nextUtil:float, combi:bool=False, acTime:bool=False,
+                 windowMax:Optional[float]=None, windowAvg:Optional[float]=None,
+                 leader:Any=None):
+        '''
+        @param nextUtil utility of the bid we would offer next
+        @param combi true if the combi criterion is used, false for only the
+               next criterion
+        @param acTime true if we are past the time after which anything that
+               passes the window check is acceptable
+        @param windowMax max utility of the received bids in the time window,
+               None if there are none
+        @param windowAvg average utility of the received bids in the time window,
+               None if there are none
+        @param leader the party with the most power, None if there is no single
+               such party
+        '''
+        self._nextUtil = nextUtil
+        self._combi = combi
+        self._acTime = acTime
+        self._windowMax = windowMax
+        self._windowAvg = windowAvg
+        self._leader = leader
+
+    def getNextUtil(self) -> float:
+        return self._nextUtil
+
+    def getLeader(self) -> Any:
+        return self._leader
+
+    def isGood(self, util:float, party:Any=None) -> bool:
+        '''
+        @param util our utility of the bid
+        @param party the actor that made the offer, or None
+        @return true if the bid is acceptable
+        '''
+        ac_next = util >= self._nextUtil
+        if not self._combi:
+            return ac_next
+        if self._windowMax is None:
+            return False
+        if party is not None and party == self._leader:
+            # The party has the most power, compare with the maximum
+            ac_combi = util >= self._windowMax
+        else:
+            # The party doesn't have the most power, compare with the average
+            ac_combi = util >= self._windowAvg
+        return (ac_next or self._acTime) and ac_combi
+
+    def lowestGood(self, party:Any=None) -> float:
+        '''
+        @param party the actor that made the offer, or None
+        @return the lowest utility that {@link #isGood} accepts, math.inf if
+        it accepts nothing.
+        '''
+        if not self._combi:
+            return self._nextUtil
+        if self._windowMax is None:
+            return math.inf
+        bar = self._windowMax if party is not None and party == self._leader else self._windowAvg
+        return bar if self._acTime else max(self._nextUtil, bar)
+
+    def areGood(self, utils:np.ndarray, leaderOnly:np.ndarray) -> np.ndarray:
+        '''
+        Vectorized {@link #isGood} for many bids at once.
+        @param utils our utilities of the bids
+        @param leaderOnly per bid, true if only the leader offered it. A bid
+               that was also offered by another party is checked against the
+               average, which is the lower bar.
+        @return per bid, true if it is acceptable
+        '''
+        ac_next = utils >= self._nextUtil
+        if not self._combi:
+            return ac_next
+        if self._windowMax is None:
+            return np.zeros(len(utils), dtype=bool)
+        ac_combi = utils >= np.where(leaderOnly, self._windowMax, self._windowAvg)
+        return (ac_next | self._acTime) & ac_combi
+
+    def reason(self, util:float, party:Any=None) -> str:
+        '''
+        @param util our utility of the bid
+        @param party the actor that made the offer, or None
+        @return why {@link #isGood} accepts or rejects the bid: one of the
+                ACCEPT_ or REJECT_ constants. The first failing check is
+                reported, so the same inputs always give the same reason.
+        '''
+        ac_next = util >= self._nextUtil
+        if not self._combi:
+            return ACCEPT_NEXT if ac_next else REJECT_NEXT
+        if self._windowMax is None:
+            return REJECT_NO_WINDOW
+        if party is not None and party == self._leader:
+            if util < self._windowMax:
+                return REJECT_WINDOW_MAX
+        elif util < self._windowAvg:
+            return REJECT_WINDOW_AVG
+        if ac_next:
+            return ACCEPT_NEXT
+        return ACCEPT_TIME if self._acTime else REJECT_NEXT
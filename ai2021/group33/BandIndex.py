@@ -0,0 +1,88 @@
+import math
+import random
+from typing import Optional
+
+import numpy as np
+
+from ai2021.group33.SortedBids import SortedBids
+
+
+class BandIndex:
+    '''
+    Index over a {@link SortedBids} that splits the utility range into bands
+    of equal width and stores, per band boundary, how many bids lie at or
+    above it. The bids with utility in [lo, hi] are a contiguous rank range,
+    and the bands give a slightly larger range in O(1), so a random bid in
+    [lo, hi] is found by sampling that range and rejecting the few ranks
+    outside [lo, hi]. Exact counts search one band only.
+    '''
+    # samples tried before the exact rank range is computed
+    TRIES = 8
+
+    def __init__(self, sortedBids:SortedBids, bands:int=1024):
+        '''
+        @param sortedBids the bids to index. Must be fully sorted, not lazy.
+        @param bands the number of utility bands
+        '''
+        self._sortedBids = sortedBids
+        self._utils = sortedBids.getUtilities()
+        # ascending view, for searchsorted without copying
+        self._ascending = self._utils[::-1]
+        self._size = len(self._utils)
+        self._bands = bands
+        self._top = float(self._utils[0]) if self._size > 0 else 0.0
+        bottom = float(self._utils[-1]) if self._size > 0 else 0.0
+        self._width = (self._top - bottom) / bands if self._top > bottom else 1.0
+        # starts[k] is the number of bids with utility >= top - k * width
+        levels = self._top - np.arange(bands + 2) * self._width
+        self._starts = self._size - np.searchsorted(self._ascending, levels, side='left')
+        self._starts[-1] = self._size
+
+    def getSortedBids(self) -> SortedBids:
+        return self._sortedBids
+
+    def _band(self, util:float) -> int:
+        '''
+        @return the band of the utility, clamped to the bands.
+        '''
+        return min(max(int((self._top - util) / self._width), 0), self._bands)
+
+    def countAbove(self, util:float) -> int:
+        '''
+        @return the number of bids with utility >= util. O(log N): only the
+        band of util (and, for rounding, its neighbours) is searched.
+        '''
+        if util > self._top:
+            return 0
+        band = self._band(util)
+        lo = int(self._starts[max(band - 1, 0)])
+        hi = int(self._starts[min(band + 2, self._bands + 1)])
+        # ranks lo..hi-1 are positions size-hi..size-lo-1 of the ascending view
+        below = np.searchsorted(self._ascending[self._size - hi:self._size - lo], util, side='left')
+        return hi - int(below)
+
+    def sample(self, lo:float, hi:float=math.inf, rnd:Optional[random.Random]=None) -> Optional[int]:
+        '''
+        @param lo the lowest utility
+        @param hi the highest utility
+        @param rnd the random generator, the module one if None
+        @return the rank of a random bid with utility in [lo, hi], or None if
+        there is none. Expected O(1) unless the range is narrower than a band.
+        '''
+        if self._size == 0 or lo > hi or lo > self._top:
+            return None
+        randrange = rnd.randrange if rnd is not None else random.randrange
+        # a rank range that contains all bids in [lo, hi]
+        first = 0 if hi >= self._top else int(self._starts[max(self._band(hi) - 1, 0)])
+        last = int(self._starts[min(self._band(lo) + 2, self._bands + 1)])
+        if first < last:
+            for _try in range(self.TRIES):
+                rank = randrange(first, last)
+                if lo <= self._utils[rank] <= hi:
+                    return rank
+        # the range is narrow, compute it exactly
+        first = 0 if hi >= self._top else self._sortedBids.firstBelow(float(np.nextafter(hi, np.inf)))
+        last = self.countAbove(lo)
+        if first >= last:
+            return None
+        return randrange(first, last)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Optional
+
+from geniusweb.issuevalue.Bid import Bid
+
+from ai2021.group33.BidSpace import BidSpace
+
+
+class BidCodec:
+    '''
+    Converts between Bids and their compact form, the code of the bid in a
+    {@link BidSpace}: one int, so hashing and comparing are as cheap as they
+    get and pools of bids are just ints (or arrays of them). Real Bids are
+    only needed at the Offer and Vote boundary. Converted bids are kept in a
+    bounded least-recently-used cache, so the same code always gives the same
+    Bid object while it is cached.
+    '''
+
+    def __init__(self, bidspace:BidSpace, maxsize:int=4096):
+        '''
+        @param bidspace the bid space the codes belong to
+        @param maxsize the maximum number of cached bids
+        '''
+        self._bidspace = bidspace
+        self._maxsize = maxsize
+        self._bids:"OrderedDict[int, Bid]" = OrderedDict()
+        self._codes:"OrderedDict[Bid, int]" = OrderedDict()
+
+    def getBidSpace(self) -> BidSpace:
+        return self._bidspace
+
+    def decode(self, code:int) -> Bid:
+        '''
+        @return the bid with the given code.
+        '''
+        bid = self._bids.get(code)
+        if bid is None:
+            bid = self._bidspace.toBid(self._bidspace.row(code))
+            self._bids[code] = bid
+            self._codes[bid] = code
+            self._trim()
+        else:
+            self._bids.move_to_end(code)
+        return bid
+
+    def encode(self, bid:Bid) -> Optional[int]:
+        '''
+        @return the code of the bid, or None if it is not a complete bid in
+        the bid space.
+        '''
+        code = self._codes.get(bid)
+        if code is None:
+            code = self._bidspace.toCode(bid)
+            if code is None:
+                return None
+            self._codes[bid] = code
+            self._bids[code] = bid
+            self._trim()
+        else:
+            self._codes.move_to_end(bid)
+        return code
+
+    def clear(self):
+        self._bids.clear()
+        self._codes.clear()
+
+    def __len__(self) -> int:
+        return len(self._bids)
+
+    def _trim(self):
+        while len(self._bids) > self._maxsize:
+            self._bids.popitem(last=False)
+        while len(self._codes) > self._maxsize:
+            self._codes.popitem(last=False)
@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.issuevalue.Value import Value
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+
+class BidSpace:
+    '''
+    Integer encoding of all the bids in a domain. Issues are sorted by name and
+    every issue is a column, every bid is a row of value indices into that issue's
+    value set. Row number and mixed radix code of a bid are the same, so the full
+    index matrix never has to be searched to find a bid.
+    Bid objects are only made when asked for with toBid.
+    '''
+
+    def __init__(self, domain:Domain):
+        '''
+        @param domain the (discrete) domain to encode.
+        '''
+        if domain is None:
+            raise ValueError("Given domain is not initialized.")
+        self._domain = domain
+        self._issues:List[str] = sorted(domain.getIssues())
+        self._values:List[List[Value]] = []
+        for issue in self._issues:
+            valueset = domain.getValues(issue)
+            self._values.append([valueset.get(i) for i in range(valueset.size())])
+        self._valueIndex:List[Dict[Value, int]] = [ {value:idx for idx, value in enumerate(values)}
+                                                    for values in self._values ]
+        self._sizes = np.array([len(values) for values in self._values], dtype=np.int64)
+        # start of every issue in the flat (issue, value) numbering
+        self._offsets = np.cumsum(self._sizes) - self._sizes
+        self._matrix:Optional[np.ndarray] = None
+
+    def getDomain(self) -> Domain:
+        return self._domain
+
+    def getIssues(self) -> List[str]:
+        '''
+        @return the issues, in column order.
+        '''
+        return self._issues
+
+    def getValues(self, column:int) -> List[Value]:
+        '''
+        @return the values of the issue in the given column, in index order.
+        '''
+        return self._values[column]
+
+    def getSizes(self) -> np.ndarray:
+        '''
+        @return number of values of each issue, in column order.
+        '''
+        return self._sizes
+
+    def getOffsets(self) -> np.ndarray:
+        '''
+        @return per issue the flat index of its first value. Value v of the
+        issue in column c has flat index getOffsets()[c] + v, numbering all
+        (issue, value) pairs from 0 to flatSize()-1.
+        '''
+        return self._offsets
+
+    def flatSize(self) -> int:
+        '''
+        @return total number of (issue, value) pairs.
+        '''
+        return int(self._sizes.sum())
+
+    def size(self) -> int:
+        '''
+        @return total number of bids in the space.
+        '''
+        return int(np.prod(self._sizes, dtype=object))
+
+    def indexMatrix(self) -> np.ndarray:
+        '''
+        @return the (size() x issues) matrix of value indices. Row r is the bid with
+        code r. Built once, with the smallest integer type that fits the values.
+        '''
+        if self._matrix is None:
+            dtype = np.min_scalar_type(int(self._sizes.max()) - 1) if len(self._sizes) > 0 else np.uint8
+            self._matrix = np.ascontiguousarray(
+                np.indices(tuple(self._sizes), dtype=dtype).reshape(len(self._sizes), -1).T)
+        return self._matrix
+
+    def row(self, code:int) -> np.ndarray:
+        '''
+        @return the value indices of the bid with the given code, without
+        building the full index matrix. Codes can be larger than 64 bits, so
+        this is done with python ints.
+        '''
+        row = np.empty(len(self._issues), dtype=np.int64)
+        for col in range(len(self._issues) - 1, -1, -1):
+            code, row[col] = divmod(code, int(self._sizes[col]))
+        return row
+
+    def codeOf(self, row) -> int:
+        '''
+        @param row the value indices, one per issue in column order.
+        @return the mixed radix code of the bid, a python int.
+        '''
+        code = 0
+        for size, idx in zip(self._sizes, row):
+            code = code * int(size) + int(idx)
+        return code
+
+    def toCode(self, bid:Bid) -> Optional[int]:
+        '''
+        @return the code of the bid, or None if the bid is partial or has
+        values that are not in the domain.
+        '''
+        code = 0
+        for col, issue in enumerate(self._issues):
+            idx = self._valueIndex[col].get(bid.getValue(issue))
+            if idx is None:
+                return None
+            code = code * int(self._sizes[col]) + idx
+        return code
+
+    def toBid(self, row) -> Bid:
+        '''
+        @param row the value indices, one per issue in column order.
+        @return the actual Bid.
+        '''
+        return Bid({ issue: self._values[col][int(row[col])] for col, issue in enumerate(self._issues) })
+
+    def indexOf(self, column:int, value:Value) -> Optional[int]:
+        '''
+        @return the index of the value in the issue in the given column, or
+        None if it is not one of its values.
+        '''
+        return self._valueIndex[column].get(value)
+
+    def toRow(self, bid:Bid) -> Optional[np.ndarray]:
+        '''
+        @param bid a bid in this domain
+        @return value indices of the bid, or None if the bid is partial or has
+        values that are not in the domain.
+        '''
+        row = np.empty(len(self._issues), dtype=np.int64)
+        for col, issue in enumerate(self._issues):
+            idx = self._valueIndex[col].get(bid.getValue(issue))
+            if idx is None:
+                return None
+            row[col] = idx
+        return row
+
+    def lookups(self, profile:LinearAdditive) -> List[np.ndarray]:
+        '''
+        @param profile a linear additive profile on this domain
+        @return per issue (in column order) the array of weight x value utility,
+        indexed by value index. The utility of a bid is the sum of these over its row.
+        '''
+        tables = []
+        utilities = profile.getUtilities()
+        for col, issue in enumerate(self._issues):
+            weight = float(profile.getWeight(issue))
+            valueUtils = utilities[issue]
+            tables.append(np.array([weight * float(valueUtils.getUtility(value))
+                                    for value in self._values[col]], dtype=np.float64))
+        return tables
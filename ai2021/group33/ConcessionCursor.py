@@ -0,0 +1,47 @@
+from typing import Optional, Union, TYPE_CHECKING
+
+from ai2021.group33.SortedBids import SortedBids
+
+# only for the annotation, lazy sorting is imported when a party needs it
+if TYPE_CHECKING:
+    from ai2021.group33.LazySortedBids import LazySortedBids
+
+
+class ConcessionCursor:
+    '''
+    A position in a {@link SortedBids} or {@link LazySortedBids} that only moves
+    down. Every step goes to the first bid of the next lower utility tier, found
+    with binary search on the sorted utilities, so a step is O(log N) and the
+    bids are never copied. Tiers are utilities rounded to
+    {@link SortedBids#TOLERANCE}, as the bids are ranked on, so float noise
+    between bids of equal Decimal utility never makes a step.
+    '''
+
+    def __init__(self, sortedBids:Union[SortedBids, "LazySortedBids"]):
+        '''
+        @param sortedBids the bids to walk through. The cursor starts at rank 0,
+        the bid with maximum utility.
+        '''
+        self._sortedBids = sortedBids
+        self._rank = 0
+
+    def getRank(self) -> int:
+        return self._rank
+
+    def getUtility(self) -> float:
+        '''
+        @return the utility of the bid at the cursor.
+        '''
+        return self._sortedBids.getUtility(self._rank)
+
+    def next(self) -> Optional[int]:
+        '''
+        Moves the cursor to the first bid of a lower tier than the current one.
+        @return the new rank, or None if there is no lower tier left. In that
+        case the cursor does not move.
+        '''
+        rank = self._sortedBids.firstBelow(SortedBids.tierFloor(self.getUtility()), self._rank + 1)
+        if rank >= self._sortedBids.size():
+            return None
+        self._rank = rank
+        return rank
@@ -0,0 +1,125 @@
+from collections import deque
+import threading
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+
+class EventQueue:
+    '''
+    Hands events from the connection's listener thread to one worker thread,
+    so that putting an event never waits for strategy work. Events are
+    handled in the order they were put. Bookkeeping events (of the coalesce
+    types) that follow each other in the queue are handled together in one
+    batch, so a batch never takes an event put after the next other event.
+    Every other event starts a new generation: events of the
+    cancellable types that are still queued are cancelled, as the protocol
+    has moved on, and the handler of a running event can see with
+    {@link #isCurrent} that its answer is no longer wanted. Cancelled events
+    stay in order and are given to onCancel instead of handle, for the
+    bookkeeping that must happen anyway.
+    '''
+
+    def __init__(self, handle:Callable[[Any], None], handleBatch:Callable[[List[Any]], None],
+                 coalesce:Tuple[type, ...], cancellable:Tuple[type, ...],
+                 onCancel:Optional[Callable[[Any], None]]=None,
+                 onError:Optional[Callable[[Exception], None]]=None, name:str="events"):
+        '''
+        @param handle called on the worker with every event that is not coalesced
+        @param handleBatch called on the worker with consecutive coalesced
+               events, in the order they were put
+        @param coalesce the types of the bookkeeping events
+        @param cancellable the types of the events that a newer event cancels
+        @param onCancel called on the worker with every cancelled event
+        @param onError called on the worker with any exception of a handler
+        @param name the name of the worker thread
+        '''
+        self._handle = handle
+        self._handleBatch = handleBatch
+        self._coalesce = coalesce
+        self._cancellable = cancellable
+        self._condition = threading.Condition()
+        # (generation, event, cancelled), in the order put. The generation
+        # of a coalesced event is None.
+        self._queue:Deque[Tuple[Optional[int], Any, bool]] = deque()
+        self._generation = 0
+        self._onCancel = onCancel
+        self._onError = onError
+        self._running:Optional[int] = None
+        self._busy = False
+        self._closed = False
+        self._worker = threading.Thread(target=self._work, name=name, daemon=True)
+        self._worker.start()
+
+    def put(self, event:Any):
+        '''
+        Queues the event. Never blocks on the worker.
+        '''
+        with self._condition:
+            if isinstance(event, self._coalesce):
+                self._queue.append((None, event, False))
+            else:
+                self._generation += 1
+                self._queue = deque((generation, queued, cancelled or isinstance(queued, self._cancellable))
+                                    for generation, queued, cancelled in self._queue)
+                self._queue.append((self._generation, event, False))
+            self._condition.notify()
+
+    def isCurrent(self, generation:int) -> bool:
+        '''
+        @return true if no event was put after the one of the given generation.
+        '''
+        return generation == self._generation
+
+    def getRunning(self) -> Optional[int]:
+        '''
+        @return the generation of the event being handled, None if the worker
+        is handling a batch or idle.
+        '''
+        return self._running
+
+    def join(self, timeout:Optional[float]=None) -> bool:
+        '''
+        Waits until every event put so far has been handled.
+        @return false if that did not happen within the timeout.
+        '''
+        with self._condition:
+            return self._condition.wait_for(lambda: self._idle() or self._closed, timeout)
+
+    def close(self):
+        '''
+        Stops the worker once the event it is handling is done. Queued events
+        are dropped. Can be called from the worker itself.
+        '''
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._condition.notify_all()
+
+    def _idle(self) -> bool:
+        return len(self._queue) == 0 and not self._busy
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._running = None
+                self._busy = False
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: self._closed or len(self._queue) > 0)
+                if self._closed:
+                    return
+                batch = []
+                while len(self._queue) > 0 and self._queue[0][0] is None:
+                    batch.append(self._queue.popleft()[1])
+                item = self._queue.popleft() if not batch else None
+                if item is not None and not item[2]:
+                    self._running = item[0]
+                self._busy = True
+            try:
+                if batch:
+                    self._handleBatch(batch)
+                elif item is not None and not item[2]:
+                    self._handle(item[1])
+                elif item is not None and self._onCancel is not None:
+                    self._onCancel(item[1])
+            except Exception as e:
+                if self._onError is not None:
+                    self._onError(e)
@@ -1,6 +1,8 @@
-from typing import NewType, cast, Dict, List, Set, Collection
-from decimal import *
 from __future__ import annotations
+from typing import Dict, Iterable, Optional, Union
+from decimal import Decimal
+
+import numpy as np
 
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
@@ -10,71 +12,56 @@ from geniusweb.issuevalue.Value import Value
 from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
 from geniusweb.progress.Progress import Progress
 
+from ai2021.group33.BidSpace import BidSpace
+
 
 # Frequency Opponent Model
 class FrequencyOpponentModel(UtilitySpace):
-    __DECIMALS = '0.0001'; # rounding accuracy
-
-    def __init__(self, *args) -> None:
+    '''
+    Estimates the opponent's utility from how often it offered each value.
+    All issues are assumed to have equal weight; the utility of a value is the
+    fraction of the opponent's bids that contained it (see {@link #getFraction}),
+    and its share in the utility of a bid that fraction divided by the number
+    of issues (see {@link #getValueUtilities}), so bid utilities are in [0, 1].
+
+    The counts are kept in one preallocated integer array over the flat
+    (issue, value) numbering of a {@link BidSpace}. {@link #update} changes the
+    model in place in O(issues). Callers that need an immutable model use
+    {@link #snapshot} or {@link #withAction}, which copy only that array.
+    '''
+
+    def __init__(self, bidspace:Optional[BidSpace]=None, counts:Optional[np.ndarray]=None,
+                 total:int=0, resBid:Optional[Bid]=None) -> None:
         '''
-        Constructor. Assumes given frequency dictionary is equal to the available issues
+        Constructor. Use withDomain to make a usable model.
         Args:
-            domain (Domain)                      : the domain (duh)
-            freqs  (Dict[str, Dict[Value, int]]) : observed frequencies for all issues.
-            total  (Decimal)                     : total number of bids contained in freqs.  
-                                                   This is assumed to be equal to the sum of 
-                                                   integer values in (freqs) for each issue.
-            resBid (Bid)                         : Reservation bid. Can be None.
+            bidspace (BidSpace)   : encoding of the domain (duh)
+            counts   (np.ndarray) : observed frequencies of all (issue, value) pairs,
+                                    indexed as in bidspace.getOffsets(). Not copied.
+            total    (int)        : total number of bids contained in counts.
+            resBid   (Bid)        : Reservation bid. Can be None.
         '''
         super().__init__()
-        self.domain = None
-        self.bidFrequencies = None
-        self.totalBids = Decimal(0)
-        self.resBid = None
-        if len(args) == 4:
-            if isinstance(args[0], Domain) and isinstance(args[1], Dict[str, Dict[Value, int]]) and \
-               isinstance(args[2], Decimal) and isinstance(args[3], Bid):
-                if args[0] is None:
-                    raise NotImplementedError("Given domain is not initialized.")
-            self.domain = args[0]
-            self.bidFrequencies = args[1]
-            self.totalBids = args[2]
-            self.resBid = args[3]
+        self._bidspace = bidspace
+        self._counts = counts
+        if bidspace is not None and counts is None:
+            self._counts = np.zeros(bidspace.flatSize(), dtype=np.int64)
+        self._total = total
+        self._resBid = resBid
 
     def __hash__(self) -> int:
-        prime = 31
-        result = 1
-        result = result * prime + (0 if (self.bidFrequencies is None) else self.bidFrequencies.__hash__)
-        result = result * prime + (0 if (self.domain is None) else self.domain.__hash__)
-        result = result * prime + (0 if (self.totalBids is None) else self.totalBids.__hash__)
-        return result
+        return hash((self.getDomain(), self._total))
 
     def __repr__(self) -> str:
-        return "FrequencyOpponentModel[" + self.totalBids + "," + self.bidFrequencies + "]"
+        return "FrequencyOpponentModel[" + str(self._total) + "," + str(self._counts) + "]"
 
-    def __eq__(self, o: FrequencyOpponentModel) -> bool:
-        if self == o:
+    def __eq__(self, o: object) -> bool:
+        if self is o:
             return True
-        if o is None or type(self) != type(o):
-            return False
-        if self.bidFrequencies is None: 
-            if o.bidFrequencies is not None :
-                return False
-        elif o.bidFrequencies != self.bidFrequencies:
-            return False
-        if self.domain is None: 
-            if o.domain is not None:
-                return False
-        elif o.domain != self.domain:
+        if not isinstance(o, FrequencyOpponentModel):
             return False
-        if self.totalBids is None:
-            if o.totalBids is not None:
-                return False
-        elif o.totalBids != self.totalBids:
-            return False
-        return True
-        
-
+        return self.getDomain() == o.getDomain() and self._total == o._total and \
+            np.array_equal(self._counts, o._counts)
 
     def withDomain(self, newDomain:Domain, newResBid:Bid) -> FrequencyOpponentModel:
         '''
@@ -83,83 +70,141 @@ class FrequencyOpponentModel(UtilitySpace):
         '''
         if newDomain is None:
             raise NotImplementedError("Given domain is not initialized.")
-        # TODO Should debug here later, also maybe use available frequencies in some way
-        return FrequencyOpponentModel(newDomain, dict.fromkeys(list(newDomain.getIssues()), Dict[Value, int]), Decimal(0), newResBid)
-    
+        return FrequencyOpponentModel(BidSpace(newDomain), None, 0, newResBid)
 
     def withAction(self, action:Action, progress:Progress) -> FrequencyOpponentModel:
         '''
-        Update this with a new action that was done by the opponent. 
+        Update this with a new action that was done by the opponent.
         withDomain must be called before this
+        @return a new model, this one is not changed.
         '''
-        if self.domain is None:
-            raise NotImplementedError("Given domain is not initialized.")
+        self._checkDomain()
         if not isinstance(action, Offer):
             return self
-        bid = action.getBid()
-        newFreqs = self.cloneDict(self.bidFrequencies)
-        for issue in self.domain.getIssues():
-            freqs = newFreqs[issue]
-            value = bid.getValue(issue)
-            if value is not None:
-                oldfreq = freqs[value]
-                if oldfreq is None:
-                    oldfreq = 0
-                freqs[value] = oldfreq + 1
-        return FrequencyOpponentModel(self.domain, newFreqs, self.totalBids + Decimal(1), self.resBid)
+        return self.snapshot().update(action.getBid())
+
+    def update(self, bid:Bid) -> FrequencyOpponentModel:
+        '''
+        Counts the bid, in place. Values that are not in the domain are ignored.
+        @return this
+        '''
+        self._checkDomain()
+        for col, issue in enumerate(self._bidspace.getIssues()):
+            idx = self._bidspace.indexOf(col, bid.getValue(issue))
+            if idx is not None:
+                self._counts[self._bidspace.getOffsets()[col] + idx] += 1
+        self._total += 1
+        return self
+
+    def updateRow(self, row:np.ndarray) -> FrequencyOpponentModel:
+        '''
+        Counts a bid given as value indices (see {@link BidSpace#toRow}), in place.
+        @return this
+        '''
+        self._checkDomain()
+        self._counts[self._bidspace.getOffsets() + row] += 1
+        self._total += 1
+        return self
 
+    def snapshot(self) -> FrequencyOpponentModel:
+        '''
+        @return an independent copy of this model.
+        '''
+        self._checkDomain()
+        return FrequencyOpponentModel(self._bidspace, self._counts.copy(), self._total, self._resBid)
 
     def getCounts(self, issue:str) -> Dict[Value, int]:
         '''
         @param issue(Str): issue to get the frequency of
         @return (Dict[Value, int]): Dictionary of values and number of times they were used in previous bids.
         '''
-        if self.domain is None:
-            raise NotImplementedError("Given domain is not initialized.")
-        if issue not in self.bidFrequencies:
-            return Dict(None, 0)
-        return self.bidFrequencies[issue]
-
+        self._checkDomain()
+        issues = self._bidspace.getIssues()
+        if issue not in issues:
+            return {}
+        col = issues.index(issue)
+        offset = self._bidspace.getOffsets()[col]
+        return { value: int(self._counts[offset + idx])
+                 for idx, value in enumerate(self._bidspace.getValues(col)) }
+
+    def getTotal(self) -> int:
+        '''
+        @return the number of bids counted.
+        '''
+        return self._total
 
-    def getFraction(self, issue:str, value:Value) -> Decimal:
-        if self.totalBids == Decimal(0):
-            return Decimal(1)
-        freq = self.bidFrequencies[issue][value]
-        # TODO can freqs be None??
-        if freq is None:
-            freq = 0
-        return Decimal(freq) / Decimal(len(self.bidFrequencies)).quantize(FrequencyOpponentModel.__DECIMALS, rounding=ROUND_HALF_UP)
+    def getFraction(self, issue:str, value:Value) -> float:
+        '''
+        @return fraction in [0, 1] of the counted bids that had the value for
+        the issue, 1 if no bids were counted yet. Not divided by the number
+        of issues, unlike {@link #getValueUtilities}.
+        '''
+        if self._total == 0:
+            return 1.0
+        return self.getCounts(issue).get(value, 0) / self._total
 
+    def getValueUtilities(self) -> np.ndarray:
+        '''
+        @return float array, in the flat numbering, of the fraction (see
+        {@link #getFraction}) of every (issue, value) pair divided by the
+        number of issues. The estimated utility of a bid is the sum of these
+        over its values.
+        '''
+        self._checkDomain()
+        nIssues = len(self._bidspace.getIssues())
+        if self._total == 0:
+            return np.full(len(self._counts), 1.0 / max(nIssues, 1))
+        return self._counts / float(self._total * nIssues)
 
-    def getUtility(self, bid:Bid ) -> Decimal:
-        if self.domain is None:
-            raise NotImplementedError("Given domain is not initialized.")
-        if self.totalBids == Decimal(0):
+    def getUtility(self, bid:Bid) -> Decimal:
+        '''
+        @return the estimated utility of the bid, in [0, 1]. A Decimal, as
+        UtilitySpace requires, but computed in float; {@link #getUtilities}
+        returns floats.
+        '''
+        self._checkDomain()
+        if self._total == 0:
             return Decimal(1)
-        sum = Decimal(0)
-        # Assume all issues have equal weight (might change it later)
-        for issue in self.domain.getIssues():
-            if issue in bid.getIssues():
-                sum += self.getFraction(issue, bid.getValue(issue))
-        return sum / self.totalBids.quantize(FrequencyOpponentModel.__DECIMALS, rounding=ROUND_HALF_UP)
-
-
-    def cloneDict(self, freqs:Dict[str, Dict[Value, int]]) -> Dict[str, Dict[Value, int]]:
-        newDict = {}
-        for issue in freqs.keys:
-            newDict2 = {}
-            for value in freqs[issue].keys:
-                newDict2[value] = freqs[issue][value]
-            newDict[issue] = newDict2
-        return newDict
+        count = 0
+        for col, issue in enumerate(self._bidspace.getIssues()):
+            idx = self._bidspace.indexOf(col, bid.getValue(issue))
+            if idx is not None:
+                count += int(self._counts[self._bidspace.getOffsets()[col] + idx])
+        return Decimal(count / (self._total * len(self._bidspace.getIssues())))
+
+    def getUtilities(self, bids:Union[np.ndarray, Iterable[Bid]]) -> np.ndarray:
+        '''
+        @param bids either an index matrix with one row of value indices per bid
+               (see {@link BidSpace#indexMatrix}), or Bids. Bids that are partial
+               or have values that are not in the domain get utility 0.
+        @return float array of the estimated utilities of all bids, in one
+        vectorized pass.
+        '''
+        self._checkDomain()
+        valueUtils = self.getValueUtilities()
+        offsets = self._bidspace.getOffsets()
+        if isinstance(bids, np.ndarray):
+            return valueUtils[offsets + bids].sum(axis=1)
+        rows = [self._bidspace.toRow(bid) for bid in bids]
+        utils = np.zeros(len(rows), dtype=np.float64)
+        valid = [idx for idx, row in enumerate(rows) if row is not None]
+        if len(valid) > 0:
+            utils[valid] = valueUtils[offsets + np.array([rows[idx] for idx in valid])].sum(axis=1)
+        return utils
 
     def getName(self) -> str:
-        if self.domain is None:
-            raise NotImplementedError("Given domain is not initialized.")
-        return "Frequency Opponent Model " + self.__hash__ + " For " + self.domain
-    
+        self._checkDomain()
+        return "Frequency Opponent Model " + str(hash(self)) + " For " + str(self.getDomain())
+
     def getDomain(self) -> Domain:
-        return self.domain
-    
+        return None if self._bidspace is None else self._bidspace.getDomain()
+
+    def getBidSpace(self) -> BidSpace:
+        return self._bidspace
+
     def getReservationBid(self) -> Bid:
-        return self.resBid
+        return self._resBid
+
+    def _checkDomain(self):
+        if self._bidspace is None:
+            raise NotImplementedError("Given domain is not initialized.")
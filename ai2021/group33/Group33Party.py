@@ -1,22 +1,21 @@
+from concurrent.futures import Future
 import logging
-from random import randint
+import os
+from random import randrange
+import tempfile
+import time
+import threading
 import traceback
-from typing import cast, Dict, List, Set, Collection
+from typing import cast, Deque, Dict, List, Set, Collection, Tuple, TYPE_CHECKING
 
 from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
-from geniusweb.actions.LearningDone import LearningDone
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
-from geniusweb.actions.Vote import Vote
-from geniusweb.actions.Votes import Votes
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
-from geniusweb.inform.OptIn import OptIn
 from geniusweb.inform.Settings import Settings
-from geniusweb.inform.Voting import Voting
 from geniusweb.inform.YourTurn import YourTurn
 from geniusweb.issuevalue.Bid import Bid
 from geniusweb.issuevalue.Domain import Domain
@@ -31,7 +30,47 @@ from geniusweb.utils import val
 
 from collections import deque
 
+import numpy as np
+
+from ai2021.group33.AcceptanceContext import AcceptanceContext
+from ai2021.group33.BandIndex import BandIndex
+from ai2021.group33.BidCodec import BidCodec
+from ai2021.group33.BidSpace import BidSpace
+from ai2021.group33.ConcessionCursor import ConcessionCursor
+from ai2021.group33.RankingMemo import RankingMemo
+from ai2021.group33.ScoringProfile import ScoringProfile
+from ai2021.group33.SortedBids import SortedBids
+from ai2021.group33.TurnScheduler import TurnScheduler
+from ai2021.group33.UtilityCache import UtilityCache
+from ai2021.group33.WindowStats import WindowStats
+
+# Only needed for the Learn and MOPAC protocols, for recording, with parameters
+# that are off by default, or once the first offer is out: imported where used
+# so that starting a party does not pay for them. party.preload imports them
+# up front for the processes that run many sessions.
+if TYPE_CHECKING:
+    from geniusweb.actions.Votes import Votes
+    from geniusweb.inform.Voting import Voting
+    from ai2021.group33.EventQueue import EventQueue
+    from ai2021.group33.Metrics import Metrics
+    from ai2021.group33.NeighbourIndex import NeighbourIndex
+    from ai2021.group33.OpponentModelRegistry import OpponentModelRegistry
+    from ai2021.group33.ParetoIndex import ParetoIndex
+    from ai2021.group33.SessionRecorder import SessionRecorder
+
+# Defaults of the strategy parameters, see _readParameters
 DEQUE_SIZE = 5
+HIGH_TIME = 0.99
+EARLY_BID_TIME = 0.09
+COMBI_TIME = 0.5
+OFFER_ATTEMPTS = 20
+# Bid spaces larger than this are not enumerated and sorted but walked lazily
+MAX_SORTED_BIDS = 1000000
+# Where the metrics go if the instrument parameter is set but metricsFile is not:
+# the temp directory, not the working directory of whoever runs the session
+METRICS_FILE = os.path.join(tempfile.gettempdir(), "group33metrics.jsonl")
+# The Pareto index is rebuilt once the opponents made this factor more offers
+PARETO_GROWTH = 1.1
 
 class Group33Party(DefaultParty):
     """
@@ -44,46 +83,177 @@ class Group33Party(DefaultParty):
         self._lastReceivedBid:Bid = None
 
         # Acceptance Strategy params
-        self.highTime = 0.99
-        self.bidsBuffer = []
+        self.highTime = HIGH_TIME
+        self.combiTime = COMBI_TIME
+        # Bidding Strategy params
+        self.dequeSize = DEQUE_SIZE
+        self.earlyBidTime = EARLY_BID_TIME
+        self.offerAttempts = OFFER_ATTEMPTS
+        # utilities of the received bids, keyed on progress at arrival
+        self._receivedStats = WindowStats()
         self.max_util = 1
         self.max_bid = None
-        self.utils = []
-        self.bestBids = deque([])
+        # codes (see BidSpace) of the bids we concede over, decoded by _codec
+        self.bestBids:Deque[int] = deque([])
+        self._codec:BidCodec = None
+        self._bands:BandIndex = None
+        self._neighbours:"NeighbourIndex" = None
+        self._pareto:"ParetoIndex" = None
+        self._paretoFuture:Future = None
+        # opponent offers and parties the Pareto index was built with
+        self._paretoBuild = (0, 0)
         self.tempFlag = False
+        self.powerParty = []
+        self._scoring:ScoringProfile = None
+        self._scoringLock = threading.Lock()
+        self._sortedBidsFuture:Future = None
+        # the sorted bids if they were ready at the start of this turn, see _pollSortedBids
+        self._sortedReady = None
+        # the error of the sort, once logged
+        self._sortError:Exception = None
+        self._greedyBid:Bid = None
+        self._metrics:"Metrics" = None
+        self._opponents:"OpponentModelRegistry" = None
+        # (actor, bid) of the offers counted by the opponent models this round
+        self._counted:Set[Tuple[PartyId, Bid]] = set()
+        # (actor, bid, reason) for every offer in the last Voting
+        self._voteReasons:List[Tuple[PartyId, Bid, str]] = []
+        # our votes of this round, None until we voted in it
+        self._lastvotes:"Votes" = None
+        self._utilityCache = UtilityCache(lambda bid: self._getScoring().utility(bid))
+        # hands infos to a worker thread when the eventQueue parameter is set
+        self._events:"EventQueue" = None
+        # writes all infos and actions when the recordFile parameter is set
+        self._recorder:"SessionRecorder" = None
 
     # Override
     def notifyChange(self, info: Inform):
         #self.getReporter().log(logging.INFO,"received info:"+str(info))
+        if self._recorder is not None:
+            self._recorder.recordInform(info)
+        if self._events is not None and not isinstance(info, Settings):
+            self._events.put(info)
+        else:
+            self._handle(info)
+
+    def _handle(self, info: Inform):
+        if self._recorder is not None:
+            # encode what the listener recorded here, on the worker if any
+            self._recorder.flush()
         if isinstance(info,Settings) :
             self._settings:Settings=cast(Settings,info)    
             self._me = self._settings.getID()
             self._protocol:str = str(self._settings.getProtocol().getURI())
             self._progress = self._settings.getProgress()
+            self._scheduler = TurnScheduler(self._progress)
+            self._readParameters()
+            recordFile = self._settings.getParameters().get("recordFile")
+            if isinstance(recordFile, str):
+                from ai2021.group33.SessionRecorder import SessionRecorder
+                self._recorder = SessionRecorder(recordFile,
+                    lambda: self._getBidSpace() if self._profile is not None else None)
+                self._recorder.recordInform(info)
             if "Learn" ==  self._protocol:
-                self.getConnection().send(LearningDone(self._me)) #type:ignore
+                from geniusweb.actions.LearningDone import LearningDone
+                self._send(LearningDone(self._me)) #type:ignore
             else:
                 self._profile = ProfileConnectionFactory.create(info.getProfile().getURI(), self.getReporter())
+                if self._settings.getParameters().get("instrument") is True:
+                    self._instrument()
+                if self._settings.getParameters().get("eventQueue") is True:
+                    from geniusweb.inform.OptIn import OptIn
+                    from geniusweb.inform.Voting import Voting
+                    from ai2021.group33.EventQueue import EventQueue
+                    self._events = EventQueue(lambda event: self._handle(event), self._handleOffers,
+                                              (ActionDone,), (YourTurn, Voting, OptIn),
+                                              onCancel=self._cancelled, onError=self._failed,
+                                              name="Group33Party-events")
+                self._startSorting()
         elif isinstance(info, ActionDone):
-            action:Action=cast( ActionDone,info).getAction()
-            if isinstance(action, Offer):
-                self._lastReceivedBid = cast(Offer, action).getBid()
-                self.bidsBuffer.append(self._lastReceivedBid)
+            self._handleOffers([info])
         elif isinstance(info, YourTurn):
+            self._lastvotes = None
+            self._counted.clear()
             self._myTurn()
-            if isinstance(self._progress, ProgressRounds) :
-                self._progress = self._progress.advance()
+            self._advance()
         elif isinstance(info, Finished):
+            if self._metrics is not None:
+                path = self._settings.getParameters().get("metricsFile")
+                self._metrics.dump(path if isinstance(path, str) else METRICS_FILE, str(self._me))
             self.terminate()
-        elif isinstance(info, Voting):
+        else:
+            self._handleMopac(info)
+
+    def _handleMopac(self, info: Inform):
+        from geniusweb.inform.OptIn import OptIn
+        from geniusweb.inform.Voting import Voting
+        if isinstance(info, Voting):
             # MOPAC protocol
             self._lastvotes = self._vote(cast(Voting, info));
-            val(self.getConnection()).send(self._lastvotes)
+            self._send(self._lastvotes)
         elif isinstance(info, OptIn):
-            val(self.getConnection()).send(self._lastvotes)
+            if self._lastvotes is not None:
+                self._send(self._lastvotes)
         else:
             self.getReporter().log(logging.WARNING, "Ignoring unknown info "+str(info))
 
+    def _handleOffers(self, informs:List[ActionDone]):
+        '''
+        Bookkeeping of the offers of the other parties: all offers in the
+        informs are scored in one vectorized call.
+        '''
+        if self._recorder is not None:
+            self._recorder.flush()
+        offers = [cast(Offer, action) for action in (inform.getAction() for inform in informs)
+                  if isinstance(action, Offer)]
+        if len(offers) == 0:
+            return
+        self._lastReceivedBid = offers[-1].getBid()
+        if self._profile is None:
+            return
+        utils = self._utilities([offer.getBid() for offer in offers])
+        progress = self._progressFraction()
+        for offer, util in zip(offers, utils):
+            self._receivedStats.append(progress, float(util))
+            self._countOffer(offer.getActor(), offer.getBid())
+
+    def _advance(self):
+        if isinstance(self._progress, ProgressRounds) :
+            self._progress = self._progress.advance()
+            self._scheduler.setProgress(self._progress)
+
+    def _cancelled(self, info: Inform):
+        '''
+        Called for a YourTurn, Voting or OptIn that was superseded before it
+        was handled. Only the round count is kept, and the votes of an
+        earlier round are not sent at the next OptIn.
+        '''
+        from geniusweb.inform.Voting import Voting
+        self.getReporter().log(logging.WARNING, "Skipping superseded info "+str(info))
+        if isinstance(info, YourTurn):
+            self._lastvotes = None
+            self._counted.clear()
+            self._advance()
+        elif isinstance(info, Voting):
+            self._lastvotes = None
+
+    def _failed(self, error:Exception):
+        self.getReporter().log(logging.WARNING, "Failed to handle info: "+traceback.format_exc())
+
+    def _send(self, action:Action):
+        '''
+        Sends the action, unless it answers an info that a newer info has
+        superseded while it was computed.
+        '''
+        if self._events is not None:
+            running = self._events.getRunning()
+            if running is not None and not self._events.isCurrent(running):
+                self.getReporter().log(logging.WARNING, "Dropping superseded action "+str(action))
+                return
+        if self._recorder is not None:
+            self._recorder.recordAction(action)
+        val(self.getConnection()).send(action)
+
 
     # Override
     def getCapabilities(self) -> Capabilities:
@@ -93,165 +263,526 @@ class Group33Party(DefaultParty):
     def getDescription(self) -> str:
         return "Offers varying bids, starting from the maximum utility, and gradually reducing " \
                "the target utility in order to secure an agreement. Uses a combined acceptance " \
-               "criterions. Parameters minPower and maxPower can be used to control voting behaviour."
+               "criterions. Parameters minPower and maxPower can be used to control voting behaviour. " \
+               "Parameters highTime, combiTime, earlyBidTime (progress fractions) and dequeSize " \
+               "tune the strategy; offerAttempts only matters while the bids are not sorted. " \
+               "Parameter rankingCache names a directory where sorted bids are kept between sessions " \
+               "(at most rankingCacheSize bytes). Parameter instrument=true times the hot paths and " \
+               "appends them to metricsFile (.jsonl or .csv, default group33metrics.jsonl in the " \
+               "temp directory) when the session is finished. " \
+               "Parameter eventQueue=true handles infos on a worker thread, so notifyChange never " \
+               "blocks; offers are then scored in batches and superseded turns are skipped. " \
+               "Parameter recordFile names a file where all infos and actions are recorded in binary, " \
+               "to be replayed with SessionReplayer."
 
     # Override
     def terminate(self):
         self.getReporter().log(logging.INFO,"party is terminating:")
         super().terminate()
+        if self._events is not None:
+            self._events.close()
+        if self._recorder is not None:
+            self._recorder.close()
         if self._profile != None:
             self._profile.close()
             self._profile = None
 
 
+    def _readParameters(self):
+        '''
+        Reads the strategy parameters from the settings. Missing parameters,
+        and ones of the wrong type or out of range, keep their default.
+        '''
+        params = self._settings.getParameters()
+        def fraction(name:str, default:float) -> float:
+            val = params.get(name)
+            return float(val) if isinstance(val, (int, float)) and not isinstance(val, bool) \
+                and 0 <= val <= 1 else default
+        def count(name:str, default:int) -> int:
+            val = params.get(name)
+            return val if isinstance(val, int) and not isinstance(val, bool) and val >= 1 else default
+        self.highTime = fraction("highTime", HIGH_TIME)
+        self.combiTime = fraction("combiTime", COMBI_TIME)
+        self.earlyBidTime = fraction("earlyBidTime", EARLY_BID_TIME)
+        self.dequeSize = count("dequeSize", DEQUE_SIZE)
+        self.offerAttempts = count("offerAttempts", OFFER_ATTEMPTS)
+
     def _myTurn(self):
-        if self._isGood(self._lastReceivedBid):
+        started = self._scheduler.start()
+        self._checkProfile()
+        self._pollSortedBids()
+        if self.max_bid is not None and self._scheduler.isTight():
+            self._quickTurn()
+        else:
+            self._fullTurn()
+        self._scheduler.finish(started)
+
+    def _quickTurn(self):
+        '''
+        Turn for when the deadline is too close for a full turn: does not move
+        the concession window or score anything, but accepts if the received
+        bid is at least as good as the worst bid in bestBids, and else offers
+        one of the bestBids. The worst bid in bestBids is the last one added,
+        so its utility is max_util, the stored utility of its tier; bids of
+        that tier count as good as it, see {@link SortedBids#tierFloor}.
+        '''
+        if self._lastReceivedBid is not None and \
+                self._utility(self._lastReceivedBid) >= SortedBids.tierFloor(self.max_util):
             action = Accept(self._me, self._lastReceivedBid)
         else:
-            for _attempt in range(20):
-                bid = self._getBid(self._profile.getProfile().getDomain())
-                if self._isGood(bid):
+            action = Offer(self._me, self._codec.decode(self.bestBids[randrange(len(self.bestBids))]))
+        self._send(action)
+
+    def _fullTurn(self):
+        context = self._acceptanceContext()
+        if self._isGood(self._lastReceivedBid, context=context):
+            action = Accept(self._me, self._lastReceivedBid)
+        else:
+            action = Offer(self._me, self._goodBid(context))
+        self._send(action)
+
+    def _goodBid(self, context:AcceptanceContext) -> Bid:
+        '''
+        @return our next bid, moved towards the last received offer (see
+        _towardsOpponent), if it passes the context, else a random one of the
+        Pareto bids that pass it, or if there are no opponent estimates, a
+        random bid that passes it from the band index. Only without a band
+        index (bids not sorted yet, or sorted lazily) _getBid is tried up to
+        offerAttempts times instead. The last bid is returned if none passes.
+        '''
+        domain = self._getScoring().getDomain()
+        bid = self._getBid(domain)
+        if self._isGood(bid, context=context):
+            return self._towardsOpponent(bid)
+        if self._bands is None:
+            for _attempt in range(self.offerAttempts - 1):
+                bid = self._getBid(domain)
+                if self._isGood(bid, context=context):
                     break
-            action = Offer(self._me, bid)
-        self.getConnection().send(action)
+            return bid
+        pareto = self._getPareto()
+        rank = pareto.sample(context.lowestGood()) if pareto is not None else None
+        if rank is None:
+            rank = self._bands.sample(context.lowestGood())
+        return bid if rank is None else self._sortedBids.getBid(rank)
 
-    def _isGood(self, bid:Bid, party=None)->bool:
+    def _towardsOpponent(self, bid:Bid) -> Bid:
+        '''
+        @return the bid closest (in number of differing issue values) to the
+        last offer we received, among the bids at least as good for us as
+        the given bid. The given bid if none is closer, or if there is no
+        neighbour index or received offer.
+        '''
+        if self._neighbours is None or self._lastReceivedBid is None:
+            return bid
+        bidspace = self._getBidSpace()
+        target = bidspace.toRow(self._lastReceivedBid)
+        own = bidspace.toRow(bid)
+        if target is None or own is None:
+            return bid
+        codes = self._neighbours.nearest(target, self._utility(bid), 1, self._neighbours.distance(target, own) - 1)
+        return bid if len(codes) == 0 else self._codec.decode(codes[0])
+
+    def _getPareto(self) -> "ParetoIndex":
+        '''
+        @return the Pareto index of all our sorted bids against the estimated
+        utilities of the opponents, or None if the bids are not fully sorted
+        or no index was built yet. Frequency estimates change less with every
+        offer, so the index is only rebuilt when a party joined or the
+        opponents made PARETO_GROWTH times the offers it was built with:
+        O(log offers) rebuilds in a session. Rebuilds run on a worker thread
+        from a snapshot of the estimates, starting from the Pareto bids of
+        the previous index (see {@link ParetoIndex#skyline}); until one is
+        done the previous index is used.
+        '''
+        if self._paretoFuture is not None and self._paretoFuture.done():
+            self._pareto = self._paretoFuture.result()
+            self._paretoFuture = None
+        if self._bands is None or self._opponents is None or self._opponents.isEmpty():
+            return self._pareto
+        offers, parties = self._paretoBuild
+        if self._paretoFuture is None and (self._pareto is None or len(self._opponents.getParties()) != parties
+                                           or self._opponents.getOffers() >= offers * PARETO_GROWTH):
+            from ai2021.group33.ParetoIndex import ParetoIndex
+            sortedBids = self._bands.getSortedBids()
+            opponents = self._opponents
+            valueUtils = opponents.getValueUtilities()
+            previous = self._pareto
+            self._paretoBuild = (opponents.getOffers(), len(opponents.getParties()))
+            self._paretoFuture = self._background("pareto", lambda: ParetoIndex(
+                sortedBids.getUtilities(), opponents.estimateRows(sortedBids.getRows(), valueUtils), previous))
+        return self._pareto
+
+    def _isGood(self, bid:Bid, party=None, context:AcceptanceContext=None)->bool:
+        '''
+        @param bid the bid to check
+        @param party the actor that offered the bid, or None
+        @param context the acceptance snapshot to check against. If None, a new
+               one is computed, which moves the concession window.
+        '''
         if bid == None:
             return False
-        profile = self._profile.getProfile()
-        if isinstance(profile, UtilitySpace):
-            curProgress = self._progress.getCurrentRound() -1
+        if context is None:
+            context = self._acceptanceContext()
+        return context.isGood(self._utility(bid), party)
+
+    def _acceptanceContext(self) -> AcceptanceContext:
+        '''
+        Computes the utility of our next bid and the statistics of the received
+        bids in the time window once, so that any number of offers can be
+        checked against them. Moves the concession window like one _getBid call.
+        The window of received bids is moved on every call, also before the
+        combi phase, so bids that can never be in it are dropped right away.
+        '''
+        scoring = self._getScoring()
+        if not isinstance(scoring.getProfile(), UtilitySpace):
+            raise Exception("Can not handle this type of profile")
+        nextUtil = self._utility(self._getBid(scoring.getDomain()))
+        progress = self._progressFraction()
+        # The combi window holds the bids received in the last (1 - progress),
+        # up to and including now; it starts at 2 * combiTime - 1 at the earliest
+        self._receivedStats.advance(2 * max(progress, self.combiTime) - 1, float(np.nextafter(progress, np.inf)))
+        if progress < self.combiTime:
+            # Use next criterion
+            return AcceptanceContext(nextUtil)
+        # Use combi criterion
+        ac_time = progress >= self.highTime
+        leader = self.powerParty[0] if len(self.powerParty) == 1 else None
+        if self._receivedStats.count() > 0:
+            return AcceptanceContext(nextUtil, True, ac_time, self._receivedStats.max(),
+                                     self._receivedStats.average(), leader)
+        return AcceptanceContext(nextUtil, True, ac_time, leader=leader)
+
+    def _progressFraction(self) -> float:
+        '''
+        @return progress in the session. For rounds this is (round-1)/(rounds-1),
+        so it starts just below 0; for time it is the fraction of the time used.
+        '''
+        if isinstance(self._progress, ProgressRounds):
             totalDuration = self._progress.getDuration() - 1
-            if curProgress < 0.5*totalDuration:
-                # Use next criterion
-                nextBid = self._getBid(self._profile.getProfile().getDomain())
-                return profile.getUtility(bid) >= profile.getUtility(nextBid)
-            if curProgress >= 0.5*totalDuration:
-                # Use combi criterion
-                nextBid = self._getBid(self._profile.getProfile().getDomain())
-                ac_next = profile.getUtility(bid) >= profile.getUtility(nextBid)
-                ac_time = curProgress >= self.highTime
-                utils = []
-                windowStart = curProgress - (totalDuration - curProgress)
-                windowEnd = curProgress + 1
-                for bids in self.bidsBuffer[windowStart:windowEnd]:
-                    for oneBid in [bids]: # Assuming that in each time step, there will be
-                        # multiple bids
-                        utils.append(profile.getUtility(oneBid))
-                if len(utils) > 0:
-                    if party == self.powerParty[0] and len(self.powerParty) == 1: # If the party has
-                        # the most power, get maximum
-                        ac_combi = profile.getUtility(bid) >= max(utils)
-                    else: # If the party doesnt have the most power, get the average
-                        ac_combi = profile.getUtility(bid) >= sum(utils)/len(utils)
-                    return (ac_next or ac_time) and ac_combi
-                else:
-                    return False
-        raise Exception("Can not handle this type of profile")
+            if totalDuration <= 0:
+                return 1.0
+            return (self._progress.getCurrentRound() - 1) / totalDuration
+        return self._progress.get(round(time.time() * 1000))
+
+    def _utility(self, bid:Bid) -> float:
+        '''
+        @return our utility of the bid, from the LRU cache if possible.
+        '''
+        return self._utilityCache.get(bid)
 
     def _getBid(self, domain:Domain) -> Bid:
 
-        profile = self._profile.getProfile()
-        # In the first run of the function, calculate and store all bids with their utilities
+        # In the first run of the function, calculate and sort the utilities of all bids
         if self.max_bid == None:
-            # Get all bids
-            self.allBids = AllBidsList(domain)
-            # Calculate and store the utility of each bid
-            for bid in self.allBids:
-                self.utils.append(profile.getUtility(bid))
-
-           # Find the order in which the bids are sorted
-            self.order = [bid for _,bid in sorted(zip(self.utils,list(range(len(self.utils)))),
-                                                        reverse=True)]
-            # Sort the bids
-            self.allBids_temp = []
-            allBids_list =  list(self.allBids)
-            for i in range(len(self.order)):
-                self.allBids_temp.append(allBids_list[self.order[i]])
-            self.utils.sort(reverse=True)
-            self.allBids = self.allBids_temp
+            sortedBids = self._sortedReady
+            if sortedBids is None:
+                # Still being sorted, offer the maximum bid without waiting
+                return self._greedyMaxBid()
+            self._sortedBids = sortedBids
+            self._codec = sortedBids.getCodec()
+            self._bands = None
+            self._neighbours = None
+            if isinstance(sortedBids, SortedBids):
+                scoring = self._getScoring()
+                from ai2021.group33.NeighbourIndex import NeighbourIndex
+                self._bands = BandIndex(sortedBids)
+                self._neighbours = NeighbourIndex(sortedBids, scoring.getLookups() if scoring.isLinear() else None)
             # Get the maximum bid
             self.max_bid = self._get_max_bid(domain)
 
             # Initialize the bestBids deque
-            for _ in range(DEQUE_SIZE):
-                self.bestBids.append(self.max_bid)
+            code = self._sortedBids.getCode(self._cursor.getRank())
+            for _ in range(self.dequeSize):
+                self.bestBids.append(code)
 
-        curProgress = self._progress.getCurrentRound() - 1
-        totalDuration = self._progress.getDuration() - 1
         # If it's early in the negotiation just return max utility bid
-        if curProgress < 0.09*totalDuration:
+        if self._progressFraction() < self.earlyBidTime:
             return self.max_bid
         else:
             self.max_bid = self._get_bid_in_window(domain)
             return self.max_bid
 
+    def _instrument(self):
+        '''
+        Replaces the hot paths, and the profile fetch, by timed wrappers.
+        Only done when the instrument parameter is set, so uninstrumented
+        parties pay nothing.
+        '''
+        from ai2021.group33.Metrics import Metrics
+        metrics = Metrics()
+        self._metrics = metrics
+        for name in ["notifyChange", "_handle", "_handleOffers", "_myTurn", "_isGood", "_getBid", "_vote", "_sortBids"]:
+            setattr(self, name, metrics.timed(name, getattr(self, name)))
+        self._profile.getProfile = metrics.timed("getProfile", self._profile.getProfile)
+
+    def _startSorting(self):
+        '''
+        Starts sorting the bid space on a worker thread, so that it is done
+        (or at least under way) by the time of our first turn.
+        '''
+        self._sortedReady = None
+        self._sortedBidsFuture = self._background("sort", self._sortBids)
+
+    def _background(self, name:str, function) -> Future:
+        '''
+        Runs the function on a daemon thread.
+        @return the future of its result.
+        '''
+        future:Future = Future()
+        def work():
+            try:
+                future.set_result(function())
+            except Exception as e:
+                future.set_exception(e)
+        threading.Thread(target=work, name="Group33Party-" + name, daemon=True).start()
+        return future
+
+    def _sortBids(self):
+        '''
+        @return the bids sorted on our utility. Runs on the worker thread.
+        '''
+        scoring = self._getScoring()
+        bidspace = scoring.getBidSpace()
+        if not scoring.isLinear():
+            return SortedBids.fromProfile(scoring.getProfile(), bidspace)
+        lookups = list(scoring.getLookups())
+        if bidspace.size() > MAX_SORTED_BIDS:
+            # too large to enumerate, generate the best bids on demand
+            from ai2021.group33.LazySortedBids import LazySortedBids
+            return LazySortedBids(bidspace, lookups)
+        key = scoring.getKey()
+        # sorted before in this process, see party.preload
+        memo = RankingMemo.get(key)
+        if memo is not None:
+            return SortedBids(bidspace, *memo)
+        cacheDir = self._settings.getParameters().get("rankingCache")
+        cached = None
+        if isinstance(cacheDir, str):
+            from ai2021.group33.RankingCache import RankingCache
+            cacheSize = self._settings.getParameters().get("rankingCacheSize")
+            cache = RankingCache(cacheDir, cacheSize) if isinstance(cacheSize, int) else RankingCache(cacheDir)
+            cached = cache.load(key)
+        if cached is not None:
+            sortedBids = SortedBids(bidspace, *cached)
+        else:
+            sortedBids = SortedBids.fromLookups(bidspace, lookups)
+            if isinstance(cacheDir, str):
+                cache.store(key, sortedBids.getOrder(), sortedBids.getUtilities())
+        RankingMemo.put(key, sortedBids.getOrder(), sortedBids.getUtilities())
+        return sortedBids
+
+    def _pollSortedBids(self):
+        '''
+        Checks once per turn whether the bids are sorted, and sets
+        _sortedReady to them, or to None while they are not. Never waits
+        for a linear additive profile, whose turns offer the greedy max bid
+        meanwhile; waits for other profiles, as there is no cheap max bid
+        then. A failed sort is logged once; for a linear profile the turns
+        then keep offering the greedy max bid, else the error is raised.
+        '''
+        if self._sortedBidsFuture is None:
+            self._startSorting()
+        future = self._sortedBidsFuture
+        linear = self._getScoring().isLinear()
+        if linear and not future.done():
+            self._sortedReady = None
+            return
+        try:
+            self._sortedReady = future.result()
+        except Exception as e:
+            self._sortedReady = None
+            if self._sortError is not e:
+                self._sortError = e
+                self.getReporter().log(logging.WARNING, "Sorting the bids failed: " + repr(e))
+            if not linear:
+                raise
+
+    def _greedyMaxBid(self) -> Bid:
+        '''
+        @return the bid with maximum utility, made by taking the best value of
+        every issue. Takes O(values), no sorting needed.
+        '''
+        if self._greedyBid is None:
+            scoring = self._getScoring()
+            self._greedyBid = scoring.getBidSpace().toBid([int(np.argmax(table)) for table in scoring.getLookups()])
+        return self._greedyBid
+
     """
-    Returns in a random fashion the best 5 bids according to their utility. 
+    Returns one of the best 5 bids according to their utility, the one the opponents
+    are estimated to like most (random as long as there is no opponent model).
     The best 5 bids deteriorate over time, since the best bid is removed and one that is worse is added, to allow
     conceding.
     """
     def _get_bid_in_window(self, domain:Domain) -> Bid:
-        allBids = self.allBids
-        max_util = -1
-        max_bid = None
-        profile = self._profile.getProfile()
-        for idx, bid in enumerate(allBids):
-            util = self.utils[idx]
-            if util < self.max_util:
-                max_util = util
-                max_bid = bid
-                self.allBids = self.allBids[idx+1:]
-                self.utils = self.utils[idx+1:]
-                break
-
-        if max_bid is None:
-            return self.bestBids[randint(0, 4)]
+        rank = self._cursor.next()
+        if rank is None:
+            return self._pickFromWindow()
 
-        self.max_util = max_util
+        self.max_util = self._cursor.getUtility()
 
         self.bestBids.popleft()
-        self.bestBids.append(max_bid)
-        self.getReporter().log(logging.INFO,profile.getUtility(max_bid))
-        return self.bestBids[randint(0, 4)]
+        self.bestBids.append(self._sortedBids.getCode(rank))
+        if self._metrics is not None:
+            self.getReporter().log(logging.INFO, self.max_util)
+        return self._pickFromWindow()
+
+    def _pickFromWindow(self) -> Bid:
+        '''
+        @return the bid in the bestBids window that the opponents are estimated
+        to like most, or a random one if we did not see any opponent offers yet.
+        '''
+        if self._opponents is None or self._opponents.isEmpty():
+            return self._codec.decode(self.bestBids[randrange(len(self.bestBids))])
+        bidspace = self._getBidSpace()
+        rows = np.array([bidspace.row(code) for code in self.bestBids])
+        estimates = self._opponents.estimate(self._opponents.oneHot(rows))
+        return self._codec.decode(self.bestBids[int(np.argmax(estimates.mean(axis=1)))])
 
     """
     Returns the bid with maximum utility from the available bids
     """
     def _get_max_bid(self, domain:Domain) ->Bid:
-        allBids = self.allBids
-        max_util = -1
-        max_bid = None
-        for idx,bid in enumerate(allBids):
-            util = self.utils[idx]
-            if util > max_util:
-                max_util = util
-                max_bid = bid
+        self._cursor = ConcessionCursor(self._sortedBids)
+        self.max_util = self._cursor.getUtility()
+        return self._sortedBids.getBid(self._cursor.getRank())
+
+    def _getScoring(self) -> ScoringProfile:
+        '''
+        @return our profile, fetched from the profile connection and compiled
+        on first use. Shared by the worker thread and the turns.
+        '''
+        with self._scoringLock:
+            if self._scoring is None:
+                self._scoring = ScoringProfile(self._profile.getProfile())
+        return self._scoring
 
-        self.max_util = max_util
-        return max_bid
+    def _getBidSpace(self) -> BidSpace:
+        '''
+        @return the encoding of our domain.
+        '''
+        return self._getScoring().getBidSpace()
+
+    def _checkProfile(self):
+        '''
+        Checks, once per turn, whether the profile connection now returns
+        another profile than the one we compiled. GeniusWeb sends no inform
+        when the profile changes, so this is the change notification. The
+        profiles are compared on content, see {@link ScoringProfile#isSame}.
+        If it changed, everything derived from our utilities, including the
+        utilities of the received bids, is dropped and the bids are sorted
+        again. The opponent models only depend on the offers, so they are
+        kept unless the domain changed too.
+        '''
+        if self._scoring is None:
+            return
+        profile = self._profile.getProfile()
+        if profile is self._scoring.getProfile():
+            return
+        scoring = ScoringProfile(profile)
+        if scoring.isSame(self._scoring):
+            return
+        if scoring.getDomain() != self._scoring.getDomain():
+            self._opponents = None
+        with self._scoringLock:
+            self._scoring = scoring
+        self._utilityCache.clear()
+        self._receivedStats = WindowStats()
+        self._greedyBid = None
+        self.max_bid = None
+        self.max_util = 1
+        self.bestBids.clear()
+        self._bands = None
+        self._neighbours = None
+        self._pareto = None
+        self._paretoFuture = None
+        self._paretoBuild = (0, 0)
+        self._startSorting()
+
+    def _countOffer(self, actor:PartyId, bid:Bid):
+        '''
+        Counts the offer in the opponent models, once per round: in MOPAC the
+        offers of a round arrive as ActionDone and again in the Voting.
+        '''
+        if (actor, bid) in self._counted:
+            return
+        self._counted.add((actor, bid))
+        self._getOpponents().update(actor, bid)
+
+    def _getOpponents(self) -> "OpponentModelRegistry":
+        '''
+        @return the opponent models of all parties, made on first use.
+        '''
+        if self._opponents is None:
+            from ai2021.group33.OpponentModelRegistry import OpponentModelRegistry
+            self._opponents = OpponentModelRegistry(self._getBidSpace(), self._me)
+        return self._opponents
 
-    def _vote(self, voting:Voting) ->Votes :
+    def _vote(self, voting:"Voting") ->"Votes" :
         '''
         @param voting the {@link Voting} object containing the options
         
         @return our next Votes.
         '''
+        from geniusweb.actions.Vote import Vote
+        from geniusweb.actions.Votes import Votes
         val = self._settings.getParameters().get("minPower");
         minpower:int = val if isinstance(val, int) else 2
         val = self._settings.getParameters().get("maxPower");
         maxpower:int = val if isinstance(val,int) else  9999999;
 
-        # Get the party with most power
         if self.tempFlag == False:
             self.tempFlag = True
+        self._pollSortedBids()
         self.powers = voting.getPowers()
-        self.powerParty = [key for key, value in self.powers.items() if value == max(
-            self.powers.values())]
-
-        votes:Set[Vote]  = set([Vote(self._me, offer.getBid(), minpower, maxpower)\
-                for offer in voting.getOffers() if self._isGood(offer.getBid(),
-                                                                party=offer.getActor()
-                                                                )
-                                ])
+        # Get the party with most power
+        self.powerParty = self._powerLeaders(self.powers)
+
+        # Group the offers on bid, so that every bid is scored once
+        actors:Dict[Bid, List[PartyId]] = {}
+        for offer in voting.getOffers():
+            self._countOffer(offer.getActor(), offer.getBid())
+            actors.setdefault(offer.getBid(), []).append(offer.getActor())
+
+        context = self._acceptanceContext()
+        bids = list(actors.keys())
+        utils = self._utilities(bids)
+        leader = context.getLeader()
+        leaderOnly = np.array([leader is not None and all(actor == leader for actor in actors[bid])
+                               for bid in bids], dtype=bool)
+        good = context.areGood(utils, leaderOnly)
+
+        self._voteReasons = [ (actor, bid, context.reason(float(util), actor))
+                              for bid, util in zip(bids, utils) for actor in actors[bid] ]
+        if self._metrics is not None:
+            for actor, bid, reason in self._voteReasons:
+                self.getReporter().log(logging.INFO, str(actor) + " " + str(bid) + ": " + reason)
+
+        votes:Set[Vote] = set(Vote(self._me, bid, minpower, maxpower)
+                              for bid, accept in zip(bids, good) if accept)
         return Votes(self._me, votes);
+
+    def _powerLeaders(self, powers:Dict[PartyId, int]) -> List[PartyId]:
+        '''
+        @return the parties with the most power.
+        '''
+        if len(powers) == 0:
+            return []
+        most = max(powers.values())
+        return [party for party, power in powers.items() if power == most]
+
+    def _utilities(self, bids:List[Bid]) -> np.ndarray:
+        '''
+        @return our utilities of the bids, scored in one vectorized call. Bids
+        with values outside our domain are scored one by one.
+        '''
+        bidspace = self._getBidSpace()
+        rows = [bidspace.toRow(bid) for bid in bids]
+        known = [idx for idx, row in enumerate(rows) if row is not None]
+        utils = np.empty(len(bids), dtype=np.float64)
+        if len(known) > 0:
+            utils[known] = self._getScoring().utilities(np.array([rows[idx] for idx in known]))
+        for idx, row in enumerate(rows):
+            if row is None:
+                utils[idx] = self._utility(bids[idx])
+        return utils
@@ -0,0 +1,143 @@
+from array import array
+from bisect import bisect_right
+import heapq
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from ai2021.group33.BidCodec import BidCodec
+from ai2021.group33.BidSpace import BidSpace
+
+
+class LazySortedBids:
+    '''
+    Same interface as {@link SortedBids}, but for linear additive profiles on
+    domains too large to enumerate. Bids are generated in descending utility
+    order on demand with a best-first walk: the values of every issue are sorted
+    on weighted utility, and a priority queue holds the frontier of value
+    position tuples. Every tuple has exactly one parent (decrement its last
+    non-zero position) so nothing is generated twice, and a child never has a
+    higher utility than its parent.
+    The consumed bids are kept in flat arrays: the value indices of all rows
+    back to back, in the smallest integer type that fits, and the utilities as
+    doubles. Memory is proportional to the number of bids consumed times the
+    number of issues, without an object per bid.
+    '''
+
+    def __init__(self, bidspace:BidSpace, lookups:List[np.ndarray]):
+        '''
+        @param bidspace the bid space
+        @param lookups per issue the weighted utility of every value, see
+        {@link BidSpace#lookups}
+        '''
+        self._bidspace = bidspace
+        # per issue the value indices, best value first, and their utilities
+        self._perms = [np.argsort(-table, kind='stable') for table in lookups]
+        self._vals = [table[perm].tolist() for table, perm in zip(lookups, self._perms)]
+        self._size = bidspace.size()
+
+        self._issues = len(lookups)
+        largest = int(bidspace.getSizes().max()) if self._issues > 0 else 1
+        self._rows = array('B' if largest <= 1 << 8 else 'H' if largest <= 1 << 16 else 'q')
+        self._utils = array('d')
+        self._keys = array('d')  # negated utilities, ascending, for bisect
+        self._codec = BidCodec(bidspace)
+
+        root = tuple([0] * len(self._vals))
+        self._counter = 0
+        self._heap:List[Tuple[float, int, Tuple[int, ...]]] = []
+        if self._size > 0:
+            self._push(root)
+
+    @staticmethod
+    def fromProfile(profile:LinearAdditive, bidspace:Optional[BidSpace]=None) -> "LazySortedBids":
+        if bidspace is None:
+            bidspace = BidSpace(profile.getDomain())
+        return LazySortedBids(bidspace, bidspace.lookups(profile))
+
+    def getBidSpace(self) -> BidSpace:
+        return self._bidspace
+
+    def size(self) -> int:
+        '''
+        @return total number of bids, consumed or not.
+        '''
+        return self._size
+
+    def getUtilities(self) -> np.ndarray:
+        '''
+        @return the utilities of the bids consumed so far, in descending order.
+        '''
+        return np.array(self._utils, dtype=np.float64)
+
+    def getUtility(self, rank:int) -> float:
+        self._fill(rank)
+        return self._utils[rank]
+
+    def firstBelow(self, util:float, lo:int=0) -> int:
+        '''
+        @return the lowest rank >= lo with a utility strictly below util, or
+        size() if there is none. Generates more bids only if the answer is not
+        among the ones consumed already.
+        '''
+        if lo >= self._size:
+            return self._size
+        self._fill(lo)
+        rank = bisect_right(self._keys, -util, lo)
+        while rank == len(self._utils):
+            if not self._heap:
+                return self._size
+            self._pop()
+            if self._utils[-1] < util:
+                break
+            rank += 1
+        return rank
+
+    def getCode(self, rank:int) -> int:
+        return self._bidspace.codeOf(self.getRow(rank))
+
+    def getRow(self, rank:int) -> Tuple[int, ...]:
+        '''
+        @return the value indices of the bid at the given rank.
+        '''
+        self._fill(rank)
+        return tuple(self._rows[rank * self._issues:(rank + 1) * self._issues])
+
+    def getCodec(self) -> BidCodec:
+        return self._codec
+
+    def getBid(self, rank:int) -> Bid:
+        return self._codec.decode(self.getCode(rank))
+
+    def _fill(self, rank:int):
+        '''
+        Generates bids until the given rank is available.
+        '''
+        while len(self._utils) <= rank:
+            if not self._heap:
+                raise IndexError("rank " + str(rank) + " out of range")
+            self._pop()
+
+    def _push(self, positions:Tuple[int, ...]):
+        util = sum(vals[pos] for vals, pos in zip(self._vals, positions))
+        self._counter += 1
+        heapq.heappush(self._heap, (-util, self._counter, positions))
+
+    def _pop(self):
+        negutil, _, positions = heapq.heappop(self._heap)
+        self._utils.append(-negutil)
+        self._keys.append(negutil)
+        self._rows.extend(int(perm[pos]) for perm, pos in zip(self._perms, positions))
+        last = 0
+        for col in range(len(positions) - 1, -1, -1):
+            if positions[col] > 0:
+                last = col
+                break
+        for col in range(last, len(positions)):
+            if positions[col] + 1 < len(self._vals[col]):
+                child = list(positions)
+                child[col] += 1
+                self._push(tuple(child))
@@ -0,0 +1,108 @@
+import csv
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+
+class Histogram:
+    '''
+    Count, total and max of durations, plus counts per power of two
+    microseconds, so percentiles can be estimated without keeping samples.
+    Thread safe, as timed methods run on the listener and worker threads.
+    '''
+    BUCKETS = 40
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets:List[int] = [0] * Histogram.BUCKETS
+        self._lock = threading.Lock()
+
+    def add(self, seconds:float):
+        bucket = min(int(seconds * 1e6).bit_length(), Histogram.BUCKETS - 1)
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self.buckets[bucket] += 1
+
+    def percentile(self, p:float) -> float:
+        '''
+        @return upper bound in seconds of the bucket holding the p-th percentile.
+        '''
+        if self.count == 0:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def toDict(self) -> Dict[str, Any]:
+        with self._lock:
+            return { "count": self.count, "total": self.total, "mean": self.total / self.count if self.count else 0.0,
+                     "max": self.max, "p50": self.percentile(50), "p99": self.percentile(99) }
+
+
+class Metrics:
+    '''
+    Low overhead call counts and latency histograms, keyed by name. Methods are
+    instrumented by replacing them with a {@link #timed} wrapper, so when
+    instrumentation is off nothing is wrapped and nothing is paid.
+    '''
+
+    def __init__(self):
+        self._histograms:Dict[str, Histogram] = {}
+        self._start = time.time()
+
+    def record(self, name:str, seconds:float):
+        self._histograms.setdefault(name, Histogram()).add(seconds)
+
+    def timed(self, name:str, function:Callable) -> Callable:
+        '''
+        @return function wrapped so that every call is timed under name.
+        '''
+        histogram = self._histograms.setdefault(name, Histogram())
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.add(time.perf_counter() - start)
+        return wrapper
+
+    def toRecord(self, session:str) -> Dict[str, Any]:
+        '''
+        @return all metrics as one flat record for the session.
+        '''
+        record:Dict[str, Any] = { "session": session, "start": self._start, "duration": time.time() - self._start }
+        for name, histogram in sorted(self._histograms.items()):
+            for key, value in histogram.toDict().items():
+                record[name + "." + key] = value
+        return record
+
+    def dump(self, path:str, session:str):
+        '''
+        Appends the record of the session to the file: a CSV row if the file
+        name ends with .csv (header written when the file is new), else a line
+        of JSON.
+        '''
+        record = self.toRecord(session)
+        if path.endswith(".csv"):
+            isNew = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=list(record.keys()))
+                if isNew:
+                    writer.writeheader()
+                writer.writerow(record)
+        else:
+            with open(path, "a") as file:
+                file.write(json.dumps(record) + "\n")
@@ -0,0 +1,95 @@
+from itertools import combinations
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ai2021.group33.SortedBids import SortedBids
+
+
+class NeighbourIndex:
+    '''
+    Finds the bids closest to a given bid, in Hamming distance over the issue
+    values, among those with our utility >= u. Bids are visited by increasing
+    distance without a scan of the bid space: a bid at distance d differs in d
+    issues, and since codes are mixed radix (see {@link BidSpace}) changing
+    the value of an issue adds a multiple of its stride to the code. The
+    utility of any code is one array lookup.
+    With the per-issue lookups of a linear profile, sets of issues that can
+    not reach u even with their best values are skipped. The number of bids
+    looked at is bounded, a skipped set of issues counting as one, so the
+    cost per query is too however many issues there are.
+    '''
+    # maximum number of bids and skipped sets of issues looked at in one query
+    BUDGET = 20000
+
+    def __init__(self, sortedBids:SortedBids, lookups:Optional[Sequence[np.ndarray]]=None):
+        '''
+        @param sortedBids all bids, fully sorted (not lazy)
+        @param lookups per issue the weighted utility of every value, see
+               {@link BidSpace#lookups}. Only used to skip hopeless issues,
+               None for profiles that are not linear.
+        '''
+        bidspace = sortedBids.getBidSpace()
+        self._sizes = bidspace.getSizes().astype(np.int64)
+        self._strides = np.ones(len(self._sizes), dtype=np.int64)
+        for col in range(len(self._sizes) - 2, -1, -1):
+            self._strides[col] = self._strides[col + 1] * self._sizes[col + 1]
+        # our utility of every bid, indexed by code
+        self._utils = np.empty(sortedBids.size(), dtype=np.float64)
+        self._utils[np.asarray(sortedBids.getOrder(), dtype=np.int64)] = sortedBids.getUtilities()
+        self._lookups = lookups
+
+    def getUtility(self, code:int) -> float:
+        return float(self._utils[code])
+
+    def distance(self, row1, row2) -> int:
+        return int(np.count_nonzero(np.asarray(row1) != np.asarray(row2)))
+
+    def nearest(self, row, util:float, k:int=1, maxDistance:Optional[int]=None,
+                budget:Optional[int]=None) -> List[int]:
+        '''
+        @param row the value indices of the bid to search around
+        @param util the lowest utility for us
+        @param k the number of bids wanted
+        @param maxDistance the largest distance to search, all if None
+        @param budget the maximum number of bids and skipped sets of issues
+               to look at, BUDGET if None
+        @return the codes of at most k bids with utility >= util, closest
+        first and best for us first among equally close ones. Fewer if there
+        are no more within maxDistance or the budget ran out.
+        '''
+        row = np.asarray(row, dtype=np.int64)
+        issues = len(self._sizes)
+        maxDistance = issues if maxDistance is None else min(maxDistance, issues)
+        budget = self.BUDGET if budget is None else budget
+        base = int(row @ self._strides) if issues > 0 else 0
+        gains = None
+        if self._lookups is not None:
+            # the most each issue can add to the utility of the bid
+            gains = [float(table.max() - table[row[col]]) for col, table in enumerate(self._lookups)]
+        baseUtil = float(self._utils[base])
+
+        found:List[int] = []
+        seen = 0
+        for distance in range(maxDistance + 1):
+            codes = []
+            for issuesChanged in combinations(range(issues), distance):
+                if seen >= budget:
+                    break
+                if gains is not None and baseUtil + sum(gains[col] for col in issuesChanged) < util - 1e-9:
+                    seen += 1
+                    continue
+                candidates = np.array([base], dtype=np.int64)
+                for col in issuesChanged:
+                    others = np.arange(self._sizes[col])
+                    steps = (others[others != row[col]] - row[col]) * self._strides[col]
+                    candidates = (candidates[:, None] + steps[None, :]).ravel()
+                seen += len(candidates)
+                codes.append(candidates[self._utils[candidates] >= util])
+            if codes:
+                hits = np.concatenate(codes)
+                hits = hits[np.argsort(-self._utils[hits], kind='stable')]
+                found.extend(int(code) for code in hits[:k - len(found)])
+            if len(found) >= k or seen >= budget:
+                break
+        return found
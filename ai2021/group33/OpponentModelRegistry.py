@@ -0,0 +1,114 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.issuevalue.Bid import Bid
+
+from ai2021.group33.BidSpace import BidSpace
+from ai2021.group33.FrequencyOpponentModel import FrequencyOpponentModel
+
+
+class OpponentModelRegistry:
+    '''
+    One incrementally updated {@link FrequencyOpponentModel} per party. The
+    estimated utilities of all parties over a pool of candidate bids are
+    computed together: the pool is one-hot encoded over the flat
+    (issue, value) numbering once, and multiplied with the stacked value
+    utilities of all models, so scoring P parties costs one (N x D) x (D x P) matrix
+    product instead of a loop per party per bid.
+    '''
+
+    def __init__(self, bidspace:BidSpace, me:Optional[PartyId]=None):
+        '''
+        @param bidspace the encoding of the domain
+        @param me our own id. Our own offers are not modelled.
+        '''
+        self._bidspace = bidspace
+        self._me = me
+        self._models:Dict[PartyId, FrequencyOpponentModel] = {}
+        self._offers = 0
+
+    def update(self, party:PartyId, bid:Bid):
+        '''
+        Counts an offer of the party. Offers by ourselves and bids that are
+        not in the domain are ignored.
+        '''
+        if party is None or party == self._me or bid is None:
+            return
+        row = self._bidspace.toRow(bid)
+        if row is None:
+            return
+        model = self._models.get(party)
+        if model is None:
+            model = FrequencyOpponentModel(self._bidspace)
+            self._models[party] = model
+        model.updateRow(row)
+        self._offers += 1
+
+    def getParties(self) -> List[PartyId]:
+        '''
+        @return the modelled parties, in the column order of {@link #estimate}.
+        '''
+        return list(self._models.keys())
+
+    def getModel(self, party:PartyId) -> Optional[FrequencyOpponentModel]:
+        return self._models.get(party)
+
+    def isEmpty(self) -> bool:
+        return len(self._models) == 0
+
+    def getOffers(self) -> int:
+        '''
+        @return the number of offers counted by all models together.
+        '''
+        return self._offers
+
+    def oneHot(self, matrix:np.ndarray) -> np.ndarray:
+        '''
+        @param matrix index matrix of the candidate pool, one row per bid
+        @return the (N x D) one-hot encoding of the pool. Callers that score
+        the same pool repeatedly should keep this.
+        '''
+        onehot = np.zeros((len(matrix), self._bidspace.flatSize()), dtype=np.float32)
+        rows = np.repeat(np.arange(len(matrix)), matrix.shape[1])
+        onehot[rows, (self._bidspace.getOffsets() + matrix).ravel()] = 1.0
+        return onehot
+
+    def estimate(self, onehot:np.ndarray) -> np.ndarray:
+        '''
+        @param onehot one-hot encoded candidate pool, see {@link #oneHot}
+        @return (N x P) estimated utilities, one column per party in the order
+        of {@link #getParties}.
+        '''
+        if self.isEmpty():
+            return np.zeros((len(onehot), 0), dtype=np.float32)
+        return onehot @ self.getValueUtilities().T
+
+    def getValueUtilities(self) -> np.ndarray:
+        '''
+        @return (P x D) the value utilities of all models (see
+        {@link FrequencyOpponentModel#getValueUtilities}), one row per party in the
+        order of {@link #getParties}. A copy, so it can be used while the
+        models are updated.
+        '''
+        if self.isEmpty():
+            return np.zeros((0, self._bidspace.flatSize()), dtype=np.float32)
+        return np.stack([model.getValueUtilities() for model in self._models.values()]).astype(np.float32)
+
+    def estimateRows(self, matrix:np.ndarray, valueUtils:Optional[np.ndarray]=None) -> np.ndarray:
+        '''
+        Same as {@link #estimate}, but gathers the value utilities of every issue
+        instead of using a one-hot encoding, so it takes (N x P) memory and
+        suits pools as large as the whole bid space.
+        @param matrix index matrix of the candidate pool, one row per bid
+        @param valueUtils the value utilities to use, see {@link #getValueUtilities}.
+               The current ones if None.
+        @return (N x P) estimated utilities, one column per party.
+        '''
+        if valueUtils is None:
+            valueUtils = self.getValueUtilities()
+        estimates = np.zeros((len(valueUtils), len(matrix)), dtype=np.float32)
+        for col, offset in enumerate(self._bidspace.getOffsets()):
+            estimates += valueUtils[:, int(offset) + matrix[:, col].astype(np.int64)]
+        return estimates.T
@@ -0,0 +1,198 @@
+import random
+from typing import Optional
+
+import numpy as np
+
+
+class ParetoIndex:
+    '''
+    The Pareto optimal bids among candidates scored by us and by the other
+    parties (their profiles or opponent model estimates), and the Nash point.
+    The candidates are given in rank order of a {@link SortedBids}, so a bid
+    is identified by its rank and our utilities are descending.
+
+    The skyline is found with sort-based algorithms on the utility matrix:
+    for two parties a single sweep, for more a sort-filter-skyline, where the
+    bids are sorted on the sum of their utilities so that a bid can only be
+    dominated by bids before it. Blocks of bids are checked against the
+    skyline so far at once, after a prefilter that drops every bid dominated
+    by the skyline of the best bids. The prefilter uses the pivots with the
+    highest minimum utility first, as they dominate the most bids, so most
+    bids are dropped by a few comparisons.
+
+    When the utilities of the other parties change a little, as opponent
+    estimates do with every offer, the index is rebuilt from the previous
+    one: its Pareto bids, rescored, are mostly still Pareto optimal or close,
+    so all bids are first checked against them and only the few that are
+    not dominated are sorted and swept.
+
+    Queries are answered from the skyline only: the Pareto bids with our
+    utility >= u are a prefix of it (binary search), and the Nash point of
+    every prefix is precomputed.
+    '''
+    BLOCK = 512
+    # number of best bids (on summed utility) whose skyline is the prefilter
+    PIVOTS = 4096
+
+    def __init__(self, ours:np.ndarray, others:np.ndarray, previous:Optional["ParetoIndex"]=None):
+        '''
+        @param ours our utility of every candidate, descending
+        @param others (N x P) the utilities of the other parties, in the same order
+        @param previous the index of the same candidates under earlier
+               utilities of the other parties, or None. The result does not
+               depend on it, only the time to build.
+        '''
+        points = np.column_stack([np.asarray(ours, dtype=np.float64), np.asarray(others, dtype=np.float64)])
+        hint = None
+        if previous is not None and previous._points == points.shape:
+            hint = previous.getRanks()
+        self._points = points.shape
+        self._ranks = ParetoIndex.skyline(points, hint)
+        self._ours = points[self._ranks, 0]
+        self._ascending = self._ours[::-1]
+        products = np.prod(points[self._ranks], axis=1)
+        # nash[k] is the index in the skyline of the Nash point of the first k+1 bids
+        if len(products) > 0:
+            runmax = np.maximum.accumulate(products)
+            improves = np.concatenate([[True], products[1:] > runmax[:-1]])
+            self._nash = np.maximum.accumulate(np.where(improves, np.arange(len(products)), 0))
+        else:
+            self._nash = np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def dominates(a:np.ndarray, b:np.ndarray) -> np.ndarray:
+        '''
+        @param a (A x D) utility vectors
+        @param b (B x D) utility vectors
+        @return (A x B), true where a row of a dominates a row of b: at least
+        as good for every party and better for one.
+        '''
+        geq = a[:, None, 0] >= b[None, :, 0]
+        greater = a[:, None, 0] > b[None, :, 0]
+        for col in range(1, a.shape[1]):
+            geq &= a[:, None, col] >= b[None, :, col]
+            greater |= a[:, None, col] > b[None, :, col]
+        return geq & greater
+
+    @staticmethod
+    def skyline(points:np.ndarray, hint:Optional[np.ndarray]=None) -> np.ndarray:
+        '''
+        @param points (N x D) utility vectors, one per party
+        @param hint rows that are likely on the skyline or close to it, such
+               as the skyline before the utilities changed a little, or None.
+               Rows dominated by one of them are dropped before sorting. Any
+               rows give the same result.
+        @return the indices of the rows no other row dominates, ascending.
+        '''
+        if len(points) == 0:
+            return np.zeros(0, dtype=np.int64)
+        if points.shape[1] == 1:
+            return np.flatnonzero(points[:, 0] == points[:, 0].max())
+        if hint is not None and len(hint) > 0:
+            hint = np.asarray(hint, dtype=np.int64)
+            pivots = ParetoIndex._sfs(points, hint[np.argsort(-points[hint].sum(axis=1), kind='stable')])
+            survivors = ParetoIndex._prefilter(points, pivots, np.arange(len(points)))
+            return survivors[ParetoIndex.skyline(points[survivors])]
+        if points.shape[1] == 2:
+            return ParetoIndex._skyline2(points[:, 0], points[:, 1])
+        order = np.argsort(-points.sum(axis=1), kind='stable')
+        pivots = ParetoIndex._sfs(points, order[:ParetoIndex.PIVOTS])
+        rest = ParetoIndex._prefilter(points, pivots, order[ParetoIndex.PIVOTS:])
+        candidates = np.concatenate([order[:ParetoIndex.PIVOTS], rest])
+        return np.sort(ParetoIndex._sfs(points, candidates))
+
+    @staticmethod
+    def _prefilter(points:np.ndarray, pivots:np.ndarray, rows:np.ndarray) -> np.ndarray:
+        '''
+        @return the rows that none of the pivots dominates, in the same order.
+        The pivots with the highest minimum utility are tried first, on all
+        rows, and more of them on the rows that are left.
+        '''
+        pivots = pivots[np.argsort(-points[pivots].min(axis=1), kind='stable')]
+        for count in (4, 16, 64, 256, len(pivots)):
+            survivors = [rows[:0]]
+            for start in range(0, len(rows), ParetoIndex.BLOCK * 16):
+                block = rows[start:start + ParetoIndex.BLOCK * 16]
+                survivors.append(block[~ParetoIndex.dominates(points[pivots[:count]], points[block]).any(axis=0)])
+            rows = np.concatenate(survivors)
+        return rows
+
+    @staticmethod
+    def _skyline2(x:np.ndarray, y:np.ndarray) -> np.ndarray:
+        '''
+        Skyline of two parties in one sweep: sorted on x descending (y
+        descending within equal x), a bid is kept if its y is above that of
+        every bid with a higher x, and the highest of its equal x group.
+        '''
+        order = np.lexsort((-y, -x))
+        xs = x[order]
+        ys = y[order]
+        runmax = np.maximum.accumulate(ys)
+        first = np.maximum.accumulate(np.where(np.concatenate([[True], xs[1:] != xs[:-1]]),
+                                               np.arange(len(xs)), 0))
+        before = np.where(first > 0, runmax[np.maximum(first - 1, 0)], -np.inf)
+        keep = (ys > before) & (ys == ys[first])
+        return np.sort(order[keep])
+
+    @staticmethod
+    def _sfs(points:np.ndarray, order:np.ndarray) -> np.ndarray:
+        '''
+        Sort-filter-skyline over the rows in order, which must be sorted on
+        descending sum, so that no row is dominated by a later one.
+        @return the skyline rows, in that order.
+        '''
+        skyline = np.zeros(0, dtype=np.int64)
+        for start in range(0, len(order), ParetoIndex.BLOCK):
+            block = order[start:start + ParetoIndex.BLOCK]
+            if len(skyline) > 0:
+                block = block[~ParetoIndex.dominates(points[skyline], points[block]).any(axis=0)]
+            if len(block) > 1:
+                block = block[~ParetoIndex.dominates(points[block], points[block]).any(axis=0)]
+            skyline = np.concatenate([skyline, block])
+        return skyline
+
+    def size(self) -> int:
+        return len(self._ranks)
+
+    def getRanks(self) -> np.ndarray:
+        '''
+        @return the ranks of all Pareto optimal bids, ascending (so our
+        utility descending). Do not modify.
+        '''
+        return self._ranks
+
+    def countAbove(self, util:float) -> int:
+        '''
+        @return the number of Pareto bids with our utility >= util.
+        '''
+        return len(self._ours) - int(np.searchsorted(self._ascending, util, side='left'))
+
+    def above(self, util:float) -> np.ndarray:
+        '''
+        @return the ranks of the Pareto bids with our utility >= util, best
+        for us first.
+        '''
+        return self._ranks[:self.countAbove(util)]
+
+    def sample(self, util:float=-np.inf, rnd:Optional[random.Random]=None) -> Optional[int]:
+        '''
+        @param util the lowest utility for us
+        @param rnd the random generator, the module one if None
+        @return the rank of a random Pareto bid with our utility >= util, or
+        None if there is none. O(log N).
+        '''
+        count = self.countAbove(util)
+        if count == 0:
+            return None
+        return int(self._ranks[(rnd.randrange if rnd is not None else random.randrange)(count)])
+
+    def nash(self, util:float=-np.inf) -> Optional[int]:
+        '''
+        @return the rank of the bid with the highest product of utilities
+        among the Pareto bids with our utility >= util, or None if there are
+        none. O(log N).
+        '''
+        count = self.countAbove(util)
+        if count == 0:
+            return None
+        return int(self._ranks[self._nash[count - 1]])
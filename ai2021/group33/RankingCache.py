@@ -0,0 +1,124 @@
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ai2021.group33.BidSpace import BidSpace
+
+
+class RankingCache:
+    '''
+    Directory of sorted bid rankings that survives between sessions. A ranking
+    is stored as two .npy files, the bid codes best first and their utilities,
+    named after a hash of the domain and the profile's weighted value
+    utilities, which fully determine the ranking. Loading memory maps the
+    files, so it takes milliseconds and the pages are shared between all
+    processes using the same ranking.
+    When the files take more than the size limit, the least recently used
+    rankings are removed. The hash includes {@link #FORMAT}, so rankings
+    stored by an older {@link SortedBids} are never loaded.
+    '''
+    ORDER = ".order.npy"
+    UTILS = ".utils.npy"
+    # version of the stored rankings, to be raised whenever the order of tied
+    # bids or the stored utilities change. 2: ties in descending code order
+    # and one utility per tier, see SortedBids#fromUtilities
+    FORMAT = 2
+
+    def __init__(self, directory:str, maxBytes:int=512 * 1024 * 1024):
+        '''
+        @param directory the cache directory. Made if it does not exist.
+        @param maxBytes the maximum total size of the cached files.
+        '''
+        self._dir = Path(directory)
+        self._maxBytes = maxBytes
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(bidspace:BidSpace, lookups:List[np.ndarray]) -> str:
+        '''
+        @param bidspace the encoded domain
+        @param lookups the per-issue weighted value utilities of the profile,
+               see {@link BidSpace#lookups}
+        @return the cache key of the ranking of this profile.
+        '''
+        digest = hashlib.sha256()
+        digest.update(("format" + str(RankingCache.FORMAT)).encode("utf-8"))
+        for col, issue in enumerate(bidspace.getIssues()):
+            digest.update(repr(issue).encode("utf-8"))
+            for value in bidspace.getValues(col):
+                digest.update(repr(str(value)).encode("utf-8"))
+            digest.update(np.ascontiguousarray(lookups[col], dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def load(self, key:str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        '''
+        @return the memory mapped (order, utilities) arrays of the key, or
+        None if they are not in the cache.
+        '''
+        orderPath = self._dir / (key + self.ORDER)
+        utilsPath = self._dir / (key + self.UTILS)
+        try:
+            order = np.load(orderPath, mmap_mode='r')
+            utils = np.load(utilsPath, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if len(order) != len(utils):
+            return None
+        # mark as recently used
+        for path in (orderPath, utilsPath):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return order, utils
+
+    def store(self, key:str, order:np.ndarray, utils:np.ndarray):
+        '''
+        Adds a ranking. Files are written under a temporary name and then
+        renamed, so concurrent sessions never see half written files. A
+        ranking larger than the size limit is not stored.
+        '''
+        if order.nbytes + utils.nbytes > self._maxBytes:
+            return
+        for suffix, array in ((self.ORDER, order), (self.UTILS, utils)):
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    np.save(file, np.ascontiguousarray(array))
+                os.replace(tmp, self._dir / (key + suffix))
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        self._evict(key)
+
+    def _evict(self, newest:str):
+        '''
+        Removes the least recently used rankings until the total size is below
+        the limit, except the newest one, even if file times tie with it.
+        '''
+        rankings = {}
+        for path in self._dir.glob("*.npy"):
+            key = path.name.split(".", 1)[0]
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            size, used = rankings.get(key, (0, 0.0))
+            rankings[key] = (size + stat.st_size, max(used, stat.st_mtime))
+        total = sum(size for size, _ in rankings.values())
+        for key, (size, _) in sorted(rankings.items(), key=lambda item: item[1][1]):
+            if total <= self._maxBytes:
+                break
+            if key == newest:
+                continue
+            for suffix in (self.ORDER, self.UTILS):
+                try:
+                    os.remove(self._dir / (key + suffix))
+                except OSError:
+                    pass
+            total -= size
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class RankingMemo:
+    '''
+    Process wide memo of the rankings sorted (or loaded from a
+    {@link RankingCache}) in this process, keyed like the RankingCache. A
+    process that plays many sessions, such as a tournament worker or one
+    warmed up with party.preload, then sorts every profile only once. The
+    arrays are kept read-only and every party makes its own SortedBids on
+    them. Memory mapped arrays cost nothing here; the others count against
+    MAX_BYTES. At most MAX_ENTRIES rankings are kept, memory mapped or not,
+    so the open maps stay bounded too. Least recently used first out.
+    '''
+    MAX_BYTES = 64 * 1024 * 1024
+    MAX_ENTRIES = 32
+
+    _rankings:"OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(key:str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        '''
+        @param key the key of the ranking, see {@link RankingCache#key}
+        @return the (order, utilities) arrays, or None if not in the memo.
+        '''
+        with RankingMemo._lock:
+            ranking = RankingMemo._rankings.get(key)
+            if ranking is not None:
+                RankingMemo._rankings.move_to_end(key)
+            return ranking
+
+    @staticmethod
+    def put(key:str, order:np.ndarray, utilities:np.ndarray):
+        order = order.view()
+        utilities = utilities.view()
+        order.flags.writeable = False
+        utilities.flags.writeable = False
+        with RankingMemo._lock:
+            RankingMemo._rankings[key] = (order, utilities)
+            RankingMemo._rankings.move_to_end(key)
+            while len(RankingMemo._rankings) > 1 and (len(RankingMemo._rankings) > RankingMemo.MAX_ENTRIES
+                                                      or RankingMemo._bytes() > RankingMemo.MAX_BYTES):
+                RankingMemo._rankings.popitem(last=False)
+
+    @staticmethod
+    def clear():
+        with RankingMemo._lock:
+            RankingMemo._rankings.clear()
+
+    @staticmethod
+    def _bytes() -> int:
+        return sum(array.nbytes for ranking in RankingMemo._rankings.values() for array in ranking
+                   if not isinstance(array, np.memmap))
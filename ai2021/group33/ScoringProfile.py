@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.issuevalue.Value import Value
+from geniusweb.profile.Profile import Profile
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+from ai2021.group33.BidSpace import BidSpace
+
+
+class ScoringProfile:
+    '''
+    Immutable compiled form of our profile, resolved once from the profile
+    connection. For a linear additive profile it holds per issue a
+    value -> weight x utility float table (as dicts for single bids and as
+    arrays, see {@link BidSpace#lookups}, for index matrices), so scoring
+    never goes through the UtilitySpace interface or Decimal arithmetic.
+    Other utility spaces are scored by the profile itself.
+    '''
+
+    def __init__(self, profile:Profile):
+        '''
+        @param profile the profile as returned by the profile connection
+        '''
+        self._profile = profile
+        self._domain:Domain = profile.getDomain()
+        self._bidspace = BidSpace(self._domain)
+        self._lookups:Optional[Tuple[np.ndarray, ...]] = None
+        self._tables:Optional[List[Tuple[str, Dict[Value, float]]]] = None
+        self._key:Optional[str] = None
+        if isinstance(profile, LinearAdditive):
+            lookups = self._bidspace.lookups(profile)
+            for table in lookups:
+                table.setflags(write=False)
+            self._lookups = tuple(lookups)
+            self._tables = [ (issue, { value: float(table[idx])
+                                       for idx, value in enumerate(self._bidspace.getValues(col)) })
+                             for col, (issue, table) in enumerate(zip(self._bidspace.getIssues(), lookups)) ]
+
+    def getProfile(self) -> Profile:
+        return self._profile
+
+    def getDomain(self) -> Domain:
+        return self._domain
+
+    def getBidSpace(self) -> BidSpace:
+        return self._bidspace
+
+    def isLinear(self) -> bool:
+        '''
+        @return true if the profile is linear additive, so the lookups exist.
+        '''
+        return self._lookups is not None
+
+    def getLookups(self) -> Tuple[np.ndarray, ...]:
+        '''
+        @return per issue, in column order, the weighted utility of every value.
+        Only for linear profiles. Read only.
+        '''
+        if self._lookups is None:
+            raise ValueError("Profile is not linear additive")
+        return self._lookups
+
+    def getKey(self) -> str:
+        '''
+        @return the {@link RankingCache#key} of the lookups, computed on
+        first use. Only for linear profiles.
+        '''
+        if self._key is None:
+            # the cache itself is only used with the rankingCache parameter
+            from ai2021.group33.RankingCache import RankingCache
+            self._key = RankingCache.key(self._bidspace, list(self.getLookups()))
+        return self._key
+
+    def isSame(self, other:"ScoringProfile") -> bool:
+        '''
+        @return true if the other scores every bid like this one: if both
+        are linear and have the same key, or else if the profiles are equal.
+        A connection may parse the profile again on every fetch, so this
+        compares content, not identity.
+        '''
+        if other._profile is self._profile:
+            return True
+        if self.isLinear() and other.isLinear():
+            return self.getKey() == other.getKey()
+        return self._profile == other._profile
+
+    def utility(self, bid:Bid) -> float:
+        '''
+        @return our utility of the bid. Values that are not in the domain count 0.
+        '''
+        if self._tables is None:
+            return float(self._profile.getUtility(bid))  # type:ignore
+        total = 0.0
+        for issue, table in self._tables:
+            total += table.get(bid.getValue(issue), 0.0)
+        return total
+
+    def utilities(self, matrix:np.ndarray) -> np.ndarray:
+        '''
+        @param matrix index matrix, one row of value indices per bid
+        @return the utilities of all rows.
+        '''
+        if self._lookups is None:
+            return np.fromiter((float(self._profile.getUtility(self._bidspace.toBid(row)))  # type:ignore
+                                for row in matrix), dtype=np.float64, count=len(matrix))
+        utilities = np.zeros(len(matrix), dtype=np.float64)
+        for col, table in enumerate(self._lookups):
+            utilities += table[matrix[:, col]]
+        return utilities
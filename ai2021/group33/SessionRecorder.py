@@ -0,0 +1,160 @@
+import json
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from geniusweb.actions.Accept import Accept
+from geniusweb.actions.Action import Action
+from geniusweb.actions.Offer import Offer
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.inform.ActionDone import ActionDone
+from geniusweb.inform.Inform import Inform
+from geniusweb.inform.YourTurn import YourTurn
+from geniusweb.issuevalue.Bid import Bid
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.BidSpace import BidSpace
+
+MAGIC = b"G33S\x01"
+# payload length, kind, time.time() of the record
+HEADER = struct.Struct("<IBd")
+ACTOR = struct.Struct("<H")
+
+# Record kinds. Offers and accepts, the bulk of a session, are written as
+# an actor index and the value indices of the bid; everything else as json.
+DOMAIN = 1       # value width code + json of the domain, before the first bid
+PARTY = 2        # name of the next actor index, before its first use
+INFORM = 3       # json of an inform
+ACTION = 4       # json of an action we sent
+YOUR_TURN = 5    # no payload
+OFFERED = 6      # ActionDone of an Offer: actor + bid
+ACCEPTED = 7     # ActionDone of an Accept: actor + bid
+OFFER = 8        # our Offer: actor + bid
+ACCEPT = 9       # our Accept: actor + bid
+
+# numpy dtype of the value indices, by the code in the DOMAIN record
+WIDTHS = { 1: "<u1", 2: "<u2", 4: "<u4" }
+
+
+class SessionRecorder:
+    '''
+    Writes every inform a party receives and every action it sends to a
+    file of length prefixed binary records, see the kinds above. A session
+    of a thousand rounds takes some tens of kilobytes and is read back by
+    {@link SessionReplayer} in milliseconds.
+    Recording only queues the inform or action with its time, so it never
+    blocks the listener thread; {@link #flush} encodes and writes them,
+    which may fetch the bid space. Thread safe, as informs and actions may
+    come from different threads.
+    '''
+
+    def __init__(self, path:str, bidspace:Callable[[], Optional[BidSpace]]):
+        '''
+        @param path the file to write, overwritten if it exists
+        @param bidspace gives the encoding of the bids, None while it is
+               not known yet. Bids recorded without it are written as json.
+        '''
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._bidspace = bidspace
+        self._space:Optional[BidSpace] = None
+        self._dtype = ""
+        self._actors:Dict[PartyId, int] = {}
+        self._mapper = ObjectMapper()
+        # (time, is action, inform or action) not written yet
+        self._pending:List[Tuple[float, bool, Any]] = []
+        self._closed = False
+        self._lock = threading.Lock()
+        # held while writing, so flushes do not interleave
+        self._writeLock = threading.Lock()
+
+    def recordInform(self, info:Inform):
+        with self._lock:
+            if not self._closed:
+                self._pending.append((time.time(), False, info))
+
+    def recordAction(self, action:Action):
+        with self._lock:
+            if not self._closed:
+                self._pending.append((time.time(), True, action))
+
+    def flush(self):
+        '''
+        Writes all recorded informs and actions, in the order recorded.
+        '''
+        with self._writeLock:
+            with self._lock:
+                pending = self._pending
+                self._pending = []
+            if self._file.closed:
+                return
+            for timestamp, isAction, obj in pending:
+                if isAction:
+                    if not self._compact(obj, OFFER, ACCEPT, timestamp):
+                        self._writeJson(ACTION, obj, timestamp)
+                elif isinstance(obj, YourTurn):
+                    self._write(YOUR_TURN, b"", timestamp)
+                elif not (isinstance(obj, ActionDone)
+                          and self._compact(obj.getAction(), OFFERED, ACCEPTED, timestamp)):
+                    self._writeJson(INFORM, obj, timestamp)
+
+    def close(self):
+        '''
+        Writes what was recorded and closes the file. Later records are
+        ignored.
+        '''
+        with self._lock:
+            self._closed = True
+        self.flush()
+        with self._writeLock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _compact(self, action:Action, offerKind:int, acceptKind:int, timestamp:float) -> bool:
+        '''
+        Writes an Offer or Accept as actor index and value indices.
+        @return false if the action can not be written that way.
+        '''
+        if isinstance(action, Offer):
+            kind = offerKind
+        elif isinstance(action, Accept):
+            kind = acceptKind
+        else:
+            return False
+        row = self._row(action.getBid(), timestamp)
+        if row is None:
+            return False
+        actor = self._actor(action.getActor(), timestamp)
+        self._write(kind, ACTOR.pack(actor) + row.astype(self._dtype).tobytes(), timestamp)
+        return True
+
+    def _row(self, bid:Bid, timestamp:float) -> Optional[np.ndarray]:
+        if self._space is None:
+            space = self._bidspace()
+            if space is None:
+                return None
+            self._space = space
+            sizes = space.getSizes()
+            width = 1 if sizes.max(initial=0) <= 1 << 8 else 2 if sizes.max() <= 1 << 16 else 4
+            self._dtype = WIDTHS[width]
+            domain = json.dumps(self._mapper.toJson(space.getDomain())).encode("utf-8")
+            self._write(DOMAIN, bytes([width]) + domain, timestamp)
+        return self._space.toRow(bid)
+
+    def _actor(self, actor:PartyId, timestamp:float) -> int:
+        idx = self._actors.get(actor)
+        if idx is None:
+            idx = len(self._actors)
+            self._actors[actor] = idx
+            self._write(PARTY, actor.getName().encode("utf-8"), timestamp)
+        return idx
+
+    def _writeJson(self, kind:int, obj:Any, timestamp:float):
+        self._write(kind, json.dumps(self._mapper.toJson(obj)).encode("utf-8"), timestamp)
+
+    def _write(self, kind:int, payload:bytes, timestamp:float):
+        self._file.write(HEADER.pack(len(payload), kind, timestamp))
+        self._file.write(payload)
@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from geniusweb.actions.Accept import Accept
+from geniusweb.actions.Action import Action
+from geniusweb.actions.Offer import Offer
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.inform.ActionDone import ActionDone
+from geniusweb.inform.Inform import Inform
+from geniusweb.inform.YourTurn import YourTurn
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.party.DefaultParty import DefaultParty
+from geniusweb.references.ProfileRef import ProfileRef
+from geniusweb.utils import val
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.BidSpace import BidSpace
+from ai2021.group33.SessionRecorder import ACCEPT, ACCEPTED, ACTION, ACTOR, DOMAIN, HEADER, INFORM, \
+    MAGIC, OFFER, OFFERED, PARTY, WIDTHS, YOUR_TURN
+
+# Settings parameters dropped on replay: the party must not record again,
+# and must handle every inform before replay hands it the next one
+REPLAY_DROPPED = ("recordFile", "eventQueue")
+
+
+class SessionReplayer:
+    '''
+    Reads a file written by {@link SessionRecorder}. The file is read at
+    once and the records are decoded while they are iterated, with the
+    decoded bids kept, as sessions repeat the same bids many times.
+    '''
+
+    def __init__(self, path:str):
+        self._data = Path(path).read_bytes()
+        if not self._data.startswith(MAGIC):
+            raise ValueError("Not a session recording: " + path)
+        self._mapper = ObjectMapper()
+
+    def records(self, rewrite:Optional[Callable[[Dict[str, Any], float], None]]=None) \
+            -> Iterator[Tuple[int, float, Any]]:
+        '''
+        @param rewrite called with the json and the time of every json
+               inform before it is parsed, so that it can be changed
+        @return per record its kind (see {@link SessionRecorder}), time and
+        Inform or Action. DOMAIN and PARTY records are used internally and
+        not returned.
+        '''
+        data = memoryview(self._data)
+        pos = len(MAGIC)
+        bidspace:Optional[BidSpace] = None
+        dtype = WIDTHS[1]
+        actors:List[PartyId] = []
+        bids:Dict[bytes, Bid] = {}
+        while pos < len(data):
+            length, kind, timestamp = HEADER.unpack_from(data, pos)
+            pos += HEADER.size
+            payload = data[pos:pos + length]
+            pos += length
+            if kind == DOMAIN:
+                dtype = WIDTHS[payload[0]]
+                domain = self._mapper.parse(json.loads(bytes(payload[1:])), Domain)
+                bidspace = BidSpace(domain) #type:ignore
+            elif kind == PARTY:
+                actors.append(PartyId(bytes(payload).decode("utf-8")))
+            elif kind == YOUR_TURN:
+                yield kind, timestamp, YourTurn()
+            elif kind == INFORM or kind == ACTION:
+                obj = json.loads(bytes(payload))
+                if kind == INFORM and rewrite is not None:
+                    rewrite(obj, timestamp)
+                yield kind, timestamp, self._mapper.parse(obj, Inform if kind == INFORM else Action)
+            elif kind in (OFFERED, ACCEPTED, OFFER, ACCEPT):
+                actor = actors[ACTOR.unpack_from(payload)[0]]
+                key = bytes(payload[ACTOR.size:])
+                bid = bids.get(key)
+                if bid is None:
+                    bid = val(bidspace).toBid(np.frombuffer(key, dtype=dtype))
+                    bids[key] = bid
+                action = Offer(actor, bid) if kind in (OFFERED, OFFER) else Accept(actor, bid)
+                yield kind, timestamp, ActionDone(action) if kind in (OFFERED, ACCEPTED) else action
+            else:
+                raise ValueError("Unknown record kind " + str(kind))
+
+    def informs(self) -> Iterator[Inform]:
+        return (obj for kind, _time, obj in self.records() if kind not in (ACTION, OFFER, ACCEPT))
+
+    def actions(self) -> Iterator[Action]:
+        return (obj for kind, _time, obj in self.records() if kind in (ACTION, OFFER, ACCEPT))
+
+    def replay(self, party:DefaultParty, profile:Optional[ProfileRef]=None) -> int:
+        '''
+        Hands the recorded informs to the party's notifyChange, as fast as
+        it takes them, so when this returns every inform was handled. The
+        settings are changed for that: the parameters in REPLAY_DROPPED are
+        removed, and the deadline and start of the progress are moved by the
+        time since the recording, so the deadline is as far ahead as it was
+        then. Time based progress is still measured on the wall clock, so a
+        replay at full speed stays early in the session.
+        @param profile the profile to use instead of the recorded one, which
+               may not be reachable any more
+        @return the number of informs replayed.
+        '''
+        def rewrite(inform:Dict[str, Any], recorded:float):
+            for body in inform.values():
+                if isinstance(body, dict) and "profile" in body and "parameters" in body:
+                    body["parameters"] = { key: value for key, value in (body["parameters"] or {}).items()
+                                           if key not in REPLAY_DROPPED }
+                    if profile is not None:
+                        body["profile"] = str(profile.getURI())
+                    shift = round((time.time() - recorded) * 1000)
+                    for progress in (body.get("progress") or {}).values():
+                        for key in ("start", "endtime"):
+                            if isinstance(progress, dict) and isinstance(progress.get(key), (int, float)):
+                                progress[key] += shift
+        count = 0
+        for kind, _time, obj in self.records(rewrite):
+            if kind not in (ACTION, OFFER, ACCEPT):
+                party.notifyChange(obj)
+                count += 1
+        return count
@@ -0,0 +1,152 @@
+from typing import List, Optional
+
+import numpy as np
+
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+
+from ai2021.group33.BidCodec import BidCodec
+from ai2021.group33.BidSpace import BidSpace
+
+
+class SortedBids:
+    '''
+    All bids of a domain sorted on descending utility. Only the codes (see
+    {@link BidSpace}) and utilities are stored, Bid objects are made on request.
+    Rank 0 is the bid with the highest utility.
+    Float sums of utilities that are equal as Decimals may differ in the
+    last bits, so the bids are ranked on their utilities rounded to
+    TOLERANCE, and bids of equal rounded utility are in descending code
+    order, like the reverse (utility, index) sort of the original party.
+    All bids of a tier are stored with one utility, the highest in the
+    tier, so searches on the stored utilities never split a tier.
+    '''
+    TOLERANCE = 1e-9
+
+    def __init__(self, bidspace:BidSpace, order:np.ndarray, utilities:np.ndarray):
+        '''
+        @param bidspace the bid space the utilities belong to
+        @param order the codes of the bids, best bid first
+        @param utilities the utilities of the bids in that order (descending).
+        Both arrays are used as they are, so they can be memory mapped.
+        '''
+        self._bidspace = bidspace
+        self._order = order
+        self._utils = utilities
+        # ascending view for np.searchsorted, no copy
+        self._ascending = utilities[::-1]
+        self._codec = BidCodec(bidspace)
+        self._rows:Optional[np.ndarray] = None
+
+    @staticmethod
+    def fromUtilities(bidspace:BidSpace, utilities:np.ndarray) -> "SortedBids":
+        '''
+        @param utilities the utility of every bid, indexed by code
+        '''
+        tiers = np.round(utilities / SortedBids.TOLERANCE)
+        # a stable sort of the reversed tiers puts equal tiers in descending code order
+        order = (len(tiers) - 1) - np.argsort(-tiers[::-1], kind='stable')
+        utils = utilities[order]
+        if len(utils) > 0:
+            ranked = tiers[order]
+            starts = np.flatnonzero(np.concatenate([[True], ranked[1:] != ranked[:-1]]))
+            utils = np.repeat(np.maximum.reduceat(utils, starts), np.diff(np.append(starts, len(utils))))
+        order = order.astype(np.min_scalar_type(max(len(order) - 1, 0)))
+        return SortedBids(bidspace, order, utils)
+
+    @staticmethod
+    def fromLookups(bidspace:BidSpace, lookups:List[np.ndarray]) -> "SortedBids":
+        '''
+        @param lookups per issue the weighted utility of every value, see
+        {@link BidSpace#lookups}
+        '''
+        matrix = bidspace.indexMatrix()
+        utilities = np.zeros(len(matrix), dtype=np.float64)
+        for col, table in enumerate(lookups):
+            utilities += table[matrix[:, col]]
+        return SortedBids.fromUtilities(bidspace, utilities)
+
+    @staticmethod
+    def fromProfile(profile:UtilitySpace, bidspace:Optional[BidSpace]=None) -> "SortedBids":
+        '''
+        Computes the utilities of all bids in one batched pass. Linear additive
+        profiles are turned into per-issue lookup arrays, so no Bid is made and
+        no Decimal arithmetic is done. Other utility spaces fall back to
+        calling getUtility on every bid.
+        '''
+        if bidspace is None:
+            bidspace = BidSpace(profile.getDomain())
+        if isinstance(profile, LinearAdditive):
+            return SortedBids.fromLookups(bidspace, bidspace.lookups(profile))
+        matrix = bidspace.indexMatrix()
+        utilities = np.fromiter((float(profile.getUtility(bidspace.toBid(row))) for row in matrix),
+                                dtype=np.float64, count=len(matrix))
+        return SortedBids.fromUtilities(bidspace, utilities)
+
+    @staticmethod
+    def tierFloor(util:float) -> float:
+        '''
+        @return the lowest utility that rounds to the same TOLERANCE tier as
+        util. The bids of lower tiers are the ones strictly below this.
+        '''
+        return float((np.round(util / SortedBids.TOLERANCE) - 0.5) * SortedBids.TOLERANCE)
+
+    def getBidSpace(self) -> BidSpace:
+        return self._bidspace
+
+    def size(self) -> int:
+        return len(self._utils)
+
+    def getUtilities(self) -> np.ndarray:
+        '''
+        @return the utilities in descending order. Do not modify.
+        '''
+        return self._utils
+
+    def getUtility(self, rank:int) -> float:
+        return float(self._utils[rank])
+
+    def firstBelow(self, util:float, lo:int=0) -> int:
+        '''
+        @param util a utility
+        @param lo the rank to start searching from
+        @return the lowest rank >= lo with a utility strictly below util, or
+        size() if there is none. np.searchsorted, O(log N), on the reversed
+        view of the ranks from lo on (the utilities may be memory mapped, so
+        no copies): the ones below util are a prefix of it.
+        '''
+        size = len(self._utils)
+        if lo >= size:
+            return lo
+        return size - int(np.searchsorted(self._ascending[:size - lo], util, side='left'))
+
+    def getCode(self, rank:int) -> int:
+        return int(self._order[rank])
+
+    def getOrder(self) -> np.ndarray:
+        '''
+        @return the codes of all bids, best first. Do not modify.
+        '''
+        return self._order
+
+    def getRows(self) -> np.ndarray:
+        '''
+        @return the index matrix in rank order: row r holds the value indices
+        of the bid at rank r. Made on first use. Do not modify.
+        '''
+        if self._rows is None:
+            self._rows = self._bidspace.indexMatrix()[self._order]
+        return self._rows
+
+    def getCodec(self) -> BidCodec:
+        '''
+        @return the codec that makes the Bids of these codes.
+        '''
+        return self._codec
+
+    def getBid(self, rank:int) -> Bid:
+        '''
+        @return the bid at the given rank, see {@link BidCodec#decode}.
+        '''
+        return self._codec.decode(int(self._order[rank]))
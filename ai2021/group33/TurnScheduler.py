@@ -0,0 +1,74 @@
+import time
+from typing import Optional
+
+from geniusweb.progress.Progress import Progress
+
+
+class TurnScheduler:
+    '''
+    Keeps track of how long our turns actually take, and of the wall clock
+    time left until the deadline of the {@link Progress} (rounds and time
+    based progress both have one). When the time left is less than a few
+    expected turns, {@link #isTight} tells the party to answer from what it
+    has precomputed instead of doing a full turn.
+    '''
+
+    def __init__(self, progress:Progress, margin:float=3.0, alpha:float=0.2):
+        '''
+        @param progress the progress of the session
+        @param margin the number of expected turns that must fit in the time
+               left for a full turn
+        @param alpha weight of the last turn in the moving average of the turn
+               duration
+        '''
+        self._progress = progress
+        self._margin = margin
+        self._alpha = alpha
+        self._average:Optional[float] = None
+        self._max = 0.0
+        self._turns = 0
+
+    def setProgress(self, progress:Progress):
+        self._progress = progress
+
+    def start(self) -> float:
+        '''
+        @return the start time of a turn, to be given to {@link #finish}.
+        '''
+        return time.perf_counter()
+
+    def finish(self, started:float):
+        '''
+        Records the duration of a turn that started at the given time.
+        '''
+        duration = time.perf_counter() - started
+        self._turns += 1
+        self._max = max(self._max, duration)
+        if self._average is None:
+            self._average = duration
+        else:
+            self._average += self._alpha * (duration - self._average)
+
+    def expected(self) -> float:
+        '''
+        @return expected duration of a turn in seconds. The first turn does the
+        most work, so the average is not allowed to drop below half the max.
+        '''
+        if self._average is None:
+            return 0.0
+        return max(self._average, 0.5 * self._max)
+
+    def remaining(self) -> float:
+        '''
+        @return seconds left until the deadline.
+        '''
+        return self._progress.getTerminationTime().timestamp() - time.time()
+
+    def isTight(self) -> bool:
+        '''
+        @return true if the time left is too small for a full turn.
+        '''
+        return self._turns > 0 and self.remaining() < self._margin * self.expected()
+
+    def getTurns(self) -> int:
+        return self._turns
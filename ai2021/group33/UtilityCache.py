@@ -0,0 +1,41 @@
+from collections import OrderedDict
+from typing import Callable
+
+from geniusweb.issuevalue.Bid import Bid
+
+
+class UtilityCache:
+    '''
+    Bounded least-recently-used cache of bid utilities. Offers are repeated a lot
+    (the same bid is voted on by many parties, and opponents tend to repeat
+    themselves) so most lookups are hits.
+    '''
+
+    def __init__(self, utility:Callable[[Bid], float], maxsize:int=4096):
+        '''
+        @param utility the function computing the utility of a bid on a miss
+        @param maxsize the maximum number of cached bids
+        '''
+        self._utility = utility
+        self._maxsize = maxsize
+        self._cache:"OrderedDict[Bid, float]" = OrderedDict()
+
+    def get(self, bid:Bid) -> float:
+        '''
+        @return the utility of the bid, computed only if it is not cached.
+        '''
+        util = self._cache.get(bid)
+        if util is None:
+            util = self._utility(bid)
+            self._cache[bid] = util
+            if len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(bid)
+        return util
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -0,0 +1,68 @@
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+
+class WindowStats:
+    '''
+    Running count, sum and maximum of the utilities in a sliding window over
+    a stream of received bids. Every bid is stored as (key, utility) once, where
+    key is non-decreasing along the stream (e.g. the progress when the bid
+    arrived). The window [start, end) may only move forward; entries that fall
+    behind the window are dropped, so memory stays bounded by the window size
+    as long as the window is advanced regularly, and each update is
+    amortized O(1). The maximum is kept with a monotonic
+    deque.
+    '''
+
+    def __init__(self):
+        # entries with key >= end, not yet in the window
+        self._pending:Deque[Tuple[float, float]] = deque()
+        # entries in the window, ascending keys
+        self._window:Deque[Tuple[float, float]] = deque()
+        # subsequence of the window with decreasing utilities, front is the max
+        self._maxq:Deque[Tuple[float, float]] = deque()
+        self._sum = 0.0
+
+    def append(self, key:float, util:float):
+        '''
+        @param key position of the entry, not smaller than any previous key
+        @param util the utility of the received bid
+        '''
+        self._pending.append((key, util))
+
+    def advance(self, start:float, end:float):
+        '''
+        Moves the window to [start, end). Both must be at least the values
+        of the previous call.
+        '''
+        while self._pending and self._pending[0][0] < end:
+            key, util = self._pending.popleft()
+            if key < start:
+                continue
+            self._window.append((key, util))
+            self._sum += util
+            while self._maxq and self._maxq[-1][1] <= util:
+                self._maxq.pop()
+            self._maxq.append((key, util))
+        while self._window and self._window[0][0] < start:
+            self._sum -= self._window.popleft()[1]
+        while self._maxq and self._maxq[0][0] < start:
+            self._maxq.popleft()
+        if not self._window:
+            # avoid accumulating rounding errors
+            self._sum = 0.0
+
+    def count(self) -> int:
+        return len(self._window)
+
+    def max(self) -> Optional[float]:
+        '''
+        @return the maximum utility in the window, or None if it is empty.
+        '''
+        return self._maxq[0][1] if self._maxq else None
+
+    def average(self) -> Optional[float]:
+        '''
+        @return the average utility in the window, or None if it is empty.
+        '''
+        return self._sum / len(self._window) if self._window else None
@@ -0,0 +1,224 @@
+'''
+Searches the strategy parameters of Group33Party (see its getDescription)
+with parallel local sessions against stand-in opponents.
+
+Candidate configs are the full grid of the given values, or random samples
+from them. They are evaluated with successive halving: every config plays a
+few sessions, the best 1/eta of them go on to play eta times as many, and so
+on until one is left, so bad configs are dropped after a few sessions. All
+configs play the same sessions (same profiles, protocols and seeds), so
+their scores are directly comparable. --eta 0 plays every config the full
+number of sessions.
+
+    python -m benchmark.Autotune --space highTime=0.9:0.999 dequeSize=3,5,8 combiTime=0.3:0.7 \\
+        --search random --configs 27 --sessions 3 --max-sessions 81 --json tuned.json
+
+A parameter is either a list of values (a,b,c) or, for --search random, a
+range (lo:hi) sampled uniformly, as ints if both ends are ints.
+offerAttempts is only used until the bids are sorted, so it is not worth
+tuning.
+'''
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import json
+import os
+from pathlib import Path
+from random import Random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+
+from benchmark.DomainGenerator import DISTRIBUTIONS, DomainGenerator
+from benchmark.NegotiationBenchmark import PROFILES
+from benchmark.Sessions import loadProfile, loadRanking
+from benchmark.Tournament import parseValue, playSession
+
+SCORES = ["utility", "welfare"]
+
+Choices = Union[List[Any], Tuple[float, float]]
+
+
+def parseSpace(specs:List[str]) -> Dict[str, Choices]:
+    '''
+    @param specs parameters as key=a,b,c (values) or key=lo:hi (range)
+    @return per parameter a list of values or a (lo, hi) tuple.
+    '''
+    space:Dict[str, Choices] = {}
+    for spec in specs:
+        key, values = spec.split("=", 1)
+        if ":" in values:
+            lo, hi = values.split(":", 1)
+            space[key] = (parseValue(lo), parseValue(hi))
+        else:
+            space[key] = [parseValue(value) for value in values.split(",")]
+    return space
+
+
+def candidates(space:Dict[str, Choices], search:str, count:int, rnd:Random) -> List[Dict[str, Any]]:
+    '''
+    @param search "grid" for all combinations of the values, "random" for
+           count random samples
+    @return the configs to evaluate, without duplicates.
+    '''
+    if search == "grid":
+        if any(isinstance(choices, tuple) for choices in space.values()):
+            raise ValueError("Ranges can only be used with --search random")
+        return [dict(zip(space.keys(), combination)) for combination in itertools.product(*space.values())]
+    configs:List[Dict[str, Any]] = []
+    for _ in range(count):
+        config = { key: _sample(choices, rnd) for key, choices in space.items() }
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+
+def _sample(choices:Choices, rnd:Random) -> Any:
+    if isinstance(choices, list):
+        return rnd.choice(choices)
+    lo, hi = choices
+    if isinstance(lo, int) and isinstance(hi, int):
+        return rnd.randint(lo, hi)
+    return rnd.uniform(lo, hi)
+
+
+class Autotuner:
+    '''
+    Evaluates configs on a process pool with successive halving. Session n
+    is the same for every config: its protocol, our profile and the seed
+    only depend on n.
+    '''
+
+    def __init__(self, executor:ProcessPoolExecutor, profiles:List[str], protocols:List[str],
+                 rounds:int, cacheDir:str, score:str="utility"):
+        self._executor = executor
+        self._profiles = profiles
+        self._protocols = protocols
+        self._rounds = rounds
+        self._cacheDir = cacheDir
+        self._score = score
+        # per config index, the score of every session played so far
+        self._scores:Dict[int, List[float]] = {}
+
+    def _job(self, config:int, parameters:Dict[str, Any], session:int):
+        protocolIdx = session % len(self._protocols)
+        protocol = self._protocols[protocolIdx]
+        profileIdx = (session // len(self._protocols)) % len(self._profiles)
+        ours = self._profiles[profileIdx]
+        others = [profile for profile in self._profiles if profile != ours]
+        if protocol == "SAOP":
+            others = others[:1]
+        parameters = dict(parameters, rankingCache=self._cacheDir, rankingCacheSize=1 << 40)
+        return (config, protocolIdx, profileIdx, protocol, ours, others,
+                self._rounds, session, parameters)
+
+    def _scoreOf(self, row:Dict[str, Any]) -> float:
+        if self._score == "welfare":
+            return row["utility"] + row["opponentUtility"]
+        return row["utility"]
+
+    def evaluate(self, configs:List[Dict[str, Any]], alive:List[int], sessions:int):
+        '''
+        Plays sessions until every config in alive has played the given
+        number, all in parallel.
+        '''
+        futures = []
+        for idx in alive:
+            played = self._scores.setdefault(idx, [])
+            for session in range(len(played), sessions):
+                futures.append(self._executor.submit(playSession, self._job(idx, configs[idx], session)))
+        for future in futures:
+            row = future.result()
+            self._scores[row["config"]].append(self._scoreOf(row))
+
+    def mean(self, idx:int) -> float:
+        return float(np.mean(self._scores[idx]))
+
+    def played(self, idx:int) -> int:
+        return len(self._scores.get(idx, []))
+
+    def halving(self, configs:List[Dict[str, Any]], sessions:int, maxSessions:int, eta:int) -> List[int]:
+        '''
+        @param sessions the sessions every config plays first
+        @param maxSessions the sessions the last configs play
+        @param eta the factor by which the configs are cut and the sessions
+               grow every rung. 0 plays all configs maxSessions sessions.
+        @return the config indices, best first, on their last mean score.
+        '''
+        alive = list(range(len(configs)))
+        if eta <= 1:
+            self.evaluate(configs, alive, maxSessions)
+            return sorted(alive, key=self.mean, reverse=True)
+        rung = 0
+        while True:
+            self.evaluate(configs, alive, sessions)
+            alive.sort(key=self.mean, reverse=True)
+            print("rung %d: %d configs x %d sessions, best %.4f %s"
+                  % (rung, len(alive), sessions, self.mean(alive[0]), json.dumps(configs[alive[0]])))
+            if len(alive) == 1 or sessions >= maxSessions:
+                break
+            alive = alive[:max(1, len(alive) // eta)]
+            sessions = min(sessions * eta, maxSessions)
+            rung += 1
+        dropped = [idx for idx in range(len(configs)) if idx not in alive]
+        dropped.sort(key=lambda idx: (self.played(idx), self.mean(idx)), reverse=True)
+        return alive + dropped
+
+
+def main(args:List[str]):
+    parser = ArgumentParser(description="Tune the strategy parameters of Group33Party")
+    parser.add_argument("--space", nargs="+", required=True, metavar="KEY=A,B|LO:HI",
+                        help="the parameters to search and their values or ranges")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--configs", type=int, default=27, help="number of random configs")
+    parser.add_argument("--sessions", type=int, default=3, help="sessions every config plays first")
+    parser.add_argument("--max-sessions", type=int, default=81, help="sessions the best configs play")
+    parser.add_argument("--eta", type=int, default=3, help="successive halving factor, 0 to play all fully")
+    parser.add_argument("--score", choices=SCORES, default="utility",
+                        help="our utility, or the sum of ours and the mean opponent utility")
+    parser.add_argument("--profiles", nargs="+", default=PROFILES,
+                        help="profiles on one domain; we play each against the others")
+    parser.add_argument("--synthetic", metavar="ISSUESxVALUES",
+                        help="play on 3 generated profiles of this size instead")
+    parser.add_argument("--skew", type=float, default=0.0, help="issue weight skew of generated profiles")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform",
+                        help="value utility distribution of generated profiles")
+    parser.add_argument("--protocols", nargs="+", default=["SAOP", "MOPAC"])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random search")
+    parser.add_argument("--json", help="write all configs and their scores to this file")
+    options = parser.parse_args(args)
+
+    tmp = tempfile.TemporaryDirectory()
+    profiles = options.profiles
+    if options.synthetic:
+        issues, values = (int(n) for n in options.synthetic.split("x"))
+        generator = DomainGenerator(issues, values, options.skew, options.distribution, seed=issues * 1000 + values)
+        profiles = generator.write(str(Path(tmp.name) / options.synthetic), 3)
+    cacheDir = str(Path(tmp.name) / "rankings")
+    for path in profiles:
+        loadRanking(loadProfile(path), cacheDir)
+
+    configs = candidates(parseSpace(options.space), options.search, options.configs, Random(options.seed))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(options.workers) as executor:
+        tuner = Autotuner(executor, profiles, options.protocols, options.rounds, cacheDir, options.score)
+        ranking = tuner.halving(configs, options.sessions, options.max_sessions, options.eta)
+    elapsed = time.perf_counter() - start
+    tmp.cleanup()
+
+    print("%d configs in %.1f s" % (len(configs), elapsed))
+    for idx in ranking[:5]:
+        print("   %.4f over %3d sessions  %s" % (tuner.mean(idx), tuner.played(idx), json.dumps(configs[idx])))
+    if options.json:
+        with open(options.json, "w") as file:
+            json.dump([{ "config": configs[idx], "score": tuner.mean(idx), "sessions": tuner.played(idx) }
+                       for idx in ranking], file, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,142 @@
+'''
+Writes synthetic GeniusWeb domains with LinearAdditiveUtilitySpace profiles,
+to see how Group33Party scales with the size of the bid space. The profiles
+can be loaded by the party with a file: URI.
+
+    python -m benchmark.DomainGenerator --issues 10 --values 5 --profiles 3 --out /tmp/synthetic
+'''
+from argparse import ArgumentParser
+import json
+from pathlib import Path
+from random import Random
+import sys
+from typing import Any, Dict, List
+
+DISTRIBUTIONS = ["uniform", "linear", "peaked"]
+# issue weights are multiples of 1 / WEIGHT_UNITS, see DomainGenerator._weights
+WEIGHT_UNITS = 1 << 15
+
+
+class DomainGenerator:
+    '''
+    Generates a domain and any number of profiles on it, reproducibly from
+    a seed.
+    '''
+
+    def __init__(self, issues:int, values:int, skew:float=0.0, distribution:str="uniform",
+                 seed:int=0, name:str="synthetic"):
+        '''
+        @param issues number of issues
+        @param values number of values per issue
+        @param skew issue weights are proportional to rank^-skew (shuffled), so
+               0 gives equal weights and larger values make few issues dominate
+        @param distribution how value utilities are drawn: "uniform" random in
+               [0,1], "linear" evenly spaced from 0 to 1, or "peaked" one value
+               at 1 and the rest low
+        @param seed the random seed
+        @param name the domain name
+        '''
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError("Unknown distribution " + distribution)
+        self._issues = issues
+        self._values = values
+        self._skew = skew
+        self._distribution = distribution
+        self._rnd = Random(seed)
+        self._name = name
+        self._domain = {
+            "name": name,
+            "issuesValues": { self._issue(i): { "values": [self._value(i, v) for v in range(values)] }
+                              for i in range(issues) }
+        }
+
+    def getDomain(self) -> Dict[str, Any]:
+        return self._domain
+
+    def size(self) -> int:
+        return self._values ** self._issues
+
+    def profile(self, name:str) -> Dict[str, Any]:
+        '''
+        @return a new random profile on the domain, as GeniusWeb JSON.
+        '''
+        return {
+            "LinearAdditiveUtilitySpace": {
+                "issueUtilities": { self._issue(i): { "DiscreteValueSetUtilities":
+                                    { "valueUtilities": self._valueUtilities(i) } }
+                                    for i in range(self._issues) },
+                "issueWeights": self._weights(),
+                "domain": self._domain,
+                "name": name
+            }
+        }
+
+    def write(self, directory:str, profiles:int=1) -> List[str]:
+        '''
+        Writes the domain as domain.json and the profiles as profileN.json
+        (N from 1) in the directory.
+        @return the paths of the profiles.
+        '''
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        (out / "domain.json").write_text(json.dumps(self._domain, indent=1), "utf-8")
+        paths = []
+        for n in range(1, profiles + 1):
+            path = out / ("profile" + str(n) + ".json")
+            path.write_text(json.dumps(self.profile(self._name + "profile" + str(n)), indent=1), "utf-8")
+            paths.append(str(path))
+        return paths
+
+    def _issue(self, i:int) -> str:
+        return "issue" + str(i)
+
+    def _value(self, i:int, v:int) -> str:
+        return "i" + str(i) + "v" + str(v)
+
+    def _weights(self) -> Dict[str, float]:
+        '''
+        Weights are rounded to multiples of 1 / WEIGHT_UNITS, at least one,
+        with the rounding error put in the largest, so that they sum to
+        exactly 1 as GeniusWeb requires. Such multiples are exact as floats
+        and have a short exact decimal form, so they still sum to exactly 1
+        after the JSON floats are parsed into Decimals.
+        '''
+        raw = [(rank + 1) ** -self._skew for rank in range(self._issues)]
+        self._rnd.shuffle(raw)
+        total = sum(raw)
+        units = [max(1, round(w / total * WEIGHT_UNITS)) for w in raw]
+        units[units.index(max(units))] += WEIGHT_UNITS - sum(units)
+        return { self._issue(i): u / WEIGHT_UNITS for i, u in enumerate(units) }
+
+    def _valueUtilities(self, i:int) -> Dict[str, float]:
+        n = self._values
+        if self._distribution == "uniform":
+            utils = [self._rnd.random() for _ in range(n)]
+        elif self._distribution == "linear":
+            utils = [v / (n - 1) if n > 1 else 1.0 for v in range(n)]
+            self._rnd.shuffle(utils)
+        else:
+            utils = [self._rnd.betavariate(1, 4) for _ in range(n)]
+            utils[self._rnd.randrange(n)] = 1.0
+        return { self._value(i, v): round(u, 4) for v, u in enumerate(utils) }
+
+
+def main(args:List[str]):
+    parser = ArgumentParser(description="Generate a synthetic domain with linear additive profiles")
+    parser.add_argument("--issues", type=int, required=True)
+    parser.add_argument("--values", type=int, required=True, help="values per issue")
+    parser.add_argument("--skew", type=float, default=0.0, help="issue weight skew, 0 is equal weights")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profiles", type=int, default=1)
+    parser.add_argument("--out", required=True, help="directory to write to")
+    options = parser.parse_args(args)
+    generator = DomainGenerator(options.issues, options.values, options.skew, options.distribution,
+                                options.seed)
+    for path in generator.write(options.out, options.profiles):
+        print(path)
+    print("bids: " + str(generator.size()))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
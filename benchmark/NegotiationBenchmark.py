@@ -0,0 +1,115 @@
+'''
+Replays SAOP and MOPAC sessions of Group33Party against stand-in opponents
+and reports per event latency percentiles, peak RSS and session time, so
+that changes in _getBid, _isGood and _vote show up as comparable numbers.
+The peak RSS of the process includes the stand-in opponents, each with a
+full ranking of its profile; the party's own share is reported next to it
+where the platform allows it (Linux), see {@link Session#run}.
+
+Every session runs in a fresh child process, so the RSS and the first turn
+are measured from a cold start.
+
+    python -m benchmark.NegotiationBenchmark --rounds 200 --sessions 3 --json before.json
+    python -m benchmark.NegotiationBenchmark --protocols SAOP --synthetic 6x5 8x6 10x5
+'''
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+from pathlib import Path
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmark.DomainGenerator import DISTRIBUTIONS, DomainGenerator
+from benchmark.Sessions import EVENTS, runSession
+
+PROFILES = ["group33/profile1.json", "group33/profile2.json", "group33/profile3.json"]
+
+
+def summarize(results:List[Dict[str, Any]]) -> Dict[str, Any]:
+    '''
+    @param results the results of sessions with the same setup
+    @return p50/p99/max per event in milliseconds, and session statistics.
+    '''
+    summary:Dict[str, Any] = {}
+    for event in EVENTS:
+        times = np.array([t for result in results for t in result["timings"][event]]) * 1000
+        if len(times) > 0:
+            summary[event] = { "n": int(len(times)), "p50": float(np.percentile(times, 50)),
+                               "p99": float(np.percentile(times, 99)), "max": float(times.max()) }
+    summary["session"] = {
+        "n": len(results),
+        "time": float(np.mean([result["time"] for result in results])),
+        "maxrss": int(max(result["maxrss"] for result in results)),
+        "partyrss": max((result["partyrss"] for result in results if result.get("partyrss") is not None),
+                        default=None),
+        "rounds": float(np.mean([result["rounds"] for result in results])),
+        "agreements": sum(1 for result in results if result["agreement"]),
+        "utility": float(np.mean([result["utility"] for result in results])),
+    }
+    return summary
+
+
+def printSummary(name:str, summary:Dict[str, Any]):
+    session = summary["session"]
+    print("== " + name)
+    party = "" if session["partyrss"] is None else " (party %.1f MB)" % (session["partyrss"] / 1024)
+    print("   sessions %d, mean time %.3f s, peak RSS %.1f MB%s, mean rounds %.1f, agreements %d, mean utility %.3f"
+          % (session["n"], session["time"], session["maxrss"] / 1024, party, session["rounds"],
+             session["agreements"], session["utility"]))
+    print("   %-10s %8s %10s %10s %10s" % ("event", "n", "p50 ms", "p99 ms", "max ms"))
+    for event in EVENTS:
+        if event in summary:
+            stats = summary[event]
+            print("   %-10s %8d %10.3f %10.3f %10.3f" % (event, stats["n"], stats["p50"], stats["p99"], stats["max"]))
+
+
+def main(args:List[str]):
+    parser = ArgumentParser(description="Benchmark Group33Party in local sessions")
+    parser.add_argument("--profiles", nargs="+", default=PROFILES,
+                        help="profiles on one domain; we play each against the others")
+    parser.add_argument("--protocols", nargs="+", default=["SAOP", "MOPAC"])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=3, help="sessions per protocol and profile")
+    parser.add_argument("--synthetic", nargs="*", default=[], metavar="ISSUESxVALUES",
+                        help="also run on generated domains of these sizes, e.g. 6x5 10x6")
+    parser.add_argument("--skew", type=float, default=0.0, help="issue weight skew of generated profiles")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform",
+                        help="value utility distribution of generated profiles")
+    parser.add_argument("--json", help="write the summaries to this file")
+    options = parser.parse_args(args)
+
+    setups = { "profiles": options.profiles }
+    tmp = tempfile.TemporaryDirectory()
+    for size in options.synthetic:
+        issues, values = (int(n) for n in size.split("x"))
+        generator = DomainGenerator(issues, values, options.skew, options.distribution, seed=issues * 1000 + values)
+        setups[size + " (" + str(generator.size()) + " bids)"] = generator.write(str(Path(tmp.name) / size), 3)
+    summaries:Dict[str, Any] = {}
+    context = multiprocessing.get_context("spawn")
+    for protocol in options.protocols:
+        for name, profiles in setups.items():
+            results = []
+            for session in range(options.sessions):
+                ours = profiles[session % len(profiles)]
+                others = [profile for profile in profiles if profile != ours]
+                if protocol == "SAOP":
+                    others = others[:1]
+                # a fresh process per session: cold start, and its own peak RSS
+                with ProcessPoolExecutor(1, mp_context=context) as executor:
+                    results.append(executor.submit(runSession, protocol, ours, others,
+                                                   options.rounds, session).result())
+            summaries[protocol + " " + name] = summarize(results)
+            printSummary(protocol + " " + name, summaries[protocol + " " + name])
+
+    tmp.cleanup()
+    if options.json:
+        with open(options.json, "w") as file:
+            json.dump(summaries, file, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
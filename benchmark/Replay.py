@@ -0,0 +1,77 @@
+'''
+Replays a session recorded with the recordFile parameter of Group33Party
+through a fresh party, at full speed, and reports the time per inform.
+With --cprofile the replay runs under cProfile and the stats are written
+for pstats or snakeviz, so the hot paths of a production session can be
+profiled offline.
+
+    python -m benchmark.Replay session.bin --profile group33/profile1.json --cprofile replay.prof
+'''
+from argparse import ArgumentParser
+import cProfile
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from geniusweb.references.ProfileRef import ProfileRef
+
+from ai2021.group33.Group33Party import Group33Party
+from ai2021.group33.SessionReplayer import SessionReplayer
+from benchmark.Sessions import BenchConnection, profileUri
+
+
+class TimedParty(Group33Party):
+    '''
+    Group33Party that times every inform it is given, per inform type.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.timings:Dict[str, List[float]] = {}
+
+    def notifyChange(self, info):
+        start = time.perf_counter()
+        super().notifyChange(info)
+        self.timings.setdefault(type(info).__name__, []).append(time.perf_counter() - start)
+
+
+def main(args:List[str]):
+    parser = ArgumentParser(description="Replay a recorded Group33Party session")
+    parser.add_argument("recording", help="file written with the recordFile parameter")
+    parser.add_argument("--profile", help="profile to use instead of the recorded profile reference")
+    parser.add_argument("--cprofile", metavar="FILE", help="write cProfile stats of the replay to this file")
+    options = parser.parse_args(args)
+
+    start = time.perf_counter()
+    replayer = SessionReplayer(options.recording)
+    records = sum(1 for _ in replayer.records())
+    decoded = time.perf_counter() - start
+
+    party = TimedParty()
+    connection = BenchConnection()
+    party.connect(connection)
+    profile = ProfileRef(profileUri(options.profile)) if options.profile else None
+    profiler = cProfile.Profile() if options.cprofile else None
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    informs = replayer.replay(party, profile)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(options.cprofile)
+    elapsed = time.perf_counter() - start
+    party.disconnect()
+
+    print("%d records read and decoded in %.3f s" % (records, decoded))
+    print("%d informs replayed in %.3f s, %d actions sent" % (informs, elapsed, len(connection.getActions())))
+    print("   %-10s %8s %10s %10s %10s" % ("inform", "n", "p50 ms", "p99 ms", "max ms"))
+    for name, timings in party.timings.items():
+        times = np.array(timings) * 1000
+        print("   %-10s %8d %10.3f %10.3f %10.3f" % (name, len(times), np.percentile(times, 50),
+                                                   np.percentile(times, 99), times.max()))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,296 @@
+'''
+Local SAOP and MOPAC sessions between a Group33Party and stand-in opponents,
+with the time spent in every event the party handles.
+'''
+from datetime import datetime
+import gc
+import json
+from pathlib import Path
+from random import Random
+import resource
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+from geniusweb.actions.Accept import Accept
+from geniusweb.actions.Action import Action
+from geniusweb.actions.Offer import Offer
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.actions.Votes import Votes
+from geniusweb.connection.ConnectionEnd import ConnectionEnd
+from geniusweb.inform.ActionDone import ActionDone
+from geniusweb.inform.Agreements import Agreements
+from geniusweb.inform.Finished import Finished
+from geniusweb.inform.Inform import Inform
+from geniusweb.inform.OptIn import OptIn
+from geniusweb.inform.Settings import Settings
+from geniusweb.inform.Voting import Voting
+from geniusweb.inform.YourTurn import YourTurn
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.progress.ProgressRounds import ProgressRounds
+from geniusweb.references.Parameters import Parameters
+from geniusweb.references.ProfileRef import ProfileRef
+from geniusweb.references.ProtocolRef import ProtocolRef
+from geniusweb.references.Reference import Reference
+from pyson.ObjectMapper import ObjectMapper
+from tudelft.utilities.listener.DefaultListenable import DefaultListenable
+from uri.uri import URI  # type: ignore
+
+from ai2021.group33.BidSpace import BidSpace
+from ai2021.group33.Group33Party import Group33Party
+from ai2021.group33.RankingCache import RankingCache
+from ai2021.group33.SortedBids import SortedBids
+
+EVENTS = ["settings", "firstTurn", "turn", "actionDone", "voting", "optIn", "finished"]
+
+ME = PartyId("group33")
+
+
+class BenchConnection(ConnectionEnd[Inform, Action], DefaultListenable):
+    '''
+    Connection that just collects the actions of the party.
+    '''
+    def __init__(self):
+        super().__init__()
+        self._actions:List[Action] = []
+
+    def send(self, data:Action):
+        self._actions.append(data)
+
+    def getReference(self) -> Reference:
+        return cast(Reference, None)
+
+    def getRemoteURI(self) -> URI:
+        return URI("benchmark")
+
+    def close(self):
+        pass
+
+    def getError(self) -> Exception:
+        return cast(Exception, None)
+
+    def getActions(self) -> List[Action]:
+        return self._actions
+
+
+def loadProfile(path:str) -> LinearAdditive:
+    return ObjectMapper().parse(json.loads(Path(path).read_text("utf-8")), LinearAdditive)  # type:ignore
+
+
+def profileUri(path:str) -> URI:
+    return URI("file:" + str(Path(path).resolve()))
+
+
+def loadRanking(profile:LinearAdditive, cacheDir:Optional[str]=None) -> SortedBids:
+    '''
+    @param cacheDir a {@link RankingCache} directory, or None
+    @return the bids of the profile sorted on utility. With a cache directory
+    the ranking is taken from (or added to) the cache, the same one the party
+    uses with its rankingCache parameter, so all processes share the pages.
+    '''
+    bidspace = BidSpace(profile.getDomain())
+    if cacheDir is None:
+        return SortedBids.fromProfile(profile, bidspace)
+    lookups = bidspace.lookups(profile)
+    cache = RankingCache(cacheDir)
+    key = RankingCache.key(bidspace, lookups)
+    cached = cache.load(key)
+    if cached is not None:
+        return SortedBids(bidspace, *cached)
+    ranking = SortedBids.fromLookups(bidspace, lookups)
+    cache.store(key, ranking.getOrder(), ranking.getUtilities())
+    return ranking
+
+
+def rss() -> Optional[Tuple[int, int]]:
+    '''
+    @return the current and the peak RSS of this process in kB, or None if
+    /proc/self/status is not there (not Linux).
+    '''
+    try:
+        status = Path("/proc/self/status").read_text()
+    except OSError:
+        return None
+    fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+    if "VmRSS" not in fields or "VmHWM" not in fields:
+        return None
+    return int(fields["VmRSS"].split()[0]), int(fields["VmHWM"].split()[0])
+
+
+def resetPeakRss() -> bool:
+    '''
+    Lowers the peak RSS of this process to its current RSS. Only on Linux.
+    @return whether that worked.
+    '''
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class StandInOpponent:
+    '''
+    Time dependent opponent on its own profile: its target utility goes from
+    its max to minUtil as 1 - t^(1/e). It offers a random bid above the
+    target and accepts (or votes for) anything above it.
+    '''
+
+    def __init__(self, id:PartyId, profile:LinearAdditive, rnd:Random, e:float=0.5, minUtil:float=0.5,
+                 ranking:Optional[SortedBids]=None):
+        '''
+        @param ranking the bids of the profile sorted on utility, computed if None
+        '''
+        self._id = id
+        self._profile = profile
+        self._rnd = rnd
+        self._e = e
+        self._ranking = ranking if ranking is not None else SortedBids.fromProfile(profile)
+        self._max = self._ranking.getUtility(0)
+        self._min = min(minUtil, self._max)
+        self._utils:Dict[Bid, float] = {}
+
+    def getId(self) -> PartyId:
+        return self._id
+
+    def target(self, t:float) -> float:
+        return self._min + (self._max - self._min) * (1 - t ** (1 / self._e))
+
+    def offer(self, t:float) -> Bid:
+        count = max(self._ranking.firstBelow(self.target(t)), 1)
+        return self._ranking.getBid(self._rnd.randrange(count))
+
+    def accepts(self, bid:Bid, t:float) -> bool:
+        return self.utility(bid) >= self.target(t)
+
+    def utility(self, bid:Bid) -> float:
+        util = self._utils.get(bid)
+        if util is None:
+            util = float(self._profile.getUtility(bid))
+            self._utils[bid] = util
+        return util
+
+
+class Session:
+    '''
+    One session of a fresh Group33Party against stand-in opponents.
+    Every inform is sent through {@link #send}, which times it.
+    '''
+
+    def __init__(self, protocol:str, ourProfile:str, opponentProfiles:List[str], rounds:int,
+                 seed:int=0, parameters:Optional[Dict[str, Any]]=None,
+                 party:Callable[[], Group33Party]=Group33Party):
+        self._protocol = protocol
+        self._ourProfile = ourProfile
+        self._rounds = rounds
+        self._parameters = Parameters(parameters if parameters is not None else {})
+        self._rnd = Random(seed)
+        cacheDir = self._parameters.get("rankingCache")
+        self._opponents = []
+        for idx, path in enumerate(opponentProfiles):
+            profile = loadProfile(path)
+            ranking = loadRanking(profile, cacheDir if isinstance(cacheDir, str) else None)
+            self._opponents.append(StandInOpponent(PartyId("opponent" + str(idx)), profile, self._rnd,
+                                                   ranking=ranking))
+        self._ourUtility = loadProfile(ourProfile)
+        self._party = party()
+        self._connection = BenchConnection()
+        self._timings:Dict[str, List[float]] = { event: [] for event in EVENTS }
+
+    def send(self, event:str, info:Inform) -> Optional[Action]:
+        '''
+        @return the last action the party sent while handling the inform, if any.
+        '''
+        count = len(self._connection.getActions())
+        start = time.perf_counter()
+        self._connection.notifyListeners(info)
+        self._timings[event].append(time.perf_counter() - start)
+        actions = self._connection.getActions()
+        return actions[-1] if len(actions) > count else None
+
+    def run(self) -> Dict[str, Any]:
+        '''
+        @return the timings in seconds per event, the agreement utilities,
+        the number of rounds, total time, the peak RSS (kB) of this process
+        and partyrss. The process peak includes the imports and the stand-in
+        opponents, which each hold a full ranking of their profile. partyrss
+        is how far the peak rose above the RSS that the party started with,
+        in kB, so mostly the party's own memory. It also includes what the
+        opponents allocate while they play, which is small. None if the peak
+        can not be reset on this platform.
+        '''
+        # the opponents were made in the constructor, start from what they left
+        gc.collect()
+        before = rss() if resetPeakRss() else None
+        start = time.perf_counter()
+        self._party.connect(self._connection)
+        progress = ProgressRounds(self._rounds, 0, datetime.fromtimestamp(time.time() + 24 * 3600))
+        settings = Settings(ME, ProfileRef(profileUri(self._ourProfile)), ProtocolRef(URI(self._protocol)),
+                            progress, self._parameters)
+        self.send("settings", settings)
+        if self._protocol == "MOPAC":
+            agreement, rounds = self._runMopac()
+        else:
+            agreement, rounds = self._runSaop()
+        agreements = {} if agreement is None else \
+            { party: agreement for party in [ME] + [opp.getId() for opp in self._opponents] }
+        self.send("finished", Finished(Agreements(agreements)))
+        self._party.disconnect()
+        after = rss()
+        return {
+            "protocol": self._protocol,
+            "profile": self._ourProfile,
+            "agreement": agreement is not None,
+            "utility": 0.0 if agreement is None else float(self._ourUtility.getUtility(agreement)),
+            "opponentUtilities": [0.0 if agreement is None else opp.utility(agreement) for opp in self._opponents],
+            "rounds": rounds,
+            "time": time.perf_counter() - start,
+            "maxrss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "partyrss": after[1] - before[0] if before is not None and after is not None else None,
+            "timings": self._timings,
+        }
+
+    def _turnEvent(self, rnd:int) -> str:
+        return "firstTurn" if rnd == 0 else "turn"
+
+    def _runSaop(self):
+        opponent = self._opponents[0]
+        for rnd in range(self._rounds):
+            t = rnd / self._rounds
+            self.send("actionDone", ActionDone(Offer(opponent.getId(), opponent.offer(t))))
+            action = self.send(self._turnEvent(rnd), YourTurn())
+            if isinstance(action, Accept):
+                return action.getBid(), rnd + 1
+            if isinstance(action, Offer) and opponent.accepts(action.getBid(), t):
+                return action.getBid(), rnd + 1
+        return None, self._rounds
+
+    def _runMopac(self):
+        powers = { ME: 1 }
+        for opponent in self._opponents:
+            powers[opponent.getId()] = 1
+        for rnd in range(self._rounds):
+            t = rnd / self._rounds
+            offers = []
+            action = self.send(self._turnEvent(rnd), YourTurn())
+            if isinstance(action, Offer):
+                offers.append(action)
+            offers += [Offer(opp.getId(), opp.offer(t)) for opp in self._opponents]
+            votes = self.send("voting", Voting(offers, powers))
+            if not isinstance(votes, Votes):
+                continue
+            votes = self.send("optIn", OptIn([votes])) or votes
+            for vote in cast(Votes, votes).getVotes():
+                if all(opp.accepts(vote.getBid(), t) for opp in self._opponents):
+                    return vote.getBid(), rnd + 1
+        return None, self._rounds
+
+
+def runSession(protocol:str, ourProfile:str, opponentProfiles:List[str], rounds:int,
+               seed:int=0, parameters:Optional[Dict[str, Any]]=None) -> Dict[str, Any]:
+    '''
+    Runs one session, see {@link Session#run}. Module level so that it can
+    be run in a child process.
+    '''
+    return Session(protocol, ourProfile, opponentProfiles, rounds, seed, parameters).run()
@@ -0,0 +1,135 @@
+'''
+Measures how fast a Group33Party starts: the import cost of the party
+module, and the time from asking for a session to the first Offer of the
+party in it.
+
+Both are timed in this process, from submitting the session until its
+first offer is back. Cold runs start a fresh interpreter per session, so
+they include its start up. Warm runs submit every session to a running
+process prepared with party.preload, which has done the imports and sorted
+the profile already, as a process pool initializer does; they include the
+round trip to that process.
+
+    python -m benchmark.Startup --profile group33/profile1.json --runs 5 --imports 15
+
+Only the standard library is imported here before the child processes run,
+so the cold numbers include every import of the party.
+'''
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+# run by the cold child processes
+CHILD = "import sys; from benchmark.Startup import firstOffer; firstOffer(sys.argv[1]); print('offer', flush=True)"
+
+
+def importCosts() -> Tuple[float, List[Tuple[float, float, str]]]:
+    '''
+    @return the total import time of the party module in seconds, and per
+    imported module its own and cumulative time in seconds, from python
+    -X importtime in a fresh interpreter.
+    '''
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import party"],
+                            capture_output=True, text=True, check=True)
+    costs = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        costs.append((int(own) / 1e6, int(cumulative) / 1e6, module.rstrip()))
+    total = next(cumulative for _own, cumulative, module in costs if module.strip() == "party")
+    return total, costs
+
+
+def firstOffer(profile:str) -> float:
+    '''
+    Plays the start of a SAOP session: settings and our first turn.
+    @return the seconds this took.
+    '''
+    start = time.perf_counter()
+    from datetime import datetime
+    from geniusweb.actions.Offer import Offer
+    from geniusweb.inform.Settings import Settings
+    from geniusweb.inform.YourTurn import YourTurn
+    from geniusweb.progress.ProgressRounds import ProgressRounds
+    from geniusweb.references.Parameters import Parameters
+    from geniusweb.references.ProfileRef import ProfileRef
+    from geniusweb.references.ProtocolRef import ProtocolRef
+    from uri.uri import URI  # type: ignore
+
+    import party
+    from benchmark.Sessions import BenchConnection, ME, profileUri
+
+    instance = party.party()()
+    connection = BenchConnection()
+    instance.connect(connection)
+    progress = ProgressRounds(200, 0, datetime.fromtimestamp(time.time() + 3600))
+    instance.notifyChange(Settings(ME, ProfileRef(profileUri(profile)), ProtocolRef(URI("SAOP")),
+                                   progress, Parameters()))
+    instance.notifyChange(YourTurn())
+    instance.disconnect()
+    if not isinstance(connection.getActions()[0], Offer):
+        raise ValueError("The party did not offer")
+    return time.perf_counter() - start
+
+
+def cold(profile:str) -> float:
+    '''
+    @return the seconds from starting a fresh interpreter for a session to
+    its first offer.
+    '''
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, "-c", CHILD, profile], stdout=subprocess.PIPE, text=True)
+    line = child.stdout.readline()  # type:ignore
+    elapsed = time.perf_counter() - start
+    child.wait()
+    if line.strip() != "offer":
+        raise ValueError("The child process failed")
+    return elapsed
+
+
+def warm(profile:str, runs:int) -> List[float]:
+    '''
+    @return per run the seconds from submitting a session to a process that
+    was prepared with party.preload until its first offer is back.
+    '''
+    from party import preload
+    context = multiprocessing.get_context("spawn")
+    elapsed = []
+    with ProcessPoolExecutor(1, mp_context=context, initializer=preload, initargs=([profile],)) as executor:
+        # the first job waits for the process to start and preload
+        executor.submit(time.perf_counter).result()
+        for _ in range(runs):
+            start = time.perf_counter()
+            executor.submit(firstOffer, profile).result()
+            elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+def main(args:List[str]):
+    parser = ArgumentParser(description="Measure the startup time of Group33Party")
+    parser.add_argument("--profile", default="group33/profile1.json")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--imports", type=int, default=15, help="number of most expensive imports to list")
+    options = parser.parse_args(args)
+
+    total, costs = importCosts()
+    print("import party: %.1f ms, %d modules" % (total * 1000, len(costs)))
+    print("   %10s %10s  %s" % ("own ms", "total ms", "module"))
+    for own, cumulative, module in sorted(costs, reverse=True)[:options.imports]:
+        print("   %10.2f %10.2f  %s" % (own * 1000, cumulative * 1000, module))
+
+    colds = sorted(cold(options.profile) for _ in range(options.runs))
+    warms = sorted(warm(options.profile, options.runs))
+    print("submit to first offer, new interpreter:     median %.1f ms, min %.1f ms"
+          % (colds[len(colds) // 2] * 1000, colds[0] * 1000))
+    print("submit to first offer, preloaded process:   median %.1f ms, min %.1f ms"
+          % (warms[len(warms) // 2] * 1000, warms[0] * 1000))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
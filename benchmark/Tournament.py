@@ -0,0 +1,229 @@
+'''
+Runs many SAOP and MOPAC sessions of Group33Party in parallel, to compare
+strategy parameters over thousands of sessions. Sessions are spread over a
+pool of worker processes, one per core by default.
+
+The rankings of all profiles are computed once, before the workers start,
+into a {@link RankingCache} directory. The party (through its rankingCache
+parameter) and the stand-in opponents memory map them from there, so all
+workers share the same read-only pages instead of each sorting the bid
+space again.
+
+Results are written as columns (one numpy array per field) to a compressed
+.npz file, rewritten every --flush sessions so a long tournament can be
+inspected while it runs. A session that raises is kept as a row with its
+error message in the error column and NaN results, and does not stop the
+others:
+
+    python -m benchmark.Tournament --sessions 100 --param highTime=0.95,0.99 --out results.npz
+
+    results = numpy.load("results.npz")
+    results["utility"][(results["config"] == 1) & (results["error"] == "")].mean()
+'''
+from argparse import ArgumentParser
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+import itertools
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+import traceback
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from benchmark.DomainGenerator import DISTRIBUTIONS, DomainGenerator
+from benchmark.NegotiationBenchmark import PROFILES
+from benchmark.Sessions import loadProfile, loadRanking, runSession
+
+# name and type of every column of the output
+COLUMNS = [("config", np.int32), ("protocol", np.int8), ("profile", np.int16), ("seed", np.int32),
+           ("agreement", np.bool_), ("utility", np.float32), ("opponentUtility", np.float32),
+           ("rounds", np.int32), ("time", np.float32), ("error", np.str_)]
+
+# config, protocol index, profile index, protocol, our profile, opponent
+# profiles, rounds, seed and party parameters of a session
+Job = Tuple[int, int, int, str, str, List[str], int, int, Dict[str, Any]]
+
+
+class ColumnWriter:
+    '''
+    Collects session results as columns and writes them, with the tables
+    that the index columns refer to, to a compressed .npz file.
+    '''
+
+    def __init__(self, path:str, tables:Dict[str, List[str]], flush:int=100):
+        '''
+        @param path the .npz file to write
+        @param tables string tables stored next to the columns, e.g. the
+               configs that the config column indexes
+        @param flush the file is rewritten after this many new results
+        '''
+        self._path = path
+        self._tables = tables
+        self._flush = flush
+        self._columns:Dict[str, List[Any]] = { name: [] for name, _type in COLUMNS }
+        self._pending = 0
+
+    def add(self, row:Dict[str, Any]):
+        for name, _type in COLUMNS:
+            self._columns[name].append(row[name])
+        self._pending += 1
+        if self._pending >= self._flush:
+            self.write()
+
+    def size(self) -> int:
+        return len(self._columns["seed"])
+
+    def write(self):
+        '''
+        Writes all results so far. Written under a temporary name and then
+        renamed, so readers never see half a file.
+        '''
+        arrays = { name: np.array(self._columns[name], dtype=dtype) for name, dtype in COLUMNS }
+        for name, table in self._tables.items():
+            arrays[name] = np.array(table, dtype=str)
+        directory = os.path.dirname(os.path.abspath(self._path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez_compressed(file, **arrays)
+            os.replace(tmp, self._path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._pending = 0
+
+
+def parseParams(specs:List[str]) -> List[Dict[str, Any]]:
+    '''
+    @param specs parameters as key=value1,value2,... Values are parsed as
+           JSON if possible (numbers, true/false), else taken as strings.
+    @return all combinations of the values, one parameter dict per config.
+    '''
+    keys = []
+    choices = []
+    for spec in specs:
+        key, values = spec.split("=", 1)
+        keys.append(key)
+        choices.append([parseValue(value) for value in values.split(",")])
+    return [dict(zip(keys, combination)) for combination in itertools.product(*choices)]
+
+
+def parseValue(value:str) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def playSession(job:Job) -> Dict[str, Any]:
+    '''
+    Runs one session in a worker. Module level so that it can be pickled.
+    @return the row of the session, without the per event timings.
+    '''
+    config, protocolIdx, profileIdx, protocol, ours, others, rounds, seed, parameters = job
+    result = runSession(protocol, ours, others, rounds, seed, parameters)
+    opponents = result["opponentUtilities"]
+    return { "config": config, "protocol": protocolIdx, "profile": profileIdx, "seed": seed,
+             "agreement": result["agreement"], "utility": result["utility"],
+             "opponentUtility": float(np.mean(opponents)) if len(opponents) > 0 else 0.0,
+             "rounds": result["rounds"], "time": result["time"], "error": "" }
+
+
+def failedSession(job:Job, error:BaseException) -> Dict[str, Any]:
+    '''
+    @return the row of a session that raised the error: its spec, the error
+    message, and NaN for the results.
+    '''
+    config, protocolIdx, profileIdx, _protocol, _ours, _others, _rounds, seed, _parameters = job
+    return { "config": config, "protocol": protocolIdx, "profile": profileIdx, "seed": seed,
+             "agreement": False, "utility": np.nan, "opponentUtility": np.nan, "rounds": 0, "time": np.nan,
+             "error": "".join(traceback.format_exception_only(type(error), error)).strip() }
+
+
+def collect(futures:Dict[Future, Job], writer:ColumnWriter) -> int:
+    '''
+    Adds the row of every session to the writer as it finishes, also of the
+    sessions that failed, and writes the file at the end even if collecting
+    is interrupted.
+    @param futures the running sessions and their jobs
+    @return the number of failed sessions.
+    '''
+    failed = 0
+    try:
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as e:
+                row = failedSession(futures[future], e)
+                failed += 1
+            writer.add(row)
+    finally:
+        writer.write()
+    return failed
+
+
+def main(args:List[str]):
+    parser = ArgumentParser(description="Run a tournament of Group33Party sessions in parallel")
+    parser.add_argument("--profiles", nargs="+", default=PROFILES,
+                        help="profiles on one domain; we play each against the others")
+    parser.add_argument("--synthetic", metavar="ISSUESxVALUES",
+                        help="play on 3 generated profiles of this size instead")
+    parser.add_argument("--skew", type=float, default=0.0, help="issue weight skew of generated profiles")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform",
+                        help="value utility distribution of generated profiles")
+    parser.add_argument("--protocols", nargs="+", default=["SAOP", "MOPAC"])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=10, help="sessions per config, protocol and profile")
+    parser.add_argument("--param", nargs="*", default=[], metavar="KEY=V1,V2",
+                        help="party parameters to sweep; every combination is a config")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--cache", help="ranking cache directory, a temporary one if not given")
+    parser.add_argument("--flush", type=int, default=100, help="rewrite the output every this many sessions")
+    parser.add_argument("--out", default="tournament.npz", help="the .npz file to write")
+    options = parser.parse_args(args)
+
+    tmp = tempfile.TemporaryDirectory()
+    profiles = options.profiles
+    if options.synthetic:
+        issues, values = (int(n) for n in options.synthetic.split("x"))
+        generator = DomainGenerator(issues, values, options.skew, options.distribution, seed=issues * 1000 + values)
+        profiles = generator.write(str(Path(tmp.name) / options.synthetic), 3)
+    cacheDir = options.cache if options.cache else str(Path(tmp.name) / "rankings")
+
+    # sort every profile once, the workers only map the results
+    for path in profiles:
+        loadRanking(loadProfile(path), cacheDir)
+
+    configs = parseParams(options.param)
+    jobs = []
+    seed = 0
+    for config, parameters in enumerate(configs):
+        parameters = dict(parameters, rankingCache=cacheDir, rankingCacheSize=1 << 40)
+        for protocolIdx, protocol in enumerate(options.protocols):
+            for profileIdx, ours in enumerate(profiles):
+                others = [profile for profile in profiles if profile != ours]
+                if protocol == "SAOP":
+                    others = others[:1]
+                for _session in range(options.sessions):
+                    jobs.append((config, protocolIdx, profileIdx, protocol, ours, others,
+                                 options.rounds, seed, parameters))
+                    seed += 1
+
+    writer = ColumnWriter(options.out, { "configs": [json.dumps(config) for config in configs],
+                                         "protocols": options.protocols, "profiles": profiles },
+                          options.flush)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(options.workers) as executor:
+        failed = collect({ executor.submit(playSession, job): job for job in jobs }, writer)
+    elapsed = time.perf_counter() - start
+    tmp.cleanup()
+    print("%d sessions in %.1f s (%.1f sessions/s) with %d workers, %d failed, written to %s"
+          % (writer.size(), elapsed, writer.size() / elapsed, options.workers, failed, options.out))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
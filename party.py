@@ -1,3 +1,47 @@
-from ai2021.group33.Group33Party import Group33Party
+from typing import Sequence
+
+from ai2021.group33.Group33Party import Group33Party, MAX_SORTED_BIDS
+
+
 def party():
-    return Group33Party
\ No newline at end of file
+    return Group33Party
+
+
+def preload(profiles:Sequence[str]=()):
+    '''
+    Warms up a process before its first session: imports the modules the
+    party only imports when it first needs them, and sorts the bids of the
+    given profiles into the process wide {@link RankingMemo}, so the parties
+    made in this process afterwards start with their ranking ready. Meant
+    as initializer of a process pool, or to run in a process that is
+    forked per session.
+    @param profiles paths of linear additive profile json files
+    '''
+    import json
+    from pathlib import Path
+
+    import geniusweb.actions.LearningDone, geniusweb.actions.Vote, geniusweb.actions.Votes  # noqa: F401
+    import geniusweb.inform.OptIn, geniusweb.inform.Voting  # noqa: F401
+    from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+    from pyson.ObjectMapper import ObjectMapper
+
+    from ai2021.group33.BidSpace import BidSpace
+    import ai2021.group33.EventQueue, ai2021.group33.LazySortedBids, ai2021.group33.Metrics  # noqa: F401
+    import ai2021.group33.NeighbourIndex, ai2021.group33.OpponentModelRegistry  # noqa: F401
+    import ai2021.group33.ParetoIndex  # noqa: F401
+    from ai2021.group33.RankingCache import RankingCache
+    from ai2021.group33.RankingMemo import RankingMemo
+    import ai2021.group33.SessionRecorder  # noqa: F401
+    from ai2021.group33.SortedBids import SortedBids
+
+    for path in profiles:
+        profile = ObjectMapper().parse(json.loads(Path(path).read_text("utf-8")), LinearAdditive)
+        bidspace = BidSpace(profile.getDomain())  # type:ignore
+        if bidspace.size() > MAX_SORTED_BIDS:
+            # the party generates the best bids of these on demand
+            continue
+        lookups = bidspace.lookups(profile)  # type:ignore
+        key = RankingCache.key(bidspace, lookups)
+        if RankingMemo.get(key) is None:
+            ranking = SortedBids.fromLookups(bidspace, lookups)
+            RankingMemo.put(key, ranking.getOrder(), ranking.getUtilities())
@@ -0,0 +1,78 @@
+import math
+import unittest
+
+import numpy as np
+
+from geniusweb.actions.PartyId import PartyId
+
+from ai2021.group33.AcceptanceContext import AcceptanceContext, ACCEPT_NEXT, ACCEPT_TIME, \
+    REJECT_NO_WINDOW, REJECT_WINDOW_AVG, REJECT_WINDOW_MAX
+from ai2021.group33.UtilityCache import UtilityCache
+
+
+class AcceptanceContextTest(unittest.TestCase):
+    LEADER = PartyId("leader")
+    OTHER = PartyId("other")
+
+    def testNextCriterion(self):
+        context = AcceptanceContext(0.7)
+        self.assertTrue(context.isGood(0.7))
+        self.assertTrue(context.isGood(0.9, self.OTHER))
+        self.assertFalse(context.isGood(0.69))
+
+    def testCombiWithoutWindow(self):
+        context = AcceptanceContext(0.5, True, True)
+        self.assertFalse(context.isGood(1.0))
+
+    def testCombiLeaderUsesMax(self):
+        context = AcceptanceContext(0.5, True, False, 0.8, 0.6, self.LEADER)
+        self.assertFalse(context.isGood(0.7, self.LEADER))
+        self.assertTrue(context.isGood(0.7, self.OTHER))
+        self.assertTrue(context.isGood(0.8, self.LEADER))
+
+    def testCombiNeedsNextOrTime(self):
+        self.assertFalse(AcceptanceContext(0.9, True, False, 0.8, 0.6).isGood(0.7))
+        self.assertTrue(AcceptanceContext(0.9, True, True, 0.8, 0.6).isGood(0.7))
+
+    def testAreGoodMatchesIsGood(self):
+        utils = np.array([0.5, 0.65, 0.75, 0.85, 0.95])
+        for context in [AcceptanceContext(0.7), AcceptanceContext(0.5, True, True),
+                        AcceptanceContext(0.9, True, False, 0.8, 0.6, self.LEADER),
+                        AcceptanceContext(0.9, True, True, 0.8, 0.6, self.LEADER)]:
+            for party in [self.LEADER, self.OTHER]:
+                leaderOnly = np.full(len(utils), party == self.LEADER)
+                self.assertEqual([context.isGood(util, party) for util in utils],
+                                 list(context.areGood(utils, leaderOnly)))
+                self.assertEqual([context.isGood(util, party) for util in utils],
+                                 [context.reason(util, party).startswith("accept") for util in utils])
+
+    def testLowestGood(self):
+        for context in [AcceptanceContext(0.7), AcceptanceContext(0.5, True, True),
+                        AcceptanceContext(0.9, True, False, 0.8, 0.6, self.LEADER),
+                        AcceptanceContext(0.7, True, True, 0.8, 0.6, self.LEADER)]:
+            for party in [self.LEADER, self.OTHER, None]:
+                lowest = context.lowestGood(party)
+                if lowest != math.inf:
+                    self.assertTrue(context.isGood(lowest, party))
+                self.assertFalse(context.isGood(lowest - 0.01, party))
+
+    def testReasons(self):
+        context = AcceptanceContext(0.9, True, True, 0.8, 0.6, self.LEADER)
+        self.assertEqual(REJECT_WINDOW_MAX, context.reason(0.7, self.LEADER))
+        self.assertEqual(REJECT_WINDOW_AVG, context.reason(0.5, self.OTHER))
+        self.assertEqual(ACCEPT_TIME, context.reason(0.7, self.OTHER))
+        self.assertEqual(ACCEPT_NEXT, context.reason(0.95, self.LEADER))
+        self.assertEqual(REJECT_NO_WINDOW, AcceptanceContext(0.5, True).reason(1.0))
+
+    def testCacheBounded(self):
+        calls = []
+        cache = UtilityCache(lambda bid: calls.append(bid) or 0.5, maxsize=2)
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        self.assertEqual(["a", "b"], calls)
+        cache.get("c")
+        self.assertEqual(2, len(cache))
+        # b was least recently used
+        cache.get("b")
+        self.assertEqual(["a", "b", "c", "b"], calls)
@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+from random import Random
+import tempfile
+import unittest
+
+from benchmark.Autotune import candidates, main, parseSpace
+
+
+class AutotuneTest(unittest.TestCase):
+
+    def testParseSpace(self):
+        space = parseSpace(["highTime=0.9:0.99", "dequeSize=3,5"])
+        self.assertEqual({ "highTime": (0.9, 0.99), "dequeSize": [3, 5] }, space)
+
+    def testGrid(self):
+        configs = candidates(parseSpace(["dequeSize=3,5", "combiTime=0.4,0.6"]), "grid", 0, Random(0))
+        self.assertEqual(4, len(configs))
+        with self.assertRaises(ValueError):
+            candidates(parseSpace(["highTime=0.9:0.99"]), "grid", 0, Random(0))
+
+    def testRandom(self):
+        configs = candidates(parseSpace(["highTime=0.9:0.99", "dequeSize=3:8"]), "random", 20, Random(0))
+        self.assertEqual(20, len(configs))
+        for config in configs:
+            self.assertTrue(0.9 <= config["highTime"] <= 0.99)
+            self.assertTrue(isinstance(config["dequeSize"], int) and 3 <= config["dequeSize"] <= 8)
+        # few distinct values, duplicates are dropped
+        self.assertEqual(2, len(candidates(parseSpace(["dequeSize=3,5"]), "random", 20, Random(0))))
+
+    def testHalving(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "tuned.json")
+            main(["--space", "dequeSize=3,5,8,10", "--sessions", "1", "--max-sessions", "2", "--eta", "2",
+                  "--synthetic", "3x3", "--protocols", "SAOP", "--rounds", "10", "--workers", "2",
+                  "--json", path])
+            with open(path) as file:
+                ranking = json.load(file)
+        self.assertEqual(4, len(ranking))
+        # the best half played the max sessions, the rest only the first rung
+        self.assertEqual([2, 2, 1, 1], [entry["sessions"] for entry in ranking])
+        self.assertEqual(ranking[0]["score"], max(entry["score"] for entry in ranking[:2]))
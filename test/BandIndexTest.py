@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+from random import Random
+import unittest
+
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.BandIndex import BandIndex
+from ai2021.group33.SortedBids import SortedBids
+
+
+class BandIndexTest(unittest.TestCase):
+    pyson = ObjectMapper()
+
+    serialized =  Path("testprofile.json").read_text("utf-8")
+    profile:UtilitySpace = pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+    sortedBids = SortedBids.fromProfile(profile)
+
+    def testCountAbove(self):
+        utils = list(self.sortedBids.getUtilities())
+        for bands in [1, 3, 1024]:
+            index = BandIndex(self.sortedBids, bands)
+            for util in utils + [-1.0, 0.0, 0.33, 0.5, 2.0]:
+                self.assertEqual(len([u for u in utils if u >= util]), index.countAbove(util))
+
+    def testSample(self):
+        rnd = Random(0)
+        utils = self.sortedBids.getUtilities()
+        for bands in [1, 3, 1024]:
+            index = BandIndex(self.sortedBids, bands)
+            for _ in range(200):
+                lo, hi = sorted([rnd.random(), rnd.random()])
+                rank = index.sample(lo, hi, rnd)
+                if rank is None:
+                    self.assertFalse(any(lo <= u <= hi for u in utils))
+                else:
+                    self.assertTrue(lo <= utils[rank] <= hi)
+
+    def testSampleExactUtility(self):
+        index = BandIndex(self.sortedBids)
+        util = self.sortedBids.getUtility(3)
+        self.assertEqual(util, self.sortedBids.getUtility(index.sample(util, util)))
+
+    def testSampleNothing(self):
+        index = BandIndex(self.sortedBids)
+        self.assertIsNone(index.sample(2.0))
+        self.assertIsNone(index.sample(0.6, 0.5))
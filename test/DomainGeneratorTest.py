@@ -0,0 +1,39 @@
+from decimal import Decimal
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from geniusweb.bidspace.AllBidsList import AllBidsList
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from pyson.ObjectMapper import ObjectMapper
+
+from benchmark.DomainGenerator import DISTRIBUTIONS, DomainGenerator
+
+
+class DomainGeneratorTest(unittest.TestCase):
+    pyson = ObjectMapper()
+
+    def testWeightsSumToOne(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for issues, skew in [(1, 0.0), (3, 0.0), (7, 1.5), (10, 3.0), (40, 4.0)]:
+                paths = DomainGenerator(issues, 2, skew, seed=issues).write(str(Path(tmp) / str(issues)), 2)
+                for path in paths:
+                    profile:LinearAdditive = self.pyson.parse(json.loads(Path(path).read_text("utf-8")),
+                                                              LinearAdditive) #type:ignore
+                    weights = [profile.getWeight(issue) for issue in profile.getDomain().getIssues()]
+                    self.assertEqual(Decimal(1), sum(weights, Decimal(0)))
+                    self.assertTrue(all(weight > 0 for weight in weights))
+
+    def testDistributions(self):
+        for distribution in DISTRIBUTIONS:
+            generator = DomainGenerator(3, 4, 1.0, distribution, seed=1)
+            self.assertEqual(64, generator.size())
+            profile:LinearAdditive = self.pyson.parse(generator.profile("p"), LinearAdditive) #type:ignore
+            self.assertEqual(64, AllBidsList(profile.getDomain()).size())
+            for bid in AllBidsList(profile.getDomain()):
+                self.assertTrue(0 <= profile.getUtility(bid) <= 1)
+
+    def testSeeded(self):
+        self.assertEqual(DomainGenerator(4, 3, seed=5).profile("p"), DomainGenerator(4, 3, seed=5).profile("p"))
+        self.assertNotEqual(DomainGenerator(4, 3, seed=5).profile("p"), DomainGenerator(4, 3, seed=6).profile("p"))
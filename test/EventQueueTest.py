@@ -0,0 +1,89 @@
+import threading
+import unittest
+
+from ai2021.group33.EventQueue import EventQueue
+
+
+class Turn:
+    pass
+
+class Note:
+    pass
+
+class Stop:
+    pass
+
+
+class EventQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+        self.queue = EventQueue(self._handle, lambda batch: self.log.append(("batch", len(batch))),
+                                (Note,), (Turn,), onCancel=lambda event: self.log.append(("cancelled", type(event))))
+
+    def tearDown(self):
+        self.gate.set()
+        self.queue.close()
+
+    def _handle(self, event):
+        self.started.set()
+        self.gate.wait(10)
+        self.log.append(("handled", type(event), self.queue.isCurrent(self.queue.getRunning())))
+
+    def testHandlesInOrder(self):
+        self.queue.put(Turn())
+        self.assertTrue(self.queue.join(10))
+        self.queue.put(Stop())
+        self.assertTrue(self.queue.join(10))
+        self.assertEqual([("handled", Turn, True), ("handled", Stop, True)], self.log)
+
+    def testCoalesces(self):
+        self.gate.clear()
+        self.queue.put(Stop())
+        self.started.wait(10)
+        for _ in range(5):
+            self.queue.put(Note())
+        self.gate.set()
+        self.assertTrue(self.queue.join(10))
+        self.assertEqual([("handled", Stop, True), ("batch", 5)], self.log)
+
+    def testBatchKeepsOrder(self):
+        self.gate.clear()
+        self.queue.put(Stop())
+        self.started.wait(10)
+        self.queue.put(Note())
+        self.queue.put(Stop())
+        self.queue.put(Note())
+        self.queue.put(Note())
+        self.gate.set()
+        self.assertTrue(self.queue.join(10))
+        # the notes after the queued Stop are not handled before it
+        self.assertEqual([("handled", Stop, False), ("batch", 1), ("handled", Stop, True), ("batch", 2)], self.log)
+
+    def testCancelsSuperseded(self):
+        self.gate.clear()
+        self.queue.put(Stop())
+        self.started.wait(10)
+        self.queue.put(Turn())
+        self.queue.put(Turn())
+        self.gate.set()
+        self.assertTrue(self.queue.join(10))
+        # the running Stop was superseded too, but is not cancellable
+        self.assertEqual([("handled", Stop, False), ("cancelled", Turn), ("handled", Turn, True)], self.log)
+
+    def testErrors(self):
+        errors = []
+        queue = EventQueue(lambda event: 1 / 0, lambda batch: None, (Note,), (Turn,), onError=errors.append)
+        queue.put(Turn())
+        self.assertTrue(queue.join(10))
+        queue.close()
+        self.assertTrue(isinstance(errors[0], ZeroDivisionError))
+
+    def testClose(self):
+        self.queue.close()
+        self.queue.put(Turn())
+        self.assertTrue(self.queue.join(1))
+        self.assertEqual([], self.log)
@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+import unittest
+
+from geniusweb.actions.Offer import Offer
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.bidspace.AllBidsList import AllBidsList
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.FrequencyOpponentModel import FrequencyOpponentModel
+
+
+class FrequencyOpponentModelTest(unittest.TestCase):
+    pyson = ObjectMapper()
+    OTHER = PartyId("other")
+
+    serialized =  Path("testprofile.json").read_text("utf-8")
+    profile:UtilitySpace = pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+
+    def setUp(self):
+        self.domain = self.profile.getDomain()
+        self.bids = AllBidsList(self.domain)
+        self.model = FrequencyOpponentModel().withDomain(self.domain, None)
+
+    def testEmptyModel(self):
+        self.assertEqual(1, self.model.getUtility(self.bids.get(0)))
+        self.assertEqual(0, self.model.getTotal())
+
+    def testUpdateInPlace(self):
+        bid = self.bids.get(0)
+        self.assertIs(self.model, self.model.update(bid))
+        self.assertEqual(1, self.model.getTotal())
+        self.assertEqual(1, self.model.getUtility(bid))
+        for issue in self.domain.getIssues():
+            self.assertEqual(1, self.model.getCounts(issue)[bid.getValue(issue)])
+            self.assertEqual(1.0, self.model.getFraction(issue, bid.getValue(issue)))
+
+    def testWithActionIsImmutable(self):
+        bid = self.bids.get(0)
+        newModel = self.model.withAction(Offer(self.OTHER, bid), None)
+        self.assertEqual(0, self.model.getTotal())
+        self.assertEqual(1, newModel.getTotal())
+        snapshot = newModel.snapshot()
+        newModel.update(bid)
+        self.assertEqual(1, snapshot.getTotal())
+        self.assertNotEqual(snapshot, newModel)
+
+    def testBatchedUtilities(self):
+        for idx in range(0, self.bids.size(), 3):
+            self.model.update(self.bids.get(idx))
+        bidspace = self.model.getBidSpace()
+        matrix = bidspace.indexMatrix()
+        utils = self.model.getUtilities(matrix)
+        for code, row in enumerate(matrix):
+            self.assertAlmostEqual(float(self.model.getUtility(bidspace.toBid(row))), utils[code])
+        bids = [self.bids.get(idx) for idx in range(self.bids.size())]
+        utils = self.model.getUtilities(bids)
+        for bid, util in zip(bids, utils):
+            self.assertAlmostEqual(float(self.model.getUtility(bid)), util)
+
+    def testFractionScales(self):
+        for idx in range(0, self.bids.size(), 2):
+            self.model.update(self.bids.get(idx))
+        issues = self.domain.getIssues()
+        for idx in range(self.bids.size()):
+            bid = self.bids.get(idx)
+            fractions = sum(self.model.getFraction(issue, bid.getValue(issue)) for issue in issues)
+            self.assertAlmostEqual(fractions / len(issues), float(self.model.getUtility(bid)))
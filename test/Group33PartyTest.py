@@ -1,10 +1,16 @@
+from concurrent.futures import Future
 from datetime import datetime
 from decimal import Decimal
 import json
+import os
 from pathlib import Path
+import tempfile
+import time
 from typing import cast, List
 import unittest
 
+import numpy as np
+
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
@@ -12,7 +18,10 @@ from geniusweb.actions.Votes import Votes
 from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.connection.ConnectionEnd import ConnectionEnd
 from geniusweb.inform.ActionDone import ActionDone
+from geniusweb.inform.Agreements import Agreements
+from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
+from geniusweb.inform.OptIn import OptIn
 from geniusweb.inform.Settings import Settings
 from geniusweb.inform.Voting import Voting
 from geniusweb.inform.YourTurn import YourTurn
@@ -31,6 +40,7 @@ from tudelft.utilities.listener.DefaultListenable import DefaultListenable
 from uri.uri import URI  # type: ignore 
 
 from ai2021.group33.Group33Party import Group33Party
+from ai2021.group33.SessionReplayer import SessionReplayer
 
 
 class MyConn(ConnectionEnd[Inform, Action], DefaultListenable):
@@ -56,6 +66,19 @@ class MyConn(ConnectionEnd[Inform, Action], DefaultListenable):
     def getActions(self)-> List[Action]:
         return self._actions
 
+class ReparsingProfile:
+    '''
+    Profile connection that parses the profile again on every fetch.
+    '''
+    def __init__(self, serialized:str):
+        self.serialized = serialized
+
+    def getProfile(self):
+        return ObjectMapper().parse(json.loads(self.serialized), LinearAdditive)
+
+    def close(self):
+        pass
+
 class Group33PartyTest(unittest.TestCase):
     pyson = ObjectMapper()
 
@@ -66,7 +89,8 @@ class Group33PartyTest(unittest.TestCase):
     protocolref = ProtocolRef(URI("SAOP"))
     mopacProtocol = ProtocolRef(URI("MOPAC"));
     #progress=ProgressTime(1000, datetime.fromtimestamp(12345))
-    progress=ProgressRounds(1000, 1, datetime.fromtimestamp(111122345))
+    # deadline well ahead, so that the turn scheduler never asks for quick turns
+    progress=ProgressRounds(1000, 1, datetime.fromtimestamp(time.time() + 24 * 3600))
     parameters=Parameters()
     mopacSettings = Settings(PARTY1,  PROFILE, mopacProtocol,progress, parameters)
     serialized =  Path("testprofile.json").read_text("utf-8")
@@ -109,6 +133,237 @@ class Group33PartyTest(unittest.TestCase):
         self.assertTrue(isinstance(actions[0], Offer))
         print("party did an offer: "+repr(actions[0]))
 
+    def testSortsAtSettings(self):
+        settings  = Settings(self.PARTY1, self.profileref, self.protocolref, self.progress, self.parameters )
+
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        sortedBids = self.party._sortedBidsFuture.result(10)
+        self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        actions = self.connection.getActions()
+        self.assertEquals(1, len(actions))
+        self.assertEqual(sortedBids.getBid(0), actions[0].getBid())
+
+    def testReusesRankingInProcess(self):
+        settings  = Settings(self.PARTY1, self.profileref, self.protocolref, self.progress, self.parameters )
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        first = self.party._sortedBidsFuture.result(10)
+        self.party.disconnect()
+
+        party = Group33Party()
+        party.connect(MyConn())
+        party.notifyChange(settings)
+        second = party._sortedBidsFuture.result(10)
+        party.disconnect()
+        self.assertTrue(np.shares_memory(first.getOrder(), second.getOrder()))
+        self.assertEqual(first.getBid(0), second.getBid(0))
+
+    def testInstrumented(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.jsonl")
+            parameters = Parameters({"instrument": True, "metricsFile": path})
+            settings  = Settings(self.PARTY1, self.profileref, self.protocolref, self.progress, parameters )
+
+            self.party.connect(self.connection)
+            self.connection.notifyListeners(settings)
+            self.connection.notifyListeners(YourTurn())
+            self.connection.notifyListeners(Finished(Agreements({})))
+            self.party.disconnect()
+
+            with open(path) as file:
+                record = json.loads(file.readline())
+        self.assertEqual(1, record["_myTurn.count"])
+        self.assertEqual(2, record["notifyChange.count"])
+        self.assertTrue(record["getProfile.count"] > 0)
+
+    def testStrategyParameters(self):
+        parameters = Parameters({"highTime": 0.9, "dequeSize": 3, "earlyBidTime": 2.0, "offerAttempts": "many"})
+        settings  = Settings(self.PARTY1, self.profileref, self.protocolref, self.progress, parameters )
+
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        self.party._sortedBidsFuture.result(10)
+        self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        self.assertEqual(0.9, self.party.highTime)
+        self.assertEqual(0.5, self.party.combiTime)
+        self.assertEqual(0.09, self.party.earlyBidTime)
+        self.assertEqual(20, self.party.offerAttempts)
+        self.assertEqual(3, len(self.party.bestBids))
+
+    def testEventQueue(self):
+        parameters = Parameters({"eventQueue": True})
+        settings  = Settings(self.PARTY1, self.PROFILE, self.protocolref, self.progress, parameters )
+        bid = self._findGoodBid()
+
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        for _ in range(3):
+            self.connection.notifyListeners(ActionDone(Offer(PartyId('other'), bid)))
+        self.connection.notifyListeners(YourTurn())
+        self.assertTrue(self.party._events.join(10))
+        self.party.disconnect()
+
+        self.assertEqual(1, len(self.connection.getActions()))
+        self.assertEqual(bid, self.party._lastReceivedBid)
+        self.assertEqual(3, self.party._getOpponents().getOffers())
+        self.assertEqual(2, self.party._progress.getCurrentRound())
+
+    def testRecordAndReplay(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "session.bin")
+            parameters = Parameters({"recordFile": path})
+            settings  = Settings(self.PARTY1, self.PROFILE, self.protocolref, self.progress, parameters )
+            offer = Offer(PartyId('other'), self._findGoodBid())
+
+            self.party.connect(self.connection)
+            self.connection.notifyListeners(settings)
+            self.connection.notifyListeners(ActionDone(offer))
+            self.connection.notifyListeners(YourTurn())
+            self.connection.notifyListeners(Finished(Agreements({})))
+            self.party.disconnect()
+
+            replayer = SessionReplayer(path)
+            informs = list(replayer.informs())
+            self.assertEqual([Settings, ActionDone, YourTurn, Finished], [type(info) for info in informs])
+            self.assertEqual(offer.getBid(), informs[1].getAction().getBid())
+            self.assertEqual(offer.getActor(), informs[1].getAction().getActor())
+            self.assertEqual([type(action) for action in self.connection.getActions()],
+                             [type(action) for action in replayer.actions()])
+            self.assertEqual(self.connection.getActions()[0].getBid(), next(replayer.actions()).getBid())
+
+            party = Group33Party()
+            connection = MyConn()
+            party.connect(connection)
+            self.assertEqual(4, replayer.replay(party))
+            party.disconnect()
+            self.assertIsNone(party._recorder)
+            self.assertEqual(1, len(connection.getActions()))
+
+    def testReplayIsSynchronous(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "session.bin")
+            parameters = Parameters({"recordFile": path, "eventQueue": True})
+            progress = ProgressRounds(1000, 1, datetime.fromtimestamp(time.time() + 60))
+            settings  = Settings(self.PARTY1, self.PROFILE, self.protocolref, progress, parameters )
+
+            self.party.connect(self.connection)
+            self.connection.notifyListeners(settings)
+            self.connection.notifyListeners(YourTurn())
+            self.connection.notifyListeners(Finished(Agreements({})))
+            self.party._events.join(10)
+            self.party.disconnect()
+
+            party = Group33Party()
+            connection = MyConn()
+            party.connect(connection)
+            self.assertEqual(3, SessionReplayer(path).replay(party))
+            # handled before replay returned, with the deadline still ahead
+            self.assertIsNone(party._events)
+            self.assertEqual(1, len(connection.getActions()))
+            self.assertTrue(party._scheduler.remaining() > 30)
+            party.disconnect()
+
+    def testSendYourTurnTimeProgress(self):
+        progress = ProgressTime(60000, datetime.now())
+        settings  = Settings(self.PARTY1, self.profileref, self.protocolref, progress, self.parameters )
+
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        for _ in range(10):
+            self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        actions = self.connection.getActions()
+        self.assertEquals(10, len(actions))
+        self.assertTrue(isinstance(actions[0], Offer))
+
+    def testPastDeadlineUsesBestBids(self):
+        progress = ProgressTime(1, datetime.now())
+        settings  = Settings(self.PARTY1, self.profileref, self.protocolref, progress, self.parameters )
+
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        self.connection.notifyListeners(YourTurn())
+        self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        actions = self.connection.getActions()
+        self.assertEquals(2, len(actions))
+        self.assertTrue(self.party._codec.encode(actions[1].getBid()) in self.party.bestBids)
+
+    def testReceivedWindowDrainedEveryTurn(self):
+        progress = ProgressRounds(100, 0, datetime.fromtimestamp(time.time() + 3600))
+        settings  = Settings(self.PARTY1, self.PROFILE, self.protocolref, progress, Parameters({"combiTime": 0.7}))
+
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        for _ in range(60):
+            self.connection.notifyListeners(ActionDone(Offer(PartyId("other"), self._findGoodBid())))
+            self.connection.notifyListeners(YourTurn())
+            self.assertEqual(0, len(self.party._receivedStats._pending))
+        self.party.disconnect()
+        # bids from before the first combi window, at 2 * 0.7 - 1, are dropped
+        self.assertLess(self.party._receivedStats.count(), 30)
+
+    def testConcedesOverRounds(self):
+        progress = ProgressRounds(200, 0, datetime.fromtimestamp(time.time() + 3600))
+        settings  = Settings(self.PARTY1, self.profileref, self.protocolref, progress, self.parameters )
+
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        self.party._sortedBidsFuture.result(10)
+        first = self.party.max_util
+        for _ in range(200):
+            self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        utils = [self.party._utility(action.getBid()) for action in self.connection.getActions()]
+        self.assertEqual(200, len(utils))
+        self.assertEqual(self.party._sortedBids.getUtility(0), utils[0])
+        self.assertTrue(self.party.max_util < first)
+        self.assertTrue(max(utils[-20:]) < utils[0])
+
+    def testFailedSortOffersGreedyBid(self):
+        settings  = Settings(self.PARTY1, self.profileref, self.protocolref, self.progress, self.parameters )
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        self.party._sortedBidsFuture.result(10)
+        failed:Future = Future()
+        error = ValueError("sort failed")
+        failed.set_exception(error)
+        self.party._sortedBidsFuture = failed
+        for _ in range(3):
+            self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        self.assertIs(error, self.party._sortError)
+        greedy = self.party._greedyMaxBid()
+        self.assertEqual([greedy] * 3, [action.getBid() for action in self.connection.getActions()])
+
+    def testQuickTurnOnlyNearDeadline(self):
+        def run(party:Group33Party, progress) -> int:
+            quick = []
+            full = party._quickTurn
+            party._quickTurn = lambda: (quick.append(1), full())
+            settings  = Settings(self.PARTY1, self.profileref, self.protocolref, progress, self.parameters )
+            party.connect(MyConn())
+            party.notifyChange(settings)
+            party._sortedBidsFuture.result(10)
+            for _ in range(20):
+                party.notifyChange(YourTurn())
+            party.disconnect()
+            return len(quick)
+
+        self.assertEqual(0, run(self.party, self.progress))
+        self.assertEqual(0, run(Group33Party(), ProgressTime(3600000, datetime.now())))
+        # past the deadline every turn but the first is quick
+        self.assertEqual(19, run(Group33Party(), ProgressTime(1, datetime.now())))
+
     def testSendOfferAndYourTurn(self):
         settings  = Settings(self.PARTY1, self.profileref, self.protocolref, self.progress, self.parameters )
 
@@ -127,6 +382,43 @@ class Group33PartyTest(unittest.TestCase):
         self.assertTrue(isinstance(actions[0], Offer))
 
 
+    def testReparsedProfileIsNotSortedAgain(self):
+        settings  = Settings(self.PARTY1, self.PROFILE, self.protocolref, self.progress, self.parameters )
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        self.connection.notifyListeners(YourTurn())
+        future = self.party._sortedBidsFuture
+        self.party._profile = ReparsingProfile(self.serialized)
+        self.connection.notifyListeners(YourTurn())
+        self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        self.assertIs(future, self.party._sortedBidsFuture)
+        self.assertEqual(3, len(self.connection.getActions()))
+
+    def testChangedProfileResetsOwnUtilities(self):
+        settings  = Settings(self.PARTY1, self.PROFILE, self.protocolref, self.progress, self.parameters )
+        self.party.connect(self.connection)
+        self.connection.notifyListeners(settings)
+        self.connection.notifyListeners(ActionDone(Offer(PartyId("other"), self._findGoodBid())))
+        self.connection.notifyListeners(YourTurn())
+        future = self.party._sortedBidsFuture
+        opponents = self.party._opponents
+        self.assertEqual(1, self.party._receivedStats.count())
+
+        changed = json.loads(self.serialized)
+        weights = changed["LinearAdditiveUtilitySpace"]["issueWeights"]
+        weights["issue1"], weights["issue2"] = weights["issue2"], weights["issue1"]
+        self.party._profile = ReparsingProfile(json.dumps(changed))
+        self.connection.notifyListeners(YourTurn())
+        self.party.disconnect()
+
+        self.assertIsNot(future, self.party._sortedBidsFuture)
+        self.assertIs(opponents, self.party._opponents)
+        self.assertEqual(0, self.party._receivedStats.count())
+        self.assertEqual((0, 0), self.party._paretoBuild)
+        self.assertEqual(2, len(self.connection.getActions()))
+
     def testVoting(self) :
         self.assertEqual(0, len(self.connection.getActions()))
         self.party.connect(self.connection);
@@ -141,6 +433,56 @@ class Group33PartyTest(unittest.TestCase):
         self.assertEqual(1, len(action.getVotes()))
         self.assertEqual(bid, next(iter(action.getVotes())).getBid())
 
+    def testOptInSendsVotesOfThisRoundOnly(self):
+        self.party.connect(self.connection);
+        self.party.notifyChange(self.mopacSettings);
+
+        self.party.notifyChange(OptIn([]))
+        self.assertEqual(0, len(self.connection.getActions()))
+        voting = Voting([Offer(self.PARTY1, self._findGoodBid())], {self.PARTY1: 1})
+        self.party.notifyChange(voting)
+        self.party.notifyChange(OptIn([]))
+        self.assertEqual(2, len(self.connection.getActions()))
+        self.assertEqual(self.connection.getActions()[0], self.connection.getActions()[1])
+        # a superseded Voting in a later round sends nothing at its OptIn
+        self.party._cancelled(voting)
+        self.party.notifyChange(OptIn([]))
+        self.assertEqual(2, len(self.connection.getActions()))
+
+    def testVotingDeduplicates(self):
+        self.party.connect(self.connection);
+        self.party.notifyChange(self.mopacSettings);
+
+        party2 = PartyId("party2")
+        party3 = PartyId("party3")
+        good = self._findGoodBid()
+        bad = min(AllBidsList(self.profile.getDomain()), key=self.profile.getUtility)
+        offers = [Offer(party2, good), Offer(party3, good), Offer(party3, bad)]
+        self.party.notifyChange(Voting(offers, {self.PARTY1: 1, party2: 2, party3: 1}))
+        action = self.connection.getActions()[0]
+        self.assertEqual([good], [vote.getBid() for vote in action.getVotes()])
+        self.assertEqual([party2], self.party.powerParty)
+        reasons = self.party._voteReasons
+        self.assertEqual([(party2, good), (party3, good), (party3, bad)],
+                         [(actor, bid) for actor, bid, _reason in reasons])
+        self.assertTrue(reasons[0][2].startswith("accept"))
+        self.assertTrue(reasons[2][2].startswith("reject"))
+
+    def testOfferCountedOncePerRound(self):
+        self.party.connect(self.connection);
+        self.party.notifyChange(self.mopacSettings);
+
+        party2 = PartyId("party2")
+        offer = Offer(party2, self._findGoodBid())
+        self.party.notifyChange(ActionDone(offer))
+        self.party.notifyChange(Voting([offer], {self.PARTY1: 1, party2: 1}))
+        self.assertEqual(1, self.party._opponents.getOffers())
+        # the same offer in the next round counts again
+        self.party.notifyChange(YourTurn())
+        self.party.notifyChange(ActionDone(offer))
+        self.party.notifyChange(Voting([offer], {self.PARTY1: 1, party2: 1}))
+        self.assertEqual(2, self.party._opponents.getOffers())
+
     def _findGoodBid(self)-> Bid:
         for bid in AllBidsList(self.profile.getDomain()):
             if self.profile.getUtility(bid) > 0.8:
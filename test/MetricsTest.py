@@ -0,0 +1,71 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from ai2021.group33.Metrics import Histogram, Metrics
+
+
+class MetricsTest(unittest.TestCase):
+
+    def testHistogram(self):
+        histogram = Histogram()
+        for _ in range(98):
+            histogram.add(0.000010)
+        histogram.add(0.5)
+        histogram.add(0.5)
+        self.assertEqual(100, histogram.count)
+        self.assertEqual(0.5, histogram.max)
+        self.assertLess(histogram.percentile(50), 0.0001)
+        self.assertEqual(0.5, histogram.percentile(99))
+
+    def testTimed(self):
+        metrics = Metrics()
+        double = metrics.timed("double", lambda x: 2 * x)
+        self.assertEqual(4, double(2))
+        self.assertEqual(6, double(3))
+        record = metrics.toRecord("s")
+        self.assertEqual(2, record["double.count"])
+        self.assertEqual("s", record["session"])
+
+    def testTimedRaises(self):
+        metrics = Metrics()
+        def fail():
+            raise ValueError()
+        failing = metrics.timed("fail", fail)
+        self.assertRaises(ValueError, failing)
+        self.assertEqual(1, metrics.toRecord("s")["fail.count"])
+
+    def testDumpJsonAndCsv(self):
+        metrics = Metrics()
+        metrics.record("turn", 0.001)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.jsonl")
+            metrics.dump(path, "a")
+            metrics.dump(path, "b")
+            with open(path) as file:
+                lines = [json.loads(line) for line in file]
+            self.assertEqual(["a", "b"], [line["session"] for line in lines])
+
+            path = os.path.join(tmp, "metrics.csv")
+            metrics.dump(path, "a")
+            metrics.dump(path, "b")
+            with open(path) as file:
+                rows = list(csv.DictReader(file))
+            self.assertEqual(["a", "b"], [row["session"] for row in rows])
+            self.assertEqual("1", rows[0]["turn.count"])
+
+    def testHistogramThreads(self):
+        histogram = Histogram()
+        def add():
+            for _ in range(10000):
+                histogram.add(0.000010)
+        threads = [threading.Thread(target=add) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(40000, histogram.count)
+        self.assertEqual(40000, sum(histogram.buckets))
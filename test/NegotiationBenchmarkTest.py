@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from benchmark.NegotiationBenchmark import PROFILES, main, summarize
+from benchmark.Sessions import runSession
+
+# the profiles are relative to the repository root
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class NegotiationBenchmarkTest(unittest.TestCase):
+    profiles = [str(ROOT / profile) for profile in PROFILES]
+
+    def testSaopSession(self):
+        result = runSession("SAOP", self.profiles[0], self.profiles[1:2], 20)
+        self.assertTrue(1 <= result["rounds"] <= 20)
+        self.assertEqual(1, len(result["timings"]["settings"]))
+        self.assertEqual(1, len(result["timings"]["firstTurn"]))
+        self.assertEqual(result["rounds"], len(result["timings"]["firstTurn"]) + len(result["timings"]["turn"]))
+        # the party alone never takes more than the whole process
+        if result["partyrss"] is not None:
+            self.assertTrue(0 <= result["partyrss"] <= result["maxrss"])
+
+    def testSummarize(self):
+        results = [runSession("MOPAC", self.profiles[0], self.profiles[1:], 10, seed) for seed in range(2)]
+        summary = summarize(results)
+        self.assertEqual(2, summary["session"]["n"])
+        for event in ["settings", "firstTurn", "voting"]:
+            stats = summary[event]
+            self.assertTrue(stats["p50"] <= stats["p99"] <= stats["max"])
+        self.assertEqual(2, summary["settings"]["n"])
+
+    def testSyntheticDomains(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "summary.json")
+            main(["--profiles"] + self.profiles + ["--protocols", "SAOP", "--rounds", "10", "--sessions", "1",
+                  "--synthetic", "3x3", "--json", path])
+            with open(path) as file:
+                summaries = json.load(file)
+        self.assertEqual(["SAOP profiles", "SAOP 3x3 (27 bids)"], list(summaries.keys()))
+        for summary in summaries.values():
+            self.assertEqual(1, summary["session"]["n"])
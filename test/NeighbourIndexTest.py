@@ -0,0 +1,64 @@
+from itertools import combinations
+import json
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.NeighbourIndex import NeighbourIndex
+from ai2021.group33.SortedBids import SortedBids
+from benchmark.DomainGenerator import DomainGenerator
+
+
+class NeighbourIndexTest(unittest.TestCase):
+    pyson = ObjectMapper()
+
+    serialized =  Path("testprofile.json").read_text("utf-8")
+    profile:UtilitySpace = pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+    sortedBids = SortedBids.fromProfile(profile)
+
+    def testNearest(self):
+        bidspace = self.sortedBids.getBidSpace()
+        matrix = bidspace.indexMatrix()
+        for lookups in [bidspace.lookups(self.profile), None]:
+            index = NeighbourIndex(self.sortedBids, lookups)
+            for code in range(len(matrix)):
+                for util in [0.0, 0.4, 0.7, 0.9]:
+                    found = index.nearest(matrix[code], util, 3)
+                    acceptable = [other for other in range(len(matrix)) if index.getUtility(other) >= util]
+                    expected = sorted(acceptable, key=lambda other: index.distance(matrix[code], matrix[other]))[:3]
+                    self.assertEqual([index.distance(matrix[code], matrix[other]) for other in expected],
+                                     [index.distance(matrix[code], matrix[other]) for other in found])
+                    for other in found:
+                        self.assertTrue(index.getUtility(other) >= util)
+
+    def testUtilityByCode(self):
+        index = NeighbourIndex(self.sortedBids)
+        for rank in range(self.sortedBids.size()):
+            self.assertEqual(self.sortedBids.getUtility(rank), index.getUtility(self.sortedBids.getCode(rank)))
+
+    def testMaxDistanceAndBudget(self):
+        index = NeighbourIndex(self.sortedBids)
+        row = self.sortedBids.getBidSpace().row(0)
+        self.assertEqual([], index.nearest(row, 2.0, 1))
+        self.assertTrue(len(index.nearest(row, 0.0, 100, maxDistance=0)) <= 1)
+        self.assertTrue(len(index.nearest(row, 0.0, 100, budget=1)) <= 1)
+
+    def testSkippedIssuesCountAgainstBudget(self):
+        # 2^19 sets of issues, all skipped since no bid reaches utility 2
+        profile:LinearAdditive = self.pyson.parse(DomainGenerator(19, 2, seed=1).profile("wide"), LinearAdditive) #type:ignore
+        sortedBids = SortedBids.fromProfile(profile)
+        bidspace = sortedBids.getBidSpace()
+        index = NeighbourIndex(sortedBids, bidspace.lookups(profile))
+        examined = []
+        def counting(items, r):
+            for issuesChanged in combinations(items, r):
+                examined.append(issuesChanged)
+                yield issuesChanged
+        with patch("ai2021.group33.NeighbourIndex.combinations", counting):
+            self.assertEqual([], index.nearest(bidspace.row(0), 2.0, 1, budget=100))
+        # one more is drawn where the loop stops
+        self.assertTrue(len(examined) <= 100 + 1)
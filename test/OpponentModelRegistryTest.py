@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+import unittest
+
+from geniusweb.actions.PartyId import PartyId
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.BidSpace import BidSpace
+from ai2021.group33.OpponentModelRegistry import OpponentModelRegistry
+
+
+class OpponentModelRegistryTest(unittest.TestCase):
+    pyson = ObjectMapper()
+    ME = PartyId("me")
+    OTHER1 = PartyId("other1")
+    OTHER2 = PartyId("other2")
+
+    serialized =  Path("testprofile.json").read_text("utf-8")
+    profile:UtilitySpace = pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+
+    def setUp(self):
+        self.bidspace = BidSpace(self.profile.getDomain())
+        self.registry = OpponentModelRegistry(self.bidspace, self.ME)
+
+    def testIgnoresMe(self):
+        self.registry.update(self.ME, self.bidspace.toBid(self.bidspace.row(0)))
+        self.assertTrue(self.registry.isEmpty())
+
+    def testEstimateSameAsModels(self):
+        matrix = self.bidspace.indexMatrix()
+        for code in range(0, len(matrix), 2):
+            self.registry.update(self.OTHER1, self.bidspace.toBid(matrix[code]))
+        for code in range(0, len(matrix), 5):
+            self.registry.update(self.OTHER2, self.bidspace.toBid(matrix[code]))
+        self.assertEqual([self.OTHER1, self.OTHER2], self.registry.getParties())
+
+        estimates = self.registry.estimate(self.registry.oneHot(matrix))
+        self.assertEqual((len(matrix), 2), estimates.shape)
+        for col, party in enumerate(self.registry.getParties()):
+            expected = self.registry.getModel(party).getUtilities(matrix)
+            for code in range(len(matrix)):
+                self.assertAlmostEqual(expected[code], estimates[code, col], places=5)
+
+    def testEstimateRowsSameAsEstimate(self):
+        matrix = self.bidspace.indexMatrix()
+        for code in range(0, len(matrix), 3):
+            self.registry.update(self.OTHER1, self.bidspace.toBid(matrix[code]))
+            self.registry.update(self.OTHER2, self.bidspace.toBid(matrix[len(matrix) - 1 - code]))
+        self.assertEqual(2 * len(range(0, len(matrix), 3)), self.registry.getOffers())
+        expected = self.registry.estimate(self.registry.oneHot(matrix))
+        estimates = self.registry.estimateRows(matrix)
+        self.assertEqual(expected.shape, estimates.shape)
+        for code in range(len(matrix)):
+            for col in range(2):
+                self.assertAlmostEqual(expected[code, col], estimates[code, col], places=5)
@@ -0,0 +1,79 @@
+import random
+import unittest
+
+import numpy as np
+
+from ai2021.group33.ParetoIndex import ParetoIndex
+
+
+class ParetoIndexTest(unittest.TestCase):
+
+    def bruteForce(self, points:np.ndarray) -> list:
+        return [i for i in range(len(points))
+                if not any((points[j] >= points[i]).all() and (points[j] > points[i]).any()
+                           for j in range(len(points)))]
+
+    def testSkyline(self):
+        rnd = np.random.default_rng(0)
+        for parties in [1, 2, 3, 4]:
+            for size in [1, 2, 10, 300]:
+                points = rnd.random((size, parties))
+                self.assertEqual(self.bruteForce(points), list(ParetoIndex.skyline(points)))
+                # with many ties
+                points = np.round(points * 4) / 4
+                self.assertEqual(self.bruteForce(points), list(ParetoIndex.skyline(points)))
+
+    def testSkylinePrefilter(self):
+        rnd = np.random.default_rng(1)
+        points = np.round(rnd.random((ParetoIndex.PIVOTS * 2, 3)) * 10) / 10
+        self.assertEqual(self.bruteForce(points[:600]), list(ParetoIndex.skyline(points[:600])))
+        skyline = ParetoIndex.skyline(points)
+        self.assertFalse(ParetoIndex.dominates(points, points[skyline]).any())
+
+    def testSkylineHint(self):
+        rnd = np.random.default_rng(3)
+        for parties in [2, 3, 4]:
+            points = rnd.random((2000, parties))
+            for changed in [points + rnd.normal(0, 0.02, points.shape), np.round(points * 4) / 4]:
+                expected = list(ParetoIndex.skyline(changed))
+                for hint in [ParetoIndex.skyline(points), rnd.choice(len(points), 50), np.arange(len(points))]:
+                    self.assertEqual(expected, list(ParetoIndex.skyline(changed, hint)))
+
+    def testRebuildFromPrevious(self):
+        rnd = np.random.default_rng(4)
+        ours = np.sort(rnd.random(3000))[::-1]
+        others = rnd.random((3000, 2))
+        previous = ParetoIndex(ours, others)
+        changed = others + rnd.normal(0, 0.05, others.shape)
+        self.assertEqual(list(ParetoIndex(ours, changed).getRanks()),
+                         list(ParetoIndex(ours, changed, previous).getRanks()))
+        # a party more: the previous index is of other points, and ignored
+        more = np.column_stack([changed, rnd.random(3000)])
+        self.assertEqual(list(ParetoIndex(ours, more).getRanks()),
+                         list(ParetoIndex(ours, more, previous).getRanks()))
+
+    def testQueries(self):
+        rnd = np.random.default_rng(2)
+        ours = np.sort(rnd.random(500))[::-1]
+        others = rnd.random((500, 2))
+        index = ParetoIndex(ours, others)
+        points = np.column_stack([ours, others])
+        self.assertEqual(self.bruteForce(points), list(index.getRanks()))
+        for util in [0.0, 0.3, 0.9, 1.1]:
+            above = index.above(util)
+            self.assertEqual([rank for rank in index.getRanks() if ours[rank] >= util], list(above))
+            nash = index.nash(util)
+            if len(above) == 0:
+                self.assertIsNone(nash)
+            else:
+                products = np.prod(points[above], axis=1)
+                self.assertEqual(above[int(np.argmax(products))], nash)
+
+    def testSample(self):
+        rnd = np.random.default_rng(3)
+        ours = np.sort(rnd.random(300))[::-1]
+        index = ParetoIndex(ours, rnd.random((300, 2)))
+        generator = random.Random(4)
+        samples = set(index.sample(0.5, generator) for _ in range(500))
+        self.assertEqual(set(int(rank) for rank in index.above(0.5)), samples)
+        self.assertIsNone(index.sample(1.1, generator))
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.BidSpace import BidSpace
+from ai2021.group33.RankingCache import RankingCache
+from ai2021.group33.SortedBids import SortedBids
+
+
+class RankingCacheTest(unittest.TestCase):
+    pyson = ObjectMapper()
+
+    serialized =  Path("testprofile.json").read_text("utf-8")
+    profile:UtilitySpace = pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RankingCache(self.tmp.name)
+        self.bidspace = BidSpace(self.profile.getDomain())
+        self.lookups = self.bidspace.lookups(self.profile)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testMiss(self):
+        self.assertIsNone(self.cache.load(RankingCache.key(self.bidspace, self.lookups)))
+
+    def testRoundTrip(self):
+        sortedBids = SortedBids.fromLookups(self.bidspace, self.lookups)
+        key = RankingCache.key(self.bidspace, self.lookups)
+        self.cache.store(key, sortedBids.getOrder(), sortedBids.getUtilities())
+
+        order, utils = self.cache.load(key)
+        self.assertTrue(isinstance(utils, np.memmap))
+        loaded = SortedBids(self.bidspace, order, utils)
+        for rank in range(sortedBids.size()):
+            self.assertEqual(sortedBids.getBid(rank), loaded.getBid(rank))
+            self.assertEqual(sortedBids.getUtility(rank), loaded.getUtility(rank))
+
+    def testKeyDependsOnProfile(self):
+        key = RankingCache.key(self.bidspace, self.lookups)
+        changed = [table * 0.5 for table in self.lookups]
+        self.assertEqual(key, RankingCache.key(BidSpace(self.profile.getDomain()), self.lookups))
+        self.assertNotEqual(key, RankingCache.key(self.bidspace, changed))
+
+    def testKeyDependsOnFormat(self):
+        key = RankingCache.key(self.bidspace, self.lookups)
+        self.cache.store(key, np.arange(3), np.zeros(3))
+        with patch.object(RankingCache, "FORMAT", RankingCache.FORMAT + 1):
+            newKey = RankingCache.key(self.bidspace, self.lookups)
+            self.assertNotEqual(key, newKey)
+            self.assertIsNone(self.cache.load(newKey))
+
+    def testEvictsLeastRecentlyUsed(self):
+        utils = np.linspace(1, 0, 1000)
+        order = np.arange(1000)
+        # room for 3 rankings, including the .npy headers
+        cache = RankingCache(self.tmp.name, 3 * (utils.nbytes + order.nbytes + 1024))
+        for key in ["a", "b", "c"]:
+            cache.store(key, order, utils)
+            time.sleep(0.01)
+        cache.load("a")
+        time.sleep(0.01)
+        cache.store("d", order, utils)
+        self.assertIsNotNone(cache.load("a"))
+        self.assertIsNone(cache.load("b"))
+        self.assertIsNotNone(cache.load("d"))
+
+    def testKeepsNewest(self):
+        utils = np.linspace(1, 0, 1000)
+        order = np.arange(1000)
+        # room for the arrays of one ranking, not for its .npy headers too
+        cache = RankingCache(self.tmp.name, utils.nbytes + order.nbytes)
+        cache.store("a", order, utils)
+        self.assertIsNotNone(cache.load("a"))
+        # too large to store at all
+        cache.store("b", np.arange(2000), np.linspace(1, 0, 2000))
+        self.assertIsNone(cache.load("b"))
+        self.assertIsNotNone(cache.load("a"))
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from ai2021.group33.RankingMemo import RankingMemo
+
+
+class RankingMemoTest(unittest.TestCase):
+
+    def setUp(self):
+        RankingMemo.clear()
+
+    def tearDown(self):
+        RankingMemo.clear()
+
+    def testGetPut(self):
+        self.assertIsNone(RankingMemo.get("a"))
+        order = np.arange(5)
+        utils = np.linspace(1, 0, 5)
+        RankingMemo.put("a", order, utils)
+        memoOrder, memoUtils = RankingMemo.get("a")
+        self.assertTrue(np.array_equal(order, memoOrder))
+        self.assertTrue(np.array_equal(utils, memoUtils))
+        self.assertFalse(memoOrder.flags.writeable)
+        # the arrays given stay writeable
+        self.assertTrue(order.flags.writeable)
+
+    def testEvictsLeastRecentlyUsed(self):
+        old = RankingMemo.MAX_BYTES
+        try:
+            RankingMemo.MAX_BYTES = 2 * 2 * 100 * 8
+            for key in ["a", "b"]:
+                RankingMemo.put(key, np.zeros(100, dtype=np.int64), np.zeros(100))
+            RankingMemo.get("a")
+            RankingMemo.put("c", np.zeros(100, dtype=np.int64), np.zeros(100))
+            self.assertIsNotNone(RankingMemo.get("a"))
+            self.assertIsNone(RankingMemo.get("b"))
+            self.assertIsNotNone(RankingMemo.get("c"))
+        finally:
+            RankingMemo.MAX_BYTES = old
+
+    def testEntryBound(self):
+        old = RankingMemo.MAX_ENTRIES
+        try:
+            RankingMemo.MAX_ENTRIES = 2
+            with tempfile.TemporaryDirectory() as tmp:
+                # memory maps do not count against MAX_BYTES, but do against MAX_ENTRIES
+                np.save(tmp + "/utils.npy", np.zeros(100))
+                utils = np.load(tmp + "/utils.npy", mmap_mode='r')
+                for key in ["a", "b", "c"]:
+                    RankingMemo.put(key, utils, utils)
+                self.assertIsNone(RankingMemo.get("a"))
+                self.assertIsNotNone(RankingMemo.get("b"))
+                self.assertIsNotNone(RankingMemo.get("c"))
+                RankingMemo.clear()
+                del utils
+        finally:
+            RankingMemo.MAX_ENTRIES = old
@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+import unittest
+
+from geniusweb.bidspace.AllBidsList import AllBidsList
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.DiscreteValue import DiscreteValue
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.ScoringProfile import ScoringProfile
+
+
+class ScoringProfileTest(unittest.TestCase):
+    pyson = ObjectMapper()
+
+    serialized =  Path("testprofile.json").read_text("utf-8")
+    profile:UtilitySpace = pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+
+    def testUtility(self):
+        scoring = ScoringProfile(self.profile)
+        self.assertTrue(scoring.isLinear())
+        for bid in AllBidsList(self.profile.getDomain()):
+            self.assertAlmostEqual(float(self.profile.getUtility(bid)), scoring.utility(bid))
+
+    def testUtilities(self):
+        scoring = ScoringProfile(self.profile)
+        bidspace = scoring.getBidSpace()
+        utilities = scoring.utilities(bidspace.indexMatrix())
+        for code, row in enumerate(bidspace.indexMatrix()):
+            self.assertAlmostEqual(scoring.utility(bidspace.toBid(row)), utilities[code])
+
+    def testUnknownValue(self):
+        scoring = ScoringProfile(self.profile)
+        issue = scoring.getBidSpace().getIssues()[0]
+        self.assertEqual(0.0, scoring.utility(Bid({ issue: DiscreteValue("nonexistent") })))
+
+    def testLookupsReadOnly(self):
+        scoring = ScoringProfile(self.profile)
+        with self.assertRaises(ValueError):
+            scoring.getLookups()[0][0] = 1.0
+
+    def testIsSame(self):
+        scoring = ScoringProfile(self.profile)
+        reparsed = ScoringProfile(self.pyson.parse(json.loads(self.serialized), LinearAdditive))
+        self.assertTrue(scoring.isSame(reparsed))
+        self.assertEqual(scoring.getKey(), reparsed.getKey())
+        changed = json.loads(self.serialized)
+        changed["LinearAdditiveUtilitySpace"]["issueWeights"] = { "issue1": 0.5, "issue2": 0.5 }
+        self.assertFalse(scoring.isSame(ScoringProfile(self.pyson.parse(changed, LinearAdditive))))
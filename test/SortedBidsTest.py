@@ -0,0 +1,153 @@
+import itertools
+import json
+from pathlib import Path
+import unittest
+
+from geniusweb.bidspace.AllBidsList import AllBidsList
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profile.utilityspace.UtilitySpace import UtilitySpace
+from pyson.ObjectMapper import ObjectMapper
+
+from ai2021.group33.BidCodec import BidCodec
+from ai2021.group33.BidSpace import BidSpace
+from ai2021.group33.ConcessionCursor import ConcessionCursor
+from ai2021.group33.LazySortedBids import LazySortedBids
+from ai2021.group33.SortedBids import SortedBids
+
+
+class SortedBidsTest(unittest.TestCase):
+    pyson = ObjectMapper()
+
+    serialized =  Path("testprofile.json").read_text("utf-8")
+    profile:UtilitySpace = pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+
+    def testSize(self):
+        bidspace = BidSpace(self.profile.getDomain())
+        self.assertEqual(AllBidsList(self.profile.getDomain()).size(), bidspace.size())
+        self.assertEqual((bidspace.size(), 2), bidspace.indexMatrix().shape)
+
+    def testRowRoundTrip(self):
+        bidspace = BidSpace(self.profile.getDomain())
+        for code, row in enumerate(bidspace.indexMatrix()):
+            bid = bidspace.toBid(row)
+            self.assertEqual(list(row), list(bidspace.toRow(bid)))
+            self.assertEqual(list(row), list(bidspace.row(code)))
+
+    def testSortedUtilities(self):
+        sortedBids = SortedBids.fromProfile(self.profile)
+        self.assertEqual(AllBidsList(self.profile.getDomain()).size(), sortedBids.size())
+        for rank in range(sortedBids.size()):
+            bid = sortedBids.getBid(rank)
+            self.assertAlmostEqual(float(self.profile.getUtility(bid)), sortedBids.getUtility(rank))
+            if rank > 0:
+                self.assertLessEqual(sortedBids.getUtility(rank), sortedBids.getUtility(rank - 1))
+
+    def testBaselineOrder(self):
+        serialized = (Path(__file__).parent.parent / "group33" / "profile1.json").read_text("utf-8")
+        profile:LinearAdditive = self.pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+        sortedBids = SortedBids.fromProfile(profile)
+        # the Decimal sort of the original party
+        allBids = list(AllBidsList(profile.getDomain()))
+        utils = [profile.getUtility(bid) for bid in allBids]
+        baseline = [allBids[idx] for _util, idx in sorted(zip(utils, range(len(utils))), reverse=True)]
+        ranked = [sortedBids.getBid(rank) for rank in range(sortedBids.size())]
+        self.assertEqual([profile.getUtility(bid) for bid in baseline], [profile.getUtility(bid) for bid in ranked])
+        # every tier of equal Decimal utility holds the same bids, in descending code
+        # order, with one stored utility
+        bidspace = sortedBids.getBidSpace()
+        ranks = iter(range(sortedBids.size()))
+        for (_util, tier), (_same, baseTier) in zip(itertools.groupby(ranked, profile.getUtility),
+                                                    itertools.groupby(baseline, profile.getUtility)):
+            tier = list(tier)
+            self.assertEqual(set(baseTier), set(tier))
+            codes = [bidspace.toCode(bid) for bid in tier]
+            self.assertEqual(sorted(codes, reverse=True), codes)
+            self.assertEqual(1, len(set(sortedBids.getUtility(next(ranks)) for _bid in tier)))
+
+    def testMaxBid(self):
+        sortedBids = SortedBids.fromProfile(self.profile)
+        best = max(float(self.profile.getUtility(bid)) for bid in AllBidsList(self.profile.getDomain()))
+        self.assertAlmostEqual(best, sortedBids.getUtility(0))
+
+    def testFirstBelow(self):
+        sortedBids = SortedBids.fromProfile(self.profile)
+        utils = sortedBids.getUtilities()
+        for rank in range(sortedBids.size()):
+            below = sortedBids.firstBelow(utils[rank])
+            expected = next((r for r in range(sortedBids.size()) if utils[r] < utils[rank]), sortedBids.size())
+            self.assertEqual(expected, below)
+
+    def testFirstBelowFrom(self):
+        sortedBids = SortedBids.fromProfile(self.profile)
+        lazy = LazySortedBids.fromProfile(self.profile)
+        size = sortedBids.size()
+        for search, utils in [(sortedBids, list(sortedBids.getUtilities())),
+                              (lazy, [lazy.getUtility(rank) for rank in range(size)])]:
+            for lo in range(size + 1):
+                for util in utils + [-1.0, 2.0]:
+                    expected = next((r for r in range(lo, size) if utils[r] < util), size)
+                    self.assertEqual(expected, search.firstBelow(util, lo))
+
+    def testCursor(self):
+        sortedBids = SortedBids.fromProfile(self.profile)
+        cursor = ConcessionCursor(sortedBids)
+        self.assertEqual(0, cursor.getRank())
+        util = cursor.getUtility()
+        while cursor.next() is not None:
+            self.assertLess(cursor.getUtility(), util)
+            self.assertEqual(cursor.getRank(), sortedBids.firstBelow(util))
+            util = cursor.getUtility()
+        self.assertEqual(sortedBids.getUtility(sortedBids.size() - 1), util)
+
+    def testCursorStepsWholeTiers(self):
+        for name in ["profile1.json", "profile2.json", "profile3.json"]:
+            serialized = (Path(__file__).parent.parent / "group33" / name).read_text("utf-8")
+            profile:LinearAdditive = self.pyson.parse(json.loads(serialized), LinearAdditive) #type:ignore
+            sortedBids = SortedBids.fromProfile(profile)
+            for bids in [sortedBids, LazySortedBids.fromProfile(profile)]:
+                cursor = ConcessionCursor(bids)
+                util = profile.getUtility(bids.getBid(0))
+                steps = 0
+                while cursor.next() is not None:
+                    lower = profile.getUtility(bids.getBid(cursor.getRank()))
+                    # a strictly lower Decimal utility on every step, and no tier skipped
+                    self.assertLess(lower, util)
+                    util = lower
+                    steps += 1
+                tiers = len(set(profile.getUtility(sortedBids.getBid(rank)) for rank in range(sortedBids.size())))
+                self.assertEqual(tiers - 1, steps)
+
+    def testLazySameOrder(self):
+        sortedBids = SortedBids.fromProfile(self.profile)
+        lazy = LazySortedBids.fromProfile(self.profile)
+        self.assertEqual(sortedBids.size(), lazy.size())
+        for rank in range(lazy.size()):
+            self.assertAlmostEqual(sortedBids.getUtility(rank), lazy.getUtility(rank))
+            self.assertAlmostEqual(float(self.profile.getUtility(lazy.getBid(rank))), lazy.getUtility(rank))
+        codes = set(lazy.getCode(rank) for rank in range(lazy.size()))
+        self.assertEqual(set(range(lazy.size())), codes)
+
+    def testLazyIsLazy(self):
+        lazy = LazySortedBids.fromProfile(self.profile)
+        lazy.getBid(0)
+        self.assertEqual(1, len(lazy.getUtilities()))
+
+    def testCodecRoundTrip(self):
+        bidspace = BidSpace(self.profile.getDomain())
+        codec = BidCodec(bidspace)
+        for code in range(bidspace.size()):
+            bid = codec.decode(code)
+            self.assertEqual(code, codec.encode(bid))
+            self.assertEqual(code, bidspace.toCode(bid))
+            self.assertEqual(code, bidspace.codeOf(bidspace.row(code)))
+        self.assertIsNone(codec.encode(Bid({})))
+
+    def testCodecInterns(self):
+        codec = BidCodec(BidSpace(self.profile.getDomain()), maxsize=2)
+        bid = codec.decode(0)
+        self.assertIs(bid, codec.decode(0))
+        self.assertEqual(0, codec.encode(BidSpace(self.profile.getDomain()).toBid([0, 0])))
+        codec.decode(1)
+        codec.decode(2)
+        self.assertEqual(2, len(codec))
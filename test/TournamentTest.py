@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import Future
+from pathlib import Path
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmark.Tournament import COLUMNS, ColumnWriter, collect, main, parseParams
+
+
+class TournamentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def testParseParams(self):
+        self.assertEqual([{}], parseParams([]))
+        configs = parseParams(["highTime=0.9,0.99", "dequeSize=3", "name=a"])
+        self.assertEqual([{ "highTime": 0.9, "dequeSize": 3, "name": "a" },
+                          { "highTime": 0.99, "dequeSize": 3, "name": "a" }], configs)
+
+    def testColumnWriter(self):
+        path = str(Path(self.tmp.name) / "out.npz")
+        writer = ColumnWriter(path, { "configs": ["{}"] }, flush=2)
+        row = { name: 1 for name, _type in COLUMNS }
+        writer.add(row)
+        self.assertFalse(os.path.exists(path))
+        writer.add(row)
+        results = np.load(path)
+        self.assertEqual(2, len(results["seed"]))
+        self.assertEqual(["{}"], list(results["configs"]))
+
+    def testFailedSession(self):
+        path = str(Path(self.tmp.name) / "out.npz")
+        writer = ColumnWriter(path, {}, flush=100)
+        row = dict({ name: 1 for name, _type in COLUMNS }, error="")
+        played:Future = Future()
+        played.set_result(row)
+        failed:Future = Future()
+        failed.set_exception(ValueError("no such profile"))
+        job = (1, 0, 2, "SAOP", "ours.json", ["other.json"], 20, 7, {})
+        self.assertEqual(1, collect({ played: job, failed: job }, writer))
+        # written at the end although fewer than flush rows were added
+        results = np.load(path)
+        self.assertEqual(2, len(results["seed"]))
+        errors = list(results["error"])
+        self.assertIn("", errors)
+        self.assertIn("ValueError: no such profile", errors)
+        failedRow = errors.index("ValueError: no such profile")
+        self.assertEqual((1, 0, 2, 7), (results["config"][failedRow], results["protocol"][failedRow],
+                                        results["profile"][failedRow], results["seed"][failedRow]))
+        self.assertFalse(results["agreement"][failedRow])
+        self.assertTrue(np.isnan(results["utility"][failedRow]))
+
+    def testGeneratedDomain(self):
+        path = str(Path(self.tmp.name) / "tournament.npz")
+        main(["--synthetic", "3x4", "--protocols", "SAOP", "MOPAC", "--rounds", "20", "--sessions", "1",
+              "--param", "highTime=0.9,0.99", "--workers", "2", "--out", path])
+        results = np.load(path)
+        # 2 configs x 2 protocols x 3 profiles x 1 session
+        self.assertEqual(12, len(results["seed"]))
+        self.assertEqual(list(range(12)), sorted(results["seed"]))
+        self.assertEqual(2, len(results["configs"]))
+        self.assertEqual(3, len(results["profiles"]))
+        self.assertTrue(((results["utility"] >= 0) & (results["utility"] <= 1)).all())
+        self.assertTrue((results["rounds"] <= 20).all())
+        self.assertTrue((results["error"] == "").all())
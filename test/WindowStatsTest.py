@@ -0,0 +1,42 @@
+import random
+import unittest
+
+from ai2021.group33.WindowStats import WindowStats
+
+
+class WindowStatsTest(unittest.TestCase):
+
+    def testEmpty(self):
+        stats = WindowStats()
+        stats.advance(0, 10)
+        self.assertEqual(0, stats.count())
+        self.assertIsNone(stats.max())
+        self.assertIsNone(stats.average())
+
+    def testPendingNotInWindow(self):
+        stats = WindowStats()
+        stats.append(0, 0.5)
+        stats.append(5, 0.9)
+        stats.advance(0, 5)
+        self.assertEqual(1, stats.count())
+        self.assertEqual(0.5, stats.max())
+        stats.advance(1, 6)
+        self.assertEqual(1, stats.count())
+        self.assertEqual(0.9, stats.max())
+
+    def testSameAsSlices(self):
+        rnd = random.Random(33)
+        utils = [rnd.random() for _ in range(500)]
+        stats = WindowStats()
+        for key, util in enumerate(utils):
+            stats.append(key, util)
+        total = 999
+        for cur in range(500, total):
+            start = cur - (total - cur)
+            end = cur + 1
+            stats.advance(start, end)
+            window = utils[start:end]
+            self.assertEqual(len(window), stats.count())
+            if window:
+                self.assertEqual(max(window), stats.max())
+                self.assertAlmostEqual(sum(window) / len(window), stats.average())